@@ -0,0 +1 @@
+"""Contains benchmarks for the normalization utilities in the normalize_nxos_json module."""
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmarks how long normalizing a large output stalls the asyncio event loop.
+
+When executed, this script normalizes a large synthetic output while a heartbeat task ticks on the
+event loop every millisecond, standing in for other in-flight sessions. It reports the elapsed time
+and the longest gap between heartbeats when deserializing and normalizing on the event loop itself
+and when using each mode of `normalize_async`, both for JSON text and for an output that has already
+been deserialized.
+
+Execute from the root of the repository with `python -m benchmarks.bench_async`.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from normalize_nxos_json import (
+    get_json_backend,
+    loads_normalized,
+    normalize_async,
+    normalize_output_iterative,
+)
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+
+async def heartbeat(gaps: list) -> None:
+    """Tick every millisecond, recording the longest gap between ticks."""
+    last = time.perf_counter()
+    while True:
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        gaps[0] = max(gaps[0], now - last)
+        last = now
+
+
+async def measure(normalize, data) -> tuple:
+    """Return the elapsed time and longest event loop stall of normalizing data."""
+    gaps = [0.0]
+    ticker = asyncio.ensure_future(heartbeat(gaps))
+    await asyncio.sleep(0.01)
+    gaps[0] = 0.0
+    start = time.perf_counter()
+    await normalize(data)
+    elapsed = time.perf_counter() - start
+    # Give the heartbeat a chance to record a stall that lasted until now.
+    await asyncio.sleep(0.01)
+    ticker.cancel()
+    return elapsed, gaps[0]
+
+
+async def run(document: str) -> None:
+    """Measure every mode of normalizing a document."""
+
+    async def on_loop_text(document):
+        return loads_normalized(document)
+
+    async def on_loop_dict(data):
+        return normalize_output_iterative(data)
+
+    modes = [
+        ("JSON text", "on the event loop", on_loop_text),
+        ("JSON text", "normalize_async (threads)", normalize_async),
+        (
+            "JSON text",
+            "normalize_async (processes)",
+            lambda document: normalize_async(document, process_threshold=0),
+        ),
+        ("deserialized", "on the event loop", on_loop_dict),
+        ("deserialized", "normalize_async (threads)", normalize_async),
+        (
+            "deserialized",
+            "normalize_async (cooperative)",
+            lambda data: normalize_async(data, yield_every=10000),
+        ),
+    ]
+    for kind, name, normalize in modes:
+        data = document if kind == "JSON text" else json.loads(document)
+        elapsed, stall = await measure(normalize, data)
+        print(
+            f"{kind:>12} {name:>30}: {elapsed * 1000:8.1f} ms elapsed, "
+            f"{stall * 1000:8.1f} ms longest stall"
+        )
+
+
+def main():
+    """Compare event loop stalls of normalizing a large output."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark event loop stalls of normalizing a large output."
+    )
+    parser.add_argument("--preset", default="routes-1m", choices=sorted(PRESETS))
+    parser.add_argument(
+        "--scale", type=float, default=0.1, help="Scale the widest table"
+    )
+    args = parser.parse_args()
+
+    document = json.dumps(
+        generate_payload(scale_levels(PRESETS[args.preset], args.scale))
+    )
+    print(
+        f"{len(document) / 1_000_000:.1f} MB document, "
+        f"JSON backend: {get_json_backend().name}"
+    )
+    asyncio.run(run(document))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
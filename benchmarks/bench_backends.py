@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmarks deserialization, normalization, and serialization with each installed JSON backend.
+
+When executed, this script generates a payload for each preset, then reports how long
+`loads_normalized` and `dumps` take with each installed JSON backend, and the speedup of
+`loads_normalized` over ``normalize_output(json.loads(...))``, which is what the `command()`
+functions of the examples do.
+
+Execute from the root of the repository with `python -m benchmarks.bench_backends`.
+"""
+
+import sys
+import json
+import timeit
+import argparse
+from normalize_nxos_json import (
+    available_json_backends,
+    dumps,
+    loads_normalized,
+    normalize_output,
+    set_json_backend,
+)
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+
+def main():
+    """Compare JSON backends on every synthetic payload preset."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark parse and normalize throughput of each JSON backend."
+    )
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=sorted(PRESETS),
+        help="Preset to benchmark. May be repeated. Defaults to every preset.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=0.1, help="Scale the widest table"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    backends = available_json_backends()
+    print(f"Installed backends: {', '.join(backends)}")
+    for preset in args.preset or PRESETS:
+        document = json.dumps(
+            generate_payload(scale_levels(PRESETS[preset], args.scale))
+        ).encode()
+        number = max(1, 10_000_000 // len(document))
+        baseline = min(
+            timeit.repeat(
+                lambda: normalize_output(json.loads(document)),
+                number=number,
+                repeat=args.repeat,
+            )
+        )
+        print(
+            f"{preset} ({len(document) / 1_000_000:.2f} MB), "
+            f"normalize_output(json.loads(...)): {baseline / number * 1000:.2f} ms"
+        )
+        for backend in backends:
+            set_json_backend(backend)
+            normalized = loads_normalized(document)
+            parse = min(
+                timeit.repeat(
+                    lambda: loads_normalized(document),
+                    number=number,
+                    repeat=args.repeat,
+                )
+            )
+            serialize = min(
+                timeit.repeat(
+                    lambda: dumps(normalized), number=number, repeat=args.repeat
+                )
+            )
+            print(
+                f"{backend:>10}: loads_normalized {parse / number * 1000:8.2f} ms "
+                f"({baseline / parse:.2f}x), dumps {serialize / number * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
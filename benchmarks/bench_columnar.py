@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmarks memory and scan speed of `to_columnar` tables against lists of row dictionaries.
+
+When executed, this script flattens the innermost table of a payload preset both into a list of
+dictionaries (one per row, including ancestor fields) and into a `ColumnarTable`, then reports
+the memory retained by each and how long it takes to sum a numeric column.
+
+Execute from the root of the repository with `python -m benchmarks.bench_columnar`.
+"""
+
+import sys
+import time
+import argparse
+import tracemalloc
+from normalize_nxos_json import iter_rows, learn_row_paths, to_columnar
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+
+def flatten_rows(data: dict, path: str) -> list:
+    """Return a list of dictionaries with the fields of each row and its ancestors."""
+    return [
+        dict(context, **row) for context, row in iter_rows(data, path, ancestors=True)
+    ]
+
+
+def retained(func, *args) -> tuple:
+    """Return the result of `func(*args)` and the memory it retains, in bytes."""
+    tracemalloc.start()
+    result = func(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    """Compare columnar tables with lists of row dictionaries."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark to_columnar tables against lists of row dictionaries."
+    )
+    parser.add_argument("--preset", default="routes-1m", choices=sorted(PRESETS))
+    parser.add_argument(
+        "--scale", type=float, default=0.1, help="Scale the widest table"
+    )
+    parser.add_argument("--column", default="metric", help="Numeric column to sum")
+    args = parser.parse_args()
+
+    data = generate_payload(scale_levels(PRESETS[args.preset], args.scale))
+    path = learn_row_paths([data])[-1]
+    rows, rows_size = retained(flatten_rows, data, path)
+    table, table_size = retained(to_columnar, data, path)
+    print(f"{len(table)} rows of {path}")
+    print(f"{'list of dictionaries':>22}: {rows_size / 1_000_000:8.1f} MB")
+    print(f"{'ColumnarTable':>22}: {table_size / 1_000_000:8.1f} MB")
+
+    start = time.perf_counter()
+    total = sum(int(row[args.column]) for row in rows)
+    print(
+        f"{'sum over dictionaries':>22}: {(time.perf_counter() - start) * 1000:8.1f} ms"
+    )
+    start = time.perf_counter()
+    assert sum(table[args.column]) == total
+    print(f"{'sum over array':>22}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    try:
+        column = table.to_numpy()[args.column]
+    except ImportError:
+        return
+    start = time.perf_counter()
+    assert column.sum() == total
+    print(f"{'sum over NumPy':>22}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Benchmarks normalizers compiled by `compile_normalizer` against the generic normalizers.
+
+When executed, this script compiles a normalizer for a synthetic `show ip route vrf all | json`
+document from a sample of its output, then times it against `normalize_output` and
+`normalize_output_iterative`.
+
+Execute from the root of the repository with `python -m benchmarks.bench_compiled`.
+"""
+
+import sys
+import json
+import argparse
+from normalize_nxos_json import (
+    normalize_output,
+    normalize_output_iterative,
+    compile_normalizer,
+)
+from benchmarks.bench_iterative import time_engine
+from benchmarks.bench_loads_normalized import build_route_output
+
+
+def main():
+    """Compare compiled and generic normalizers."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark compiled normalizers against the generic normalizers."
+    )
+    parser.add_argument("--vrfs", type=int, default=10, help="Number of VRFs")
+    parser.add_argument("--prefixes", type=int, default=10000, help="Prefixes per VRF")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    compiled = compile_normalizer(
+        "show ip route vrf all", samples=[build_route_output(1, 2)]
+    )
+    document = json.dumps(build_route_output(args.vrfs, args.prefixes))
+    assert compiled(json.loads(document)) == normalize_output(json.loads(document))
+    engines = (
+        ("normalize_output", normalize_output),
+        ("normalize_output_iterative", normalize_output_iterative),
+        ("compile_normalizer", compiled),
+    )
+    for name, engine in engines:
+        elapsed = time_engine(engine, document, args.repeat, 1)
+        print(f"{name:>30}: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
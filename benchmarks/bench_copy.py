@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Benchmarks structure-sharing `normalized_copy` against normalizing a deep copy.
+
+When executed, this script times how long it takes to produce a normalized copy of a synthetic
+`show ip route vrf all | json` document while leaving the original untouched, both with
+`normalized_copy` and with `normalize_output_iterative(copy.deepcopy(...))`.
+
+Execute from the root of the repository with `python -m benchmarks.bench_copy`.
+"""
+
+import sys
+import copy
+import timeit
+import argparse
+from normalize_nxos_json import normalize_output_iterative, normalized_copy
+from benchmarks.bench_loads_normalized import build_route_output
+
+
+def deepcopy_then_normalize(data: dict) -> dict:
+    """Normalize a deep copy of `data`."""
+    return normalize_output_iterative(copy.deepcopy(data))
+
+
+def main():
+    """Compare structure-sharing copies with deep copies."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark normalized_copy against normalizing a deep copy."
+    )
+    parser.add_argument("--vrfs", type=int, default=10, help="Number of VRFs")
+    parser.add_argument("--prefixes", type=int, default=10000, help="Prefixes per VRF")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    data = build_route_output(args.vrfs, args.prefixes)
+    assert normalized_copy(data) == deepcopy_then_normalize(data)
+    for func in (deepcopy_then_normalize, normalized_copy):
+        best = min(timeit.repeat(lambda: func(data), number=1, repeat=args.repeat))
+        print(f"{func.__name__:>25}: {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmarks `diff_rows` and `RowDiffer` against a generic recursive comparison.
+
+When executed, this script generates a MAC address table, changes a fraction of its rows in a copy,
+and reports how long it takes to find the differences with a generic recursive comparison of both
+data structures (which reports differing leaf paths, such as ``ROW_mac_address[17].disp_port``),
+with `diff_rows`, and with `RowDiffer.update` on successive snapshots.
+
+Execute from the root of the repository with `python -m benchmarks.bench_diff`.
+"""
+
+import sys
+import copy
+import time
+import random
+import argparse
+from normalize_nxos_json import RowDiffer, diff_rows, normalize_output_iterative
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+PATH = "TABLE_mac_address.ROW_mac_address"
+KEY = ("disp_mac_addr", "disp_vlan")
+
+
+def generic_diff(old, new, path: str = "") -> list:
+    """Return the paths of every leaf that differs between two data structures."""
+    differences = []
+    stack = [(old, new, path)]
+    while stack:
+        old, new, path = stack.pop()
+        if isinstance(old, dict) and isinstance(new, dict):
+            for k in old.keys() | new.keys():
+                stack.append((old.get(k), new.get(k), f"{path}.{k}"))
+        elif isinstance(old, list) and isinstance(new, list):
+            for index in range(max(len(old), len(new))):
+                stack.append(
+                    (
+                        old[index] if index < len(old) else None,
+                        new[index] if index < len(new) else None,
+                        f"{path}[{index}]",
+                    )
+                )
+        elif old != new:
+            differences.append(path)
+    return differences
+
+
+def main():
+    """Compare generic and row-level differences between snapshots."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark row-level differences against a generic comparison."
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Scale the MAC address table"
+    )
+    parser.add_argument(
+        "--changed",
+        type=float,
+        default=0.01,
+        help="Fraction of rows to change between snapshots",
+    )
+    args = parser.parse_args()
+
+    old = normalize_output_iterative(
+        generate_payload(scale_levels(PRESETS["macs-100k"], args.scale))
+    )
+    new = copy.deepcopy(old)
+    rows = new["TABLE_mac_address"]["ROW_mac_address"]
+    rng = random.Random(0)
+    changed = int(len(rows) * args.changed)
+    for row in rng.sample(rows, changed):
+        row["disp_port"] = "Eth1/99"
+    # Remove one row from the middle of the table, which shifts every later
+    # row for a comparison by position.
+    del rows[len(rows) // 2]
+    print(f"{len(rows)} rows, {changed} changed, 1 removed")
+
+    start = time.perf_counter()
+    differences = generic_diff(old, new)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'generic comparison':>20}: {elapsed * 1000:8.1f} ms, "
+        f"{len(differences)} differences"
+    )
+
+    start = time.perf_counter()
+    diff = diff_rows(old, new, PATH, KEY)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'diff_rows':>20}: {elapsed * 1000:8.1f} ms, {len(diff.added)} added, "
+        f"{len(diff.removed)} removed, {len(diff.changed)} changed"
+    )
+
+    differ = RowDiffer(PATH, KEY)
+    differ.update(old)
+    start = time.perf_counter()
+    diff = differ.update(new)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'RowDiffer.update':>20}: {elapsed * 1000:8.1f} ms, {len(diff.added)} added, "
+        f"{len(diff.removed)} removed, {len(diff.changed)} changed"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
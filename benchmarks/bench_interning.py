@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmarks memory retained by a fleet snapshot with and without an `InternPool`.
+
+When executed, this script generates one output per switch of a fleet (each with a different
+seed), deserializes and normalizes every output with `loads_normalized`, then reports the memory
+retained by the snapshot and the bytes the pool reports it saved.
+
+Execute from the root of the repository with `python -m benchmarks.bench_interning`.
+"""
+
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from normalize_nxos_json import InternPool, loads_normalized
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+
+def main():
+    """Compare memory retained by a fleet snapshot with and without interning."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark memory retained by a fleet snapshot with and without interning."
+    )
+    parser.add_argument("--preset", default="eigrp-500", choices=sorted(PRESETS))
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Scale the widest table"
+    )
+    parser.add_argument(
+        "--switches", type=int, default=50, help="Number of switches in the fleet"
+    )
+    parser.add_argument(
+        "--max-cardinality",
+        type=int,
+        default=1000,
+        help="Maximum cardinality of interned values",
+    )
+    args = parser.parse_args()
+
+    levels = scale_levels(PRESETS[args.preset], args.scale)
+    documents = [
+        json.dumps(generate_payload(levels, seed=seed)) for seed in range(args.switches)
+    ]
+    for pool in (None, InternPool(args.max_cardinality)):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        snapshot = [loads_normalized(document, intern=pool) for document in documents]
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        line = (
+            f"{'interned' if pool else 'plain':>9}: {size / 1_000_000:8.1f} MB retained"
+        )
+        line += f", {elapsed * 1000:8.1f} ms"
+        if pool:
+            line += f", {pool.bytes_saved / 1_000_000:.1f} MB reported saved"
+        print(line)
+        del snapshot
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
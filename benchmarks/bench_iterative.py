@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Microbenchmarks the iterative `normalize_output_iterative` against recursive `normalize_output`.
+
+When executed, this script times both engines against wide tables (many rows, shallow nesting) and
+deep tables (few rows, heavy nesting). Deep tables are capped below the interpreter's recursion
+limit so that the recursive engine can finish.
+
+Execute from the root of the repository with `python -m benchmarks.bench_iterative`.
+"""
+
+import sys
+import json
+import timeit
+import argparse
+from normalize_nxos_json import normalize_output, normalize_output_iterative
+from benchmarks.bench_loads_normalized import build_route_output
+
+
+def build_deep_output(depth: int) -> dict:
+    """Build a data structure with `depth` levels of nested single-row tables.
+
+    Parameters
+    ----------
+    depth : int
+        Number of nested TABLE_/ROW_ levels.
+
+    Returns
+    -------
+    dict
+        Unnormalized JSON data structure.
+    """
+    data = {"leaf": "value"}
+    for level in range(depth):
+        data = {f"TABLE_level{level}": {f"ROW_level{level}": data}, "level": str(level)}
+    return data
+
+
+def time_engine(func, document: str, repeat: int, number: int) -> float:
+    """Return the best per-call time of `func` against a fresh copy of `document`, in seconds.
+
+    Copies of the document are deserialized before timing starts, since every engine normalizes
+    its input in-place.
+    """
+    timings = timeit.repeat(
+        "for data in copies: func(data)",
+        setup="copies = [json.loads(document) for _ in range(number)]",
+        globals={"func": func, "json": json, "document": document, "number": number},
+        repeat=repeat,
+        number=1,
+    )
+    return min(timings) / number
+
+
+def main():
+    """Compare recursive and iterative normalization engines."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark normalize_output_iterative against normalize_output."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    scenarios = (
+        ("wide: 100k prefixes", build_route_output(1, 100000), 1),
+        ("wide: 10 prefixes", build_route_output(1, 10), 2000),
+        ("deep: 150 levels", build_deep_output(150), 2000),
+    )
+    for name, data, number in scenarios:
+        document = json.dumps(data)
+        assert normalize_output_iterative(json.loads(document)) == normalize_output(
+            json.loads(document)
+        )
+        print(name)
+        for engine in (normalize_output, normalize_output_iterative):
+            elapsed = time_engine(engine, document, args.repeat, number)
+            print(f"{engine.__name__:>30}: {elapsed * 1_000_000:.1f} us")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmarks single-pass `loads_normalized` against `normalize_output(json.loads(...))`.
+
+When executed, this script builds a synthetic `show ip route vrf all | json` document, then reports
+how long each approach takes to deserialize and normalize it. Both approaches use the standard
+library's JSON decoder, which is the only backend `loads_normalized` uses in a single pass. See
+`benchmarks.bench_backends` to compare the other backends.
+
+Execute from the root of the repository with `python -m benchmarks.bench_loads_normalized`.
+"""
+
+import sys
+import json
+import timeit
+import argparse
+from normalize_nxos_json import normalize_output, loads_normalized, set_json_backend
+
+
+def build_route_output(vrfs: int, prefixes: int) -> dict:
+    """Build a data structure shaped like `show ip route vrf all | json` output.
+
+    Every other prefix has a single next-hop, so half of the ROW_path tables are represented as a
+    dictionary instead of a list, just like NX-OS does it.
+
+    Parameters
+    ----------
+    vrfs : int
+        Number of VRFs to create.
+    prefixes : int
+        Number of prefixes to create in each VRF.
+
+    Returns
+    -------
+    dict
+        Unnormalized JSON data structure.
+    """
+    vrf_rows = []
+    for vrf in range(vrfs):
+        prefix_rows = []
+        for prefix in range(prefixes):
+            paths = [
+                {
+                    "ipnexthop": f"10.{vrf % 256}.{path}.1",
+                    "ifname": f"Eth1/{path + 1}",
+                    "uptime": "P14DT19H11M58S",
+                    "pref": "110",
+                    "metric": "41",
+                    "clientname": "ospf-1",
+                    "ubest": "true",
+                }
+                for path in range(1 + prefix % 2)
+            ]
+            octets = (prefix // 65536 % 256, prefix // 256 % 256, prefix % 256)
+            prefix_rows.append(
+                {
+                    "ipprefix": "172.{}.{}.{}/32".format(*octets),
+                    "ucast-nhops": str(len(paths)),
+                    "mcast-nhops": "0",
+                    "attached": "false",
+                    "TABLE_path": {"ROW_path": paths[0] if len(paths) == 1 else paths},
+                }
+            )
+        vrf_rows.append(
+            {
+                "vrf-name-out": f"vrf-{vrf}",
+                "TABLE_addrf": {
+                    "ROW_addrf": {
+                        "addrf": "ipv4",
+                        "TABLE_prefix": {"ROW_prefix": prefix_rows},
+                    }
+                },
+            }
+        )
+    return {"TABLE_vrf": {"ROW_vrf": vrf_rows}}
+
+
+def two_pass(document: str) -> dict:
+    """Deserialize a JSON document, then normalize it in a separate pass."""
+    return normalize_output(json.loads(document))
+
+
+def main():
+    """Compare single-pass and two-pass deserialization and normalization."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark loads_normalized against normalize_output(json.loads(...))."
+    )
+    parser.add_argument("--vrfs", type=int, default=10, help="Number of VRFs")
+    parser.add_argument("--prefixes", type=int, default=10000, help="Prefixes per VRF")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+    # Only the standard library's decoder lets loads_normalized normalize in a single pass.
+    set_json_backend("json")
+
+    document = json.dumps(build_route_output(args.vrfs, args.prefixes))
+    assert loads_normalized(document) == two_pass(document)
+    print(f"Document size: {len(document) / 1_000_000:.1f} MB")
+    for name, func in (("two-pass", two_pass), ("loads_normalized", loads_normalized)):
+        best = min(timeit.repeat(lambda: func(document), number=1, repeat=args.repeat))
+        print(f"{name:>20}: {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
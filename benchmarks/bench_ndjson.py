@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmarks the throughput of the newline-delimited JSON mode of the command line interface.
+
+When executed, this script pipes newline-delimited records, each wrapping a small EIGRP neighbor
+output with host and command metadata, through ``python -m normalize_nxos_json --ndjson`` in a
+separate process, and reports records per second including interpreter startup.
+
+Execute from the root of the repository with `python -m benchmarks.bench_ndjson`.
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from benchmarks.payloads import PRESETS, generate_payload
+
+
+def main():
+    """Measure records per second of the newline-delimited JSON mode."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the newline-delimited JSON mode of the command line interface."
+    )
+    parser.add_argument(
+        "--records", type=int, default=50000, help="Number of records to normalize"
+    )
+    parser.add_argument(
+        "--peers", type=int, default=2, help="Number of EIGRP neighbors in each record"
+    )
+    args = parser.parse_args()
+
+    asn, vrf, peer = PRESETS["eigrp-500"]
+    levels = (
+        asn._replace(fanout=1, single_row_ratio=1.0),
+        vrf._replace(fanout=1, single_row_ratio=1.0),
+        peer._replace(fanout=args.peers),
+    )
+    output = generate_payload(levels)
+    record = json.dumps(
+        {"host": "leaf1", "command": "show ip eigrp neighbors", "output": output}
+    )
+    data = ("\n".join([record] * args.records) + "\n").encode()
+    start = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "normalize_nxos_json",
+            "--ndjson",
+            "--envelope",
+            "output",
+        ],
+        input=data,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    records = result.stdout.count(b"\n")
+    print(
+        f"{records} records ({len(data) / 1_000_000:.1f} MB) in {elapsed:.2f} s: "
+        f"{records / elapsed:,.0f} records/s"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmarks memory retained by normalized output with `Record` rows against dictionary rows.
+
+When executed, this script normalizes each payload preset with `normalize_output_iterative`, once
+with plain dictionary rows and once with `records=True`, then reports the memory retained by the
+normalized data structure and the time taken to normalize it.
+
+Execute from the root of the repository with `python -m benchmarks.bench_records`.
+"""
+
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from normalize_nxos_json import normalize_output_iterative
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+
+def measure(document: str, records: bool) -> tuple:
+    """Return the elapsed time in seconds and retained memory in bytes of normalizing `document`."""
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(document)
+    start = time.perf_counter()
+    normalize_output_iterative(data, records=records)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, size
+
+
+def main():
+    """Compare memory retained by dictionary rows and record rows."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark memory retained by Record rows against dictionary rows."
+    )
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=sorted(PRESETS),
+        help="Payload preset to benchmark. May be given more than once. Defaults to all presets.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=0.1, help="Scale the widest table"
+    )
+    args = parser.parse_args()
+
+    for preset in args.preset or sorted(PRESETS):
+        document = json.dumps(
+            generate_payload(scale_levels(PRESETS[preset], args.scale))
+        )
+        print(preset)
+        for name, records in (("dictionaries", False), ("records", True)):
+            elapsed, size = measure(document, records)
+            print(
+                f"{name:>14}: {size / 1_000_000:8.1f} MB retained, {elapsed * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Benchmarks polling switches with a new Netmiko connection per command versus reused sessions.
+
+When executed, this script starts a local SSH server on 127.0.0.1 that behaves like the CLI of an
+NX-OS switch, answering every ``| json`` command with the same synthetic EIGRP neighbor output.
+It then polls a number of "switches" (separate connections to that server) several times,
+executing several structured commands per poll through real Netmiko connections. It reports the
+total time and number of connections opened when connecting for every command with `command`,
+when reusing one `NetmikoSession` per poll, and when reusing sessions across polls with a
+`SessionPool`.
+
+Every connection performs a real SSH key exchange, password authentication, and Netmiko session
+preparation, so the time saved by reusing sessions is measured rather than modeled. Connecting
+to a real switch across a network takes longer than connecting over the loopback interface, so
+the savings against real switches are larger than those reported here.
+
+Execute from the root of the repository with `python -m benchmarks.bench_sessions`.
+"""
+
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import functools
+import threading
+import paramiko
+from netmiko import Netmiko
+from examples.netmiko_eigrp_neighbors import NetmikoSession, SessionPool
+from benchmarks.payloads import PRESETS, generate_payload, scale_levels
+
+PROMPT = "switch# "
+
+
+class _SwitchInterface(paramiko.ServerInterface):
+    """Accepts any password and opens an interactive shell, like a switch's SSH server."""
+
+    def __init__(self):
+        self.shell = threading.Event()
+
+    def get_allowed_auths(self, username: str) -> str:
+        """Offer password authentication."""
+        return "password"
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        """Accept any username and password."""
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        """Accept session channels."""
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args) -> bool:
+        """Accept pseudo-terminal requests."""
+        return True
+
+    def check_channel_shell_request(self, channel: paramiko.Channel) -> bool:
+        """Accept shell requests."""
+        self.shell.set()
+        return True
+
+
+class LocalSSHServer:
+    """SSH server on the loopback interface that emulates the CLI of an NX-OS switch.
+
+    Parameters
+    ----------
+    output : str
+        Output returned for every command ending in ``| json``. Other commands,
+        such as those Netmiko executes to prepare a session, return nothing.
+    """
+
+    def __init__(self, output: str):
+        self.output = output.replace("\n", "\r\n")
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.transports = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        """Serve every incoming connection on its own thread."""
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock: socket.socket) -> None:
+        """Run a shell session, echoing input and answering each command with a prompt."""
+        transport = paramiko.Transport(sock)
+        self.transports.append(transport)
+        transport.add_server_key(self.host_key)
+        interface = _SwitchInterface()
+        transport.start_server(server=interface)
+        channel = transport.accept(30)
+        if channel is None or not interface.shell.wait(30):
+            transport.close()
+            return
+        channel.sendall(f"\r\n{PROMPT}".encode())
+        line = ""
+        try:
+            while True:
+                data = channel.recv(4096).decode()
+                if not data:
+                    return
+                # Echo input back like a terminal, answering each complete line.
+                reply = []
+                for char in data:
+                    if char not in "\r\n":
+                        line += char
+                        reply.append(char)
+                    elif line.endswith("| json"):
+                        reply.append(f"\r\n{self.output}\r\n{PROMPT}")
+                        line = ""
+                    else:
+                        reply.append(f"\r\n{PROMPT}")
+                        line = ""
+                channel.sendall("".join(reply).encode())
+        except (OSError, EOFError):
+            return
+        finally:
+            transport.close()
+
+    def close(self) -> None:
+        """Stop accepting connections and close open ones."""
+        self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+
+class CountingFactory:
+    """Opens Netmiko connections to the local SSH server, counting them."""
+
+    def __init__(self, port: int):
+        self.connect = functools.partial(Netmiko, port=port)
+        self.connections = 0
+
+    def __call__(self, **kwargs):
+        """Open a Netmiko connection to the local SSH server."""
+        self.connections += 1
+        kwargs["host"] = "127.0.0.1"
+        return self.connect(**kwargs)
+
+
+def main():
+    """Compare polling switches with and without reusing connections."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark polling switches with and without reusing connections."
+    )
+    parser.add_argument("--switches", type=int, default=5, help="Number of switches")
+    parser.add_argument(
+        "--polls", type=int, default=3, help="Number of polls of each switch"
+    )
+    parser.add_argument(
+        "--commands", type=int, default=4, help="Number of commands per poll"
+    )
+    args = parser.parse_args()
+    # Paramiko logs an error each time a client disconnects without closing its channel first.
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+    server = LocalSSHServer(
+        json.dumps(generate_payload(scale_levels(PRESETS["eigrp-500"], 0.1)))
+    )
+    factory = CountingFactory(server.port)
+    hosts = [f"switch{index}" for index in range(args.switches)]
+    commands = [f"show command {index}" for index in range(args.commands)]
+
+    def per_command():
+        for host in hosts:
+            for cmd in commands:
+                with NetmikoSession(host, "admin", "admin", factory) as session:
+                    session.command(cmd, structured=True)
+
+    def per_poll():
+        for host in hosts:
+            with NetmikoSession(host, "admin", "admin", factory) as session:
+                for cmd in commands:
+                    session.command(cmd, structured=True)
+
+    pool = SessionPool("admin", "admin", factory)
+
+    def pooled():
+        for host in hosts:
+            for cmd in commands:
+                pool.command(host, cmd, structured=True)
+
+    try:
+        for name, poll in (
+            ("connection per command", per_command),
+            ("session per poll", per_poll),
+            ("session pool", pooled),
+        ):
+            factory.connections = 0
+            start = time.perf_counter()
+            for _ in range(args.polls):
+                poll()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>22}: {elapsed:7.2f} s, {factory.connections:4} connections")
+    finally:
+        pool.close()
+        server.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
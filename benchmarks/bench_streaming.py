@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmarks peak memory of streaming `iter_normalized_rows` against `loads_normalized`.
+
+When executed, this script writes synthetic `show ip route vrf all | json` documents of increasing
+size to a temporary file, then reports the elapsed time and peak memory (as measured by
+tracemalloc) of reading each one with both approaches. Peak memory of the streaming approach
+should stay flat as documents grow.
+
+Execute from the root of the repository with `python -m benchmarks.bench_streaming`.
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from normalize_nxos_json import loads_normalized, iter_normalized_rows
+from benchmarks.bench_loads_normalized import build_route_output
+
+
+def measure(func, path: str) -> tuple:
+    """Return the elapsed time in seconds and peak memory in bytes of `func(path)`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def load(path: str) -> None:
+    """Deserialize and normalize an entire document at once."""
+    with open(path, "rb") as f:
+        loads_normalized(f.read())
+
+
+def stream(path: str) -> None:
+    """Consume every row of a document with the streaming normalizer."""
+    with open(path, "rb") as f:
+        for _ in iter_normalized_rows(f):
+            pass
+
+
+def main():
+    """Compare peak memory of streaming and whole-document normalization."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark peak memory of iter_normalized_rows against loads_normalized."
+    )
+    parser.add_argument(
+        "--prefixes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 50000],
+        help="Prefix counts of each document",
+    )
+    args = parser.parse_args()
+
+    for prefixes in args.prefixes:
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(build_route_output(1, prefixes), f)
+            f.flush()
+            size = f.tell()
+            print(f"{prefixes} prefixes ({size / 1_000_000:.1f} MB)")
+            for name, func in (
+                ("loads_normalized", load),
+                ("iter_normalized_rows", stream),
+            ):
+                elapsed, peak = measure(func, f.name)
+                print(
+                    f"{name:>22}: {elapsed * 1000:.0f} ms, peak {peak / 1_000_000:.2f} MB"
+                )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmarks `normalize_xml` against building a complete element tree and against JSON output.
+
+When executed, this script generates a payload, renders it as both ``| xml`` and ``| json``
+output, then reports how long each approach takes and the peak memory it allocates while
+converting the output, as measured by `tracemalloc`:
+
+* `normalize_xml`, which clears each element as soon as it has been converted.
+* ``ElementTree.parse``, which only builds the complete element tree that a conversion without
+  `iterparse` would then walk.
+* `loads_normalized` on the equivalent ``| json`` output.
+
+The XML document is read from a temporary file, so it does not count towards peak memory, while
+the JSON document is already in memory, as it would be once received from a switch.
+
+Execute from the root of the repository with `python -m benchmarks.bench_xml`.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Callable
+from xml.etree import ElementTree
+from normalize_nxos_json import loads_normalized, normalize_output, normalize_xml
+from benchmarks.payloads import (
+    PRESETS,
+    generate_payload,
+    generate_xml_output,
+    scale_levels,
+)
+
+
+def measure(name: str, func: Callable[[], Any]) -> None:
+    """Print the time taken by a function, and the memory it allocates at peak and retains."""
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    # Tracing slows allocations down considerably, so memory is measured in a separate run.
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(
+        f"{name:>23}: {elapsed * 1000:8.1f} ms, {peak / 1_000_000:8.1f} MB peak, "
+        f"{retained / 1_000_000:8.1f} MB retained"
+    )
+
+
+def normalize_xml_file(path: str) -> dict:
+    """Convert a file containing XML output with `normalize_xml`."""
+    with open(path, "rb") as source:
+        return normalize_xml(source)
+
+
+def main():
+    """Compare converting XML output incrementally with the alternatives."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark normalize_xml against an element tree and JSON output."
+    )
+    parser.add_argument("--preset", default="routes-1m", choices=sorted(PRESETS))
+    parser.add_argument(
+        "--scale", type=float, default=0.05, help="Scale the widest table"
+    )
+    args = parser.parse_args()
+
+    payload = generate_payload(scale_levels(PRESETS[args.preset], args.scale))
+    document = json.dumps(payload).encode()
+    xml = generate_xml_output(payload).encode()
+    assert normalize_xml(xml) == normalize_output(payload)
+    del payload
+    print(
+        f"XML output: {len(xml) / 1_000_000:.1f} MB, "
+        f"JSON output: {len(document) / 1_000_000:.1f} MB"
+    )
+    with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as xml_file:
+        # ElementTree.parse does not tolerate the NETCONF delimiter after the document.
+        xml_file.write(xml[: xml.rindex(b"]]>]]>")])
+    del xml
+    try:
+        measure("normalize_xml", lambda: normalize_xml_file(xml_file.name))
+        measure("ElementTree.parse", lambda: ElementTree.parse(xml_file.name))
+    finally:
+        os.unlink(xml_file.name)
+    measure("loads_normalized (JSON)", lambda: loads_normalized(document))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
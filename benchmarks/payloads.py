@@ -0,0 +1,305 @@
+"""Contains a generator of synthetic NX-OS JSON data structures for benchmarking.
+
+Payloads are described as a sequence of `Level` objects, one per nested table. For example, the
+output of `show ip eigrp neighbors` has three levels: `asn`, `vrf`, and `peer`, which become the
+`TABLE_asn`/`ROW_asn`, `TABLE_vrf`/`ROW_vrf`, and `TABLE_peer`/`ROW_peer` keys.
+"""
+
+import random
+from xml.sax.saxutils import escape
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+STATES = ("FULL", "EXSTART", "EXCHANGE", "INIT", "DR", "BDR", "DROTHER")
+MAC_TYPES = ("dynamic", "static")
+CLIENTS = ("ospf-1", "bgp-65000", "eigrp-1", "direct", "local", "static")
+
+
+class Level(NamedTuple):
+    """Describes one level of nested tables in a synthetic payload.
+
+    Attributes
+    ----------
+    name : str
+        Name of the table, used for the TABLE_ and ROW_ keys.
+    fanout : int
+        Number of rows in each multi-row table at this level.
+    single_row_ratio : float
+        Fraction of tables at this level that have a single row, and are therefore represented as
+        a dictionary instead of a list.
+    row_width : int
+        Number of scalar fields in each row. Fields beyond those named in `fields` are given
+        generic names.
+    fields : Tuple[str, ...]
+        Names of the scalar fields in each row. Values are generated based upon the field name,
+        so that fields such as `peer_ipaddr`, `intf`, or `state` look realistic.
+    """
+
+    name: str
+    fanout: int
+    single_row_ratio: float = 0.0
+    row_width: int = 4
+    fields: Tuple[str, ...] = ()
+
+
+PRESETS: Dict[str, Tuple[Level, ...]] = {
+    # show ip route vrf all | json
+    "routes-1m": (
+        Level("vrf", 10, 0.0, 1, ("vrf-name-out",)),
+        Level("addrf", 1, 1.0, 1, ("addrf",)),
+        Level(
+            "prefix",
+            100000,
+            0.0,
+            4,
+            ("ipprefix", "ucast-nhops", "mcast-nhops", "attached"),
+        ),
+        Level(
+            "path",
+            2,
+            0.7,
+            7,
+            ("ipnexthop", "ifname", "uptime", "pref", "metric", "clientname", "ubest"),
+        ),
+    ),
+    # show mac address-table | json
+    "macs-100k": (
+        Level(
+            "mac_address",
+            100000,
+            0.0,
+            8,
+            (
+                "disp_mac_addr",
+                "disp_type",
+                "disp_vlan",
+                "disp_is_static",
+                "disp_age",
+                "disp_is_secure",
+                "disp_is_ntfy",
+                "disp_port",
+            ),
+        ),
+    ),
+    # show ip eigrp neighbors vrf all | json
+    "eigrp-500": (
+        Level("asn", 2, 0.0, 1, ("asn",)),
+        Level("vrf", 5, 0.0, 1, ("vrf",)),
+        Level(
+            "peer",
+            50,
+            0.0,
+            8,
+            (
+                "peer_ipaddr",
+                "peer_ifname",
+                "peer_holdtime",
+                "peer_uptime",
+                "peer_srtt",
+                "peer_rto",
+                "peer_q_cnt",
+                "peer_state",
+            ),
+        ),
+    ),
+}
+
+
+def uniform_levels(
+    depth: int, fanout: int, single_row_ratio: float = 0.0, row_width: int = 4
+) -> Tuple[Level, ...]:
+    """Return `depth` levels that all share the same fan-out, single-row ratio, and row width.
+
+    Parameters
+    ----------
+    depth : int
+        Number of nested tables.
+    fanout : int
+        Number of rows in each multi-row table.
+    single_row_ratio : float, optional
+        Fraction of tables that have a single row. Defaults to 0.0.
+    row_width : int, optional
+        Number of scalar fields in each row. Defaults to 4.
+
+    Returns
+    -------
+    Tuple[Level, ...]
+        Levels describing the payload.
+    """
+    return tuple(
+        Level(f"level{index}", fanout, single_row_ratio, row_width)
+        for index in range(depth)
+    )
+
+
+def scale_levels(levels: Sequence[Level], factor: float) -> Tuple[Level, ...]:
+    """Scale the fan-out of the widest level, such as to produce a smaller version of a preset.
+
+    Parameters
+    ----------
+    levels : Sequence[Level]
+        Levels describing the payload.
+    factor : float
+        Factor to multiply the fan-out of the widest level by.
+
+    Returns
+    -------
+    Tuple[Level, ...]
+        Levels describing the scaled payload.
+    """
+    widest = max(range(len(levels)), key=lambda index: levels[index].fanout)
+    return tuple(
+        (
+            level._replace(fanout=max(1, round(level.fanout * factor)))
+            if index == widest
+            else level
+        )
+        for index, level in enumerate(levels)
+    )
+
+
+def _field_value(field: str, index: int, rng: random.Random) -> str:
+    """Return a realistic value for a field based upon its name."""
+    if "mac" in field:
+        return "{:04x}.{:04x}.{:04x}".format(
+            0x0050, index // 65536 % 65536, index % 65536
+        )
+    if field == "addrf":
+        return "ipv4"
+    if "addr" in field or "nexthop" in field or field == "rid":
+        return "10.{}.{}.{}".format(
+            index // 65536 % 256, index // 256 % 256, index % 256
+        )
+    if "prefix" in field:
+        return "172.{}.{}.{}/32".format(
+            index // 65536 % 256, index // 256 % 256, index % 256
+        )
+    if "if" in field or "port" in field or field == "intf":
+        return f"Eth1/{rng.randint(1, 48)}"
+    if "vlan" in field:
+        return str(rng.randint(1, 100))
+    if "state" in field:
+        return rng.choice(STATES)
+    if "uptime" in field:
+        return "P{}DT{}H{}M{}S".format(
+            rng.randint(0, 30),
+            rng.randint(0, 23),
+            rng.randint(0, 59),
+            rng.randint(0, 59),
+        )
+    if "type" in field:
+        return rng.choice(MAC_TYPES)
+    if field.startswith("disp_is") or field in ("attached", "ubest"):
+        return rng.choice(("true", "false"))
+    if field in ("vrf", "vrf-name-out", "cname"):
+        return "default" if index == 0 else f"vrf-{index}"
+    if field == "asn":
+        return str(index + 1)
+    if field == "clientname":
+        return rng.choice(CLIENTS)
+    if "name" in field:
+        return f"{field}-{index}"
+    return str(rng.randint(0, 1000))
+
+
+def generate_payload(levels: Sequence[Level], seed: int = 0) -> dict:
+    """Generate an unnormalized NX-OS JSON data structure with nested tables.
+
+    Parameters
+    ----------
+    levels : Sequence[Level]
+        Levels describing the payload, outermost first.
+    seed : int, optional
+        Seed of the random number generator, so that payloads are reproducible. Defaults to 0.
+
+    Returns
+    -------
+    dict
+        Unnormalized JSON data structure.
+    """
+    rng = random.Random(seed)
+    counters = [0] * len(levels)
+    root: Dict[str, Any] = {}
+    # Each entry is a dictionary that should receive the table at the given level.
+    stack: List[Tuple[dict, int]] = [(root, 0)]
+    while stack:
+        parent, depth = stack.pop()
+        level = levels[depth]
+        names = level.fields[: level.row_width] + tuple(
+            f"{level.name}_field{index}"
+            for index in range(len(level.fields), level.row_width)
+        )
+        single = level.fanout == 1 or rng.random() < level.single_row_ratio
+        rows = []
+        for _ in range(1 if single else level.fanout):
+            row = {name: _field_value(name, counters[depth], rng) for name in names}
+            counters[depth] += 1
+            rows.append(row)
+            if depth + 1 < len(levels):
+                stack.append((row, depth + 1))
+        parent[f"TABLE_{level.name}"] = {
+            f"ROW_{level.name}": rows[0] if single else rows
+        }
+    return root
+
+
+def _iter_xml_elements(data: dict) -> Iterator[str]:
+    """Yield the XML elements representing the keys of a JSON data structure, piece by piece."""
+    for key, value in data.items():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                yield f"<{key}>"
+                yield from _iter_xml_elements(item)
+                yield f"</{key}>"
+            else:
+                yield f"<{key}>{escape(str(item))}</{key}>"
+
+
+def generate_xml_output(data: dict, command: str = "show ip eigrp neighbors") -> str:
+    """Convert a JSON data structure into the ``| xml`` output NX-OS would return for it.
+
+    Every element of a list becomes a separate element with the same name, so single-row and
+    multi-row tables look alike, just like they do in NX-OS XML output.
+
+    Parameters
+    ----------
+    data : dict
+        JSON data structure, such as one returned by `generate_payload`.
+    command : str, optional
+        Command whose words are nested around the data, as NX-OS does. Defaults to
+        ``"show ip eigrp neighbors"``.
+
+    Returns
+    -------
+    str
+        XML document, including the NETCONF delimiter that follows it.
+    """
+    words = command.split()
+    return "".join(
+        [
+            '<?xml version="1.0" encoding="ISO-8859-1"?>\n',
+            '<nf:rpc-reply xmlns:nf="urn:ietf:params:xml:ns:netconf:base:1.0" '
+            'xmlns="http://www.cisco.com/nxos:1.0">',
+            "<nf:data>",
+            *(f"<{word}>" for word in words),
+            "<__readonly__>",
+            *_iter_xml_elements(data),
+            "</__readonly__>",
+            *(f"</{word}>" for word in reversed(words)),
+            "</nf:data>",
+            "</nf:rpc-reply>\n]]>]]>\n",
+        ]
+    )
+
+
+def count_nodes(data: Any) -> int:
+    """Return the number of dictionaries, lists, and scalar values in a data structure."""
+    nodes = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return nodes
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Measures the throughput of every normalization engine against synthetic NX-OS payloads.
+
+When executed, this script generates each requested payload preset (see `benchmarks.payloads`),
+then reports operations per second, nanoseconds per node, and peak memory of every engine in
+`ENGINES`. Results can be saved as JSON and compared against the results of an earlier run.
+
+Execute from the root of the repository with `python -m benchmarks.suite`. For example, to run a
+tenth of every preset and compare against an earlier run:
+
+    python -m benchmarks.suite --scale 0.1 --output new.json --compare old.json
+"""
+
+import io
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from normalize_nxos_json import (
+    InternPool,
+    normalize_output,
+    normalize_output_iterative,
+    loads_normalized,
+    iter_normalized_rows,
+    compile_normalizer,
+    NormalizedView,
+    normalized_copy,
+    infer_field_types,
+    normalize_xml,
+    available_json_backends,
+    set_json_backend,
+)
+from benchmarks.payloads import (
+    PRESETS,
+    count_nodes,
+    generate_payload,
+    generate_xml_output,
+    scale_levels,
+    uniform_levels,
+)
+
+
+class Engine(NamedTuple):
+    """Describes a normalization engine to benchmark.
+
+    Attributes
+    ----------
+    name : str
+        Name of the engine as reported in results.
+    accepts_document : bool
+        Whether the engine is given the serialized JSON document as bytes, instead of a freshly
+        deserialized data structure.
+    build : Callable[[bytes], Callable[[Any], Any]]
+        Given the serialized JSON document of a payload, returns the function to time. Any setup
+        work (such as compiling a normalizer) happens here, outside of timing.
+    """
+
+    name: str
+    accepts_document: bool
+    build: Callable[[bytes], Callable[[Any], Any]]
+
+
+def _walk(data: Any) -> None:
+    """Access every value of a data structure, such as to force a lazy view to normalize it all."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (dict, NormalizedView)):
+            stack.extend(node.values())
+        elif not isinstance(node, str) and hasattr(node, "__len__"):
+            stack.extend(node)
+
+
+def _two_pass(document: bytes) -> dict:
+    """Deserialize a document, then normalize it in a separate pass."""
+    return normalize_output(json.loads(document))
+
+
+def _stream(document: bytes) -> None:
+    """Consume every row of a document with the streaming normalizer."""
+    deque(iter_normalized_rows(io.BytesIO(document)), maxlen=0)
+
+
+def _xml_engine(document: bytes) -> Callable[[Any], dict]:
+    """Render a payload as ``| xml`` output, returning a function that converts it.
+
+    The function ignores the JSON document it is given, and converts the XML document instead.
+    """
+    xml = generate_xml_output(json.loads(document)).encode()
+    return lambda data: normalize_xml(xml)
+
+
+ENGINES: List[Engine] = [
+    Engine("normalize_output", False, lambda document: normalize_output),
+    Engine(
+        "normalize_output_iterative", False, lambda document: normalize_output_iterative
+    ),
+    Engine(
+        "normalize_output_iterative (records)",
+        False,
+        lambda document: lambda data: normalize_output_iterative(data, records=True),
+    ),
+    Engine(
+        "normalize_output_iterative (coerce)",
+        False,
+        lambda document: lambda data, types=infer_field_types([json.loads(document)]): (
+            normalize_output_iterative(data, coerce=types)
+        ),
+    ),
+    Engine(
+        "compile_normalizer",
+        False,
+        lambda document: compile_normalizer(
+            "benchmark", samples=[json.loads(document)]
+        ),
+    ),
+    Engine("normalized_copy", False, lambda document: normalized_copy),
+    Engine(
+        "NormalizedView (full walk)",
+        False,
+        lambda document: lambda data: _walk(NormalizedView(data)),
+    ),
+    Engine("json.loads + normalize_output", True, lambda document: _two_pass),
+    Engine("loads_normalized", True, lambda document: loads_normalized),
+    Engine(
+        "loads_normalized (interned)",
+        True,
+        lambda document: lambda data: loads_normalized(data, intern=InternPool()),
+    ),
+    Engine("iter_normalized_rows", True, lambda document: _stream),
+    Engine("normalize_xml", True, _xml_engine),
+]
+
+
+def benchmark(
+    engine: Engine, document: bytes, nodes: int, repeat: int, memory: bool
+) -> Dict[str, Any]:
+    """Benchmark a single engine against a single payload.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine to benchmark.
+    document : bytes
+        Serialized JSON document of the payload.
+    nodes : int
+        Number of dictionaries, lists, and scalar values in the payload.
+    repeat : int
+        Number of timed runs. The fastest run is reported.
+    memory : bool
+        Whether to measure peak memory with an additional, untimed run.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Results of the benchmark.
+    """
+    func = engine.build(document)
+    timings = []
+    for _ in range(repeat):
+        data = document if engine.accepts_document else json.loads(document)
+        gc.collect()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+        del data
+    best = min(timings)
+    peak: Optional[int] = None
+    if memory:
+        data = document if engine.accepts_document else json.loads(document)
+        gc.collect()
+        tracemalloc.start()
+        func(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del data
+    return {
+        "engine": engine.name,
+        "runs": repeat,
+        "best_seconds": best,
+        "ops_per_sec": 1 / best if best else None,
+        "ns_per_node": best * 1e9 / nodes,
+        "peak_bytes": peak,
+    }
+
+
+def main():
+    """Benchmark every normalization engine against every requested payload."""
+    parser = argparse.ArgumentParser(
+        description="Measure throughput of every normalization engine against synthetic payloads."
+    )
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=sorted(PRESETS),
+        help="Payload preset to benchmark. May be given more than once. Defaults to all presets.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Scale the widest table of each preset"
+    )
+    parser.add_argument(
+        "--depth", type=int, help="Benchmark a custom payload of this depth"
+    )
+    parser.add_argument(
+        "--fanout", type=int, default=10, help="Fan-out of a custom payload"
+    )
+    parser.add_argument(
+        "--single-row-ratio",
+        type=float,
+        default=0.5,
+        help="Single-row ratio of a custom payload",
+    )
+    parser.add_argument(
+        "--row-width", type=int, default=4, help="Row width of a custom payload"
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=[engine.name for engine in ENGINES],
+        help="Engine to benchmark. May be given more than once. Defaults to all engines.",
+    )
+    parser.add_argument(
+        "--json-backend",
+        default="json",
+        choices=available_json_backends(),
+        help="JSON backend used by engines given the serialized document. Defaults to json, "
+        "the standard library, which is the only backend loads_normalized deserializes and "
+        "normalizes in a single pass with.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip measuring peak memory"
+    )
+    parser.add_argument("--output", help="Save results as JSON to this file")
+    parser.add_argument(
+        "--compare", help="Compare results against those saved in this file"
+    )
+    args = parser.parse_args()
+    set_json_backend(args.json_backend)
+    print(f"JSON backend: {args.json_backend}")
+
+    payloads = {}
+    if args.depth:
+        payloads["custom"] = uniform_levels(
+            args.depth, args.fanout, args.single_row_ratio, args.row_width
+        )
+    if args.preset or not args.depth:
+        for preset in args.preset or sorted(PRESETS):
+            payloads[preset] = scale_levels(PRESETS[preset], args.scale)
+    engines = [
+        engine for engine in ENGINES if not args.engine or engine.name in args.engine
+    ]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            for result in json.load(f)["results"]:
+                baseline[(result["payload"], result["engine"])] = result
+
+    results = []
+    for name, levels in payloads.items():
+        data = generate_payload(levels)
+        nodes = count_nodes(data)
+        document = json.dumps(data).encode()
+        del data
+        print(f"{name}: {nodes} nodes, {len(document) / 1_000_000:.1f} MB")
+        for engine in engines:
+            result = benchmark(engine, document, nodes, args.repeat, not args.no_memory)
+            result.update(payload=name, nodes=nodes, document_bytes=len(document))
+            results.append(result)
+            line = (
+                f"{engine.name:>38}: {result['ops_per_sec']:10.2f} ops/s"
+                f" {result['ns_per_node']:8.1f} ns/node"
+            )
+            if result["peak_bytes"] is not None:
+                line += f" {result['peak_bytes'] / 1_000_000:9.2f} MB peak"
+            previous = baseline.get((name, engine.name))
+            if previous:
+                line += f" ({previous['best_seconds'] / result['best_seconds']:.2f}x)"
+            print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "json_backend": args.json_backend,
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
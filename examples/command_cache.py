@@ -0,0 +1,278 @@
+"""Contains an example of caching the output of commands executed on switches.
+
+Dashboards and checks often ask for the same output from the same switch within seconds of each
+other. `CommandCache` sits in front of the `command()` functions of the other examples, so that
+only the first request within a command's time to live reaches the switch.
+
+Tests for this module can be found in the ./tests/examples/test_command_cache.py file.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import sys
+import time
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a command's output, in bytes.
+
+    Parameters
+    ----------
+    value : Any
+        Raw CLI output or JSON data structure.
+
+    Returns
+    -------
+    int
+        Approximate number of bytes used by `value` and everything it contains.
+    """
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return size
+
+
+class _Fetch:
+    """Tracks a fetch that concurrent identical requests are waiting on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CommandCache:
+    """Caches the output of commands by switch and command, with a time to live per command.
+
+    Outputs are evicted once their time to live has expired, or once the
+    cache is larger than `max_bytes`, starting with the least recently used.
+    Concurrent requests for the same command on the same switch share a single
+    fetch. Cached outputs are shared by every request, so they should not be
+    modified.
+
+    Parameters
+    ----------
+    default_ttl : float, optional
+        Seconds outputs of commands without an entry in `ttls` are cached
+        for. Defaults to 30.
+    ttls : Optional[Dict[str, float]], optional
+        Seconds outputs of specific commands are cached for, such as
+        ``{"show version": 3600}``. Defaults to None.
+    max_bytes : int, optional
+        Approximate maximum size of every cached output combined. Defaults to
+        64 MB.
+    sizeof : Callable[[Any], int], optional
+        Function that estimates the size of an output. Defaults to
+        `estimate_size`.
+    clock : Callable[[], float], optional
+        Function that returns the current time in seconds. Defaults to
+        `time.monotonic`.
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served from the cache.
+    misses : int
+        Number of requests that fetched output.
+    coalesced : int
+        Number of requests that waited on another request's fetch.
+    evictions : int
+        Number of outputs evicted to stay within `max_bytes`.
+    size : int
+        Approximate size of every cached output combined.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 30.0,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = 64_000_000,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.size = 0
+        # Maps (host, command) to (expiry, size, output), least recently used first.
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Any]]" = (
+            OrderedDict()
+        )
+        self._fetches: Dict[Tuple[str, str], _Fetch] = {}
+        self._async_fetches: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached outputs."""
+        return len(self._entries)
+
+    def _lookup(self, key: Tuple[str, str]) -> Tuple[bool, Any]:
+        """Return whether an unexpired output is cached for a key, and the output if so.
+
+        Must be called with the lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expiry, size, value = entry
+        if expiry <= self.clock():
+            del self._entries[key]
+            self.size -= size
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def _store(self, key: Tuple[str, str], value: Any) -> None:
+        """Cache an output, evicting least recently used outputs to make room for it."""
+        size = self.sizeof(value)
+        expiry = self.clock() + self.ttls.get(key[1], self.default_ttl)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (expiry, size, value)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def get(self, host: str, command: str, fetch: Callable[[], Any]) -> Any:
+        """Return the output of a command on a switch, fetching it if it is not cached.
+
+        If another thread is already fetching the same command from the same
+        switch, this waits for that fetch instead of starting another one.
+        Exceptions raised by `fetch` are raised to every waiting request, and
+        nothing is cached.
+
+        Parameters
+        ----------
+        host : str
+            IP address or FQDN of the Nexus switch.
+        command : str
+            Command whose output is requested.
+        fetch : Callable[[], Any]
+            Function that executes the command on the switch, such as
+            ``lambda: command(host, username, password, cmd, structured=True)``.
+
+        Returns
+        -------
+        Any
+            Output of the command.
+        """
+        key = (host, command)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            pending = self._fetches.get(key)
+            if pending is None:
+                pending = self._fetches[key] = _Fetch()
+                self.misses += 1
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+        try:
+            pending.value = fetch()
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        else:
+            self._store(key, pending.value)
+            return pending.value
+        finally:
+            with self._lock:
+                del self._fetches[key]
+            pending.done.set()
+
+    async def aget(
+        self, host: str, command: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the output of a command on a switch, fetching it asynchronously if needed.
+
+        This is the asynchronous equivalent of `get`, for use with coroutines
+        such as the `command()` function of the Scrapli example. Requests are
+        only coalesced with other requests on the same event loop.
+
+        Parameters
+        ----------
+        host : str
+            IP address or FQDN of the Nexus switch.
+        command : str
+            Command whose output is requested.
+        fetch : Callable[[], Awaitable[Any]]
+            Function that returns an awaitable executing the command on the
+            switch.
+
+        Returns
+        -------
+        Any
+            Output of the command.
+        """
+        key = (host, command)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            pending = self._async_fetches.get(key)
+            if pending is None:
+                pending = self._async_fetches[key] = asyncio.ensure_future(fetch())
+                pending.add_done_callback(functools.partial(self._fetched, key))
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        # Shield the shared fetch so that a cancelled request does not cancel it for others.
+        return await asyncio.shield(pending)
+
+    def _fetched(self, key: Tuple[str, str], pending: "asyncio.Future") -> None:
+        """Cache the output of a finished asynchronous fetch, even if no request awaits it."""
+        with self._lock:
+            del self._async_fetches[key]
+        if not pending.cancelled() and pending.exception() is None:
+            self._store(key, pending.result())
+
+    def invalidate(
+        self, host: Optional[str] = None, command: Optional[str] = None
+    ) -> None:
+        """Evict cached outputs of a switch, of a command, or of everything.
+
+        Parameters
+        ----------
+        host : Optional[str], optional
+            Evict only outputs of this switch. Defaults to None.
+        command : Optional[str], optional
+            Evict only outputs of this command. Defaults to None.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if host in (None, key[0]) and command in (None, key[1])
+            ]
+            for key in keys:
+                self.size -= self._entries.pop(key)[1]
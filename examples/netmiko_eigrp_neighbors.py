@@ -9,12 +9,247 @@ Tests for this script can be found in the ./tests/examples/test_netmiko_eigrp_ne
 This script was tested in CML2.1 with Nexus 9000v switches running NX-OS 9.3(7).
 """
 
-from typing import Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+import os
 import sys
 import json
+import time
 import argparse
+import threading
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from netmiko import Netmiko
 
+# Netmiko's timeouts for each phase of connecting to a switch: opening the TCP connection,
+# waiting for the SSH banner, and waiting for authentication (which Paramiko defaults to 30).
+_CONNECT_TIMEOUTS = {"conn_timeout": 10.0, "banner_timeout": 15.0, "auth_timeout": 30.0}
+
+
+class NetmikoSession:
+    """Keeps a single remote connection to a switch open for many commands via Netmiko.
+
+    Opening an SSH connection requires a key exchange and authentication, which
+    often takes longer than executing a command. A session connects to its
+    switch the first time a command is executed and reuses that connection
+    for every following command until it is closed. Sessions can be used as
+    context managers, which close them on exit.
+
+    Sessions can be shared by threads. Commands are executed one at a time,
+    so that output of commands from different threads is never interleaved
+    on the connection.
+
+    Parameters
+    ----------
+    host : str
+        IP address or FQDN of Nexus switch to connect to via Netmiko.
+    username : str
+        Username to use to log into Nexus switch.
+    password : str
+        Password to use to log into Nexus switch.
+    connection_factory : Callable[..., Any], optional
+        Function that opens a connection, called with the same keyword
+        arguments as `Netmiko`. Defaults to `Netmiko`.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        connection_factory: Callable[..., Any] = Netmiko,
+    ):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.connection_factory = connection_factory
+        self.connection: Optional[Any] = None
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "NetmikoSession":
+        """Return the session."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the session."""
+        self.close()
+
+    def connect(self, timeout: Optional[float] = None) -> Any:
+        """Return the connection to the switch, connecting if it is not already connected.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum seconds to wait for each phase of connecting: opening the
+            TCP connection, receiving the SSH banner, and authenticating.
+            Netmiko's own timeouts are used for phases where they are
+            shorter. Defaults to None, in which case only Netmiko's timeouts
+            apply.
+
+        Returns
+        -------
+        Any
+            Netmiko connection to the switch.
+        """
+        with self._lock:
+            if self.connection is None:
+                timeouts = {
+                    name: default if timeout is None else min(default, timeout)
+                    for name, default in _CONNECT_TIMEOUTS.items()
+                }
+                self.connection = self.connection_factory(
+                    device_type="cisco_nxos",
+                    host=self.host,
+                    username=self.username,
+                    password=self.password,
+                    **timeouts,
+                )
+            return self.connection
+
+    def command(
+        self, cmd: str, structured: bool = False, read_timeout: Optional[float] = None
+    ) -> Union[str, dict]:
+        """Execute a command through the session's connection to the switch.
+
+        Parameters
+        ----------
+        cmd : str
+            Command to execute through Netmiko.
+        structured : bool, optional
+            Indicates whether structured JSON output should be returned instead
+            of plaintext. Defaults to False.
+        read_timeout : Optional[float], optional
+            Seconds to wait for the command's output. Defaults to None, in
+            which case Netmiko's default is used.
+
+        Returns
+        -------
+        Union[str, dict]
+            NX-OS CLI output. A string indicates raw CLI output. A dictionary
+            indicates structured output through a JSON data structure.
+        """
+        kwargs = {} if read_timeout is None else {"read_timeout": read_timeout}
+        with self._lock:
+            conn = self.connect()
+            if structured:
+                output = conn.send_command(f"{cmd} | json", **kwargs)
+            else:
+                return conn.send_command(cmd, **kwargs)
+        return normalize_output(json.loads(output))
+
+    def close(self) -> None:
+        """Disconnect from the switch, if connected."""
+        with self._lock:
+            if self.connection is not None:
+                connection, self.connection = self.connection, None
+                connection.disconnect()
+
+
+class SessionPool:
+    """Keeps one `NetmikoSession` open per switch so that repeated polls skip connecting.
+
+    Sessions whose connections have been closed by the switch, such as
+    after an idle timeout, are transparently reconnected. Pools can be used as
+    context managers, which close every session on exit.
+
+    Parameters
+    ----------
+    username : str
+        Username to use to log into Nexus switches.
+    password : str
+        Password to use to log into Nexus switches.
+    connection_factory : Callable[..., Any], optional
+        Function that opens a connection, called with the same keyword
+        arguments as `Netmiko`. Defaults to `Netmiko`.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        connection_factory: Callable[..., Any] = Netmiko,
+    ):
+        self.username = username
+        self.password = password
+        self.connection_factory = connection_factory
+        self.sessions: Dict[str, NetmikoSession] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SessionPool":
+        """Return the pool."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close every session in the pool."""
+        self.close()
+
+    def session(self, host: str) -> NetmikoSession:
+        """Return the session for a switch, opening one if none is open.
+
+        Parameters
+        ----------
+        host : str
+            IP address or FQDN of Nexus switch to connect to via Netmiko.
+
+        Returns
+        -------
+        NetmikoSession
+            Session for the switch.
+        """
+        with self._lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self.sessions[host] = NetmikoSession(
+                    host, self.username, self.password, self.connection_factory
+                )
+        if session.connection is not None and not session.connection.is_alive():
+            session.close()
+        return session
+
+    def command(
+        self, host: str, cmd: str, structured: bool = False
+    ) -> Union[str, dict]:
+        """Execute a command on a switch through its pooled session.
+
+        Parameters
+        ----------
+        host : str
+            IP address or FQDN of Nexus switch to connect to via Netmiko.
+        cmd : str
+            Command to execute through Netmiko.
+        structured : bool, optional
+            Indicates whether structured JSON output should be returned instead
+            of plaintext. Defaults to False.
+
+        Returns
+        -------
+        Union[str, dict]
+            NX-OS CLI output. A string indicates raw CLI output. A dictionary
+            indicates structured output through a JSON data structure.
+        """
+        return self.session(host).command(cmd, structured=structured)
+
+    def close(self) -> None:
+        """Close every session in the pool."""
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+
 
 def command(
     host: str, username: str, password: str, cmd: str, structured: bool = False
@@ -22,7 +257,8 @@ def command(
     """Execute a command through a remote connection to a switch via Netmiko.
 
     This function connects to a switch using parameters `host`, `username`, and `password`. Then,
-    this function executes an NX-OS CLI command using Netmiko.
+    this function executes an NX-OS CLI command using Netmiko. To execute many commands, use a
+    `NetmikoSession` or `SessionPool` instead, which avoid connecting for every command.
 
     Parameters
     ----------
@@ -44,12 +280,195 @@ def command(
         NX-OS CLI output. A string indicates raw CLI output. A dictionary
         indicates structured output through a JSON data structure.
     """
-    with Netmiko(
-        device_type="cisco_nxos", host=host, username=username, password=password
-    ) as conn:
-        if structured:
-            return normalize_output(json.loads(conn.send_command(f"{cmd} | json")))
-        return conn.send_command(cmd)
+    with NetmikoSession(host, username, password) as session:
+        return session.command(cmd, structured=structured)
+
+
+class HostResult(NamedTuple):
+    """Describes the result of executing a command on a switch of a fleet.
+
+    Attributes
+    ----------
+    host : str
+        IP address or FQDN of the Nexus switch the command was executed on.
+    command : str
+        Command that was executed.
+    output : Union[str, dict, None]
+        NX-OS CLI output, or None if the command failed. A string indicates
+        raw CLI output. A dictionary indicates normalized structured output.
+    error : Optional[BaseException]
+        Exception raised while connecting to the switch, executing the
+        command, or parsing its output, or None if the command succeeded.
+        Commands that were not executed before the switch's deadline expired
+        have a `TimeoutError`.
+    elapsed : float
+        Seconds between the start of collection from the switch and the
+        completion of the command.
+    """
+
+    host: str
+    command: str
+    output: Union[str, dict, None]
+    error: Optional[BaseException]
+    elapsed: float
+
+
+def parse_structured_output(output: str) -> dict:
+    """Deserialize and normalize structured output, such as in a worker process.
+
+    Parameters
+    ----------
+    output : str
+        JSON text returned by NX-OS.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    return normalize_output(json.loads(output))
+
+
+def collect_host(
+    pool: SessionPool,
+    host: str,
+    commands: Sequence[str],
+    structured: bool = True,
+    deadline: Optional[float] = None,
+    parse_pool: Optional[Executor] = None,
+) -> List[HostResult]:
+    """Execute commands on a switch through its pooled session.
+
+    Structured output is deserialized and normalized by `parse_pool`, if
+    given, so that parsing large outputs does not hold the GIL in the calling
+    thread.
+
+    Parameters
+    ----------
+    pool : SessionPool
+        Pool of sessions to use.
+    host : str
+        IP address or FQDN of Nexus switch to connect to via Netmiko.
+    commands : Sequence[str]
+        Commands to execute, in order.
+    structured : bool, optional
+        Indicates whether structured JSON output should be returned instead
+        of plaintext. Defaults to True.
+    deadline : Optional[float], optional
+        Seconds allowed for executing every command on the switch. Each
+        phase of connecting times out after the deadline at most, commands
+        are not started once the deadline has expired, and each command's
+        output is only waited for until the deadline. Defaults to None, in
+        which case there is no deadline.
+    parse_pool : Optional[Executor], optional
+        Executor that deserializes and normalizes structured output. Defaults
+        to None, in which case output is parsed in the calling thread.
+
+    Returns
+    -------
+    List[HostResult]
+        Result of each command, in order.
+    """
+    start = time.monotonic()
+    results: List[HostResult] = []
+    session = pool.session(host)
+    try:
+        session.connect(timeout=deadline)
+    except Exception as exc:
+        return [
+            HostResult(host, cmd, None, exc, time.monotonic() - start)
+            for cmd in commands
+        ]
+    for cmd in commands:
+        remaining = None if deadline is None else deadline - (time.monotonic() - start)
+        if remaining is not None and remaining <= 0:
+            error: Optional[BaseException] = TimeoutError(
+                f"Deadline for {host} expired"
+            )
+            results.append(HostResult(host, cmd, None, error, time.monotonic() - start))
+            continue
+        try:
+            if not structured:
+                output: Union[str, dict] = session.command(cmd, read_timeout=remaining)
+            else:
+                raw = session.command(f"{cmd} | json", read_timeout=remaining)
+                if parse_pool is None:
+                    output = parse_structured_output(raw)
+                else:
+                    output = parse_pool.submit(parse_structured_output, raw).result()
+        except Exception as exc:
+            results.append(HostResult(host, cmd, None, exc, time.monotonic() - start))
+        else:
+            results.append(
+                HostResult(host, cmd, output, None, time.monotonic() - start)
+            )
+    return results
+
+
+def collect_fleet(
+    hosts: Sequence[str],
+    commands: Sequence[str],
+    pool: SessionPool,
+    workers: int = 16,
+    deadline: Optional[float] = None,
+    ordered: bool = False,
+    structured: bool = True,
+    parse_pool: Optional[Executor] = None,
+) -> Iterator[HostResult]:
+    """Execute commands across many switches in parallel threads via Netmiko.
+
+    Netmiko spends most of its time blocked on the network, so each switch is
+    handled by a thread of a thread pool, executing its commands through its
+    pooled session. Deserializing and normalizing structured output is CPU
+    bound, so it is handed to `parse_pool`. A process pool keeps the GIL from
+    serializing parsing across threads.
+
+    Parameters
+    ----------
+    hosts : Sequence[str]
+        IP addresses or FQDNs of Nexus switches to connect to via Netmiko.
+    commands : Sequence[str]
+        Commands to execute on every switch.
+    pool : SessionPool
+        Pool of sessions to use, which may be reused across calls.
+    workers : int, optional
+        Number of switches to collect from at the same time. Defaults to 16.
+    deadline : Optional[float], optional
+        Seconds allowed for executing every command on each switch. See
+        `collect_host` for details. Defaults to None, in which case there is
+        no deadline.
+    ordered : bool, optional
+        Indicates whether results should be yielded in the order of `hosts`
+        instead of as soon as each switch has completed. Defaults to False.
+    structured : bool, optional
+        Indicates whether structured JSON output should be returned instead
+        of plaintext. Defaults to True.
+    parse_pool : Optional[Executor], optional
+        Executor that deserializes and normalizes structured output, such as
+        a `ProcessPoolExecutor`. Defaults to None, in which case output is
+        parsed in the thread that collected it.
+
+    Yields
+    ------
+    HostResult
+        Result of executing a command on a switch, with the results of each
+        switch yielded together in the order of `commands`.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                collect_host, pool, host, commands, structured, deadline, parse_pool
+            )
+            for host in hosts
+        ]
+        try:
+            for future in futures if ordered else as_completed(futures):
+                yield from future.result()
+        finally:
+            # Do not start collecting from remaining switches if the caller
+            # stops consuming results early.
+            for future in futures:
+                future.cancel()
 
 
 def normalize_output(input: dict) -> dict:
@@ -183,13 +602,16 @@ def get_number_of_eigrp_neighbors(data: dict) -> int:
 
 
 def main():
-    """Gather and report the quantity of EIGRP neighbors on a remote switch."""
+    """Gather and report the quantity of EIGRP neighbors on one or more remote switches."""
     parser = argparse.ArgumentParser(
-        description="Gather and report the quantity of EIGRP neighbors on a remote switch."
+        description="Gather and report the quantity of EIGRP neighbors on one or more remote "
+        "switches."
     )
 
     # Required arguments
-    parser.add_argument("host", metavar="IP or FQDN of NX-OS device", action="store")
+    parser.add_argument(
+        "hosts", metavar="IP or FQDN of NX-OS device", nargs="+", action="store"
+    )
     parser.add_argument(
         "username", metavar="Username to log into Nexus switch", action="store"
     )
@@ -197,16 +619,47 @@ def main():
         "password", metavar="Password to log into Nexus switch", action="store"
     )
 
-    args = parser.parse_args()
-    eigrp_output = command(
-        host=args.host,
-        username=args.username,
-        password=args.password,
-        cmd="show ip eigrp neighbors",
-        structured=True,
+    # Optional arguments
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of switches to collect from at the same time. Defaults to 16.",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Seconds allowed per switch. Defaults to no deadline.",
     )
-    number_of_neighbors = get_number_of_eigrp_neighbors(eigrp_output)
-    print(f"This switch has {number_of_neighbors} EIGRP neighbors.")
+
+    args = parser.parse_args()
+    if len(args.hosts) == 1:
+        eigrp_output = command(
+            host=args.hosts[0],
+            username=args.username,
+            password=args.password,
+            cmd="show ip eigrp neighbors",
+            structured=True,
+        )
+        number_of_neighbors = get_number_of_eigrp_neighbors(eigrp_output)
+        print(f"This switch has {number_of_neighbors} EIGRP neighbors.")
+        return
+    with SessionPool(args.username, args.password) as pool, ProcessPoolExecutor(
+        max_workers=os.cpu_count()
+    ) as parse_pool:
+        for result in collect_fleet(
+            args.hosts,
+            ["show ip eigrp neighbors"],
+            pool,
+            workers=args.workers,
+            deadline=args.deadline,
+            parse_pool=parse_pool,
+        ):
+            if result.error is not None:
+                print(f"{result.host}: failed: {result.error!r}", file=sys.stderr)
+            else:
+                number_of_neighbors = get_number_of_eigrp_neighbors(result.output)
+                print(f"{result.host} has {number_of_neighbors} EIGRP neighbors.")
 
 
 if __name__ == "__main__":
@@ -9,19 +9,140 @@ Tests for this script can be found in the ./tests/examples/test_on_box_eigrp_nei
 This script was tested in CML2.1 with Nexus 9000v switches running NX-OS 9.3(7).
 """
 
-from typing import Union
+from typing import Any, Callable, List, Optional, Sequence, Union
 import sys
 import json
 
 
+class OnBoxExecutor:
+    """Executes commands through NX-OS CLI libraries, optionally batching several commands.
+
+    NX-OS CLI Python libraries are imported the first time a command is
+    executed instead of at the module level, so that unit testing outside of
+    a Nexus switch is easier. The imported functions are kept, so later
+    commands do not import them again.
+
+    Every execution of a command through NX-OS CLI libraries is a separate
+    round trip to the CLI back-end. `batch` executes several show commands in
+    a single round trip by separating them with semicolons, then splits the
+    concatenated JSON output into one normalized data structure per command.
+    """
+
+    def __init__(self):
+        self._cli: Optional[Callable[[str], str]] = None
+        self._clid: Optional[Callable[[str], str]] = None
+
+    def _bind(self) -> None:
+        """Import NX-OS CLI libraries, if they have not been imported yet."""
+        if self._cli is None:
+            from cli import cli, clid
+
+            self._cli, self._clid = cli, clid
+
+    def command(self, cmd: str, structured: bool = False) -> Union[str, dict]:
+        """Execute a command through NX-OS CLI libraries.
+
+        Parameters
+        ----------
+        cmd : str
+            Command to execute through NX-OS CLI libraries.
+        structured : bool, optional
+            Indicates whether structured JSON output should be returned instead
+            of plaintext. Defaults to False.
+
+        Returns
+        -------
+        Union[str, dict]
+            NX-OS CLI output. A string indicates raw CLI output. A dictionary
+            indicates structured output through a JSON data structure.
+        """
+        self._bind()
+        if structured:
+            return normalize_output(json.loads(self._clid(cmd)))
+        return self._cli(cmd)
+
+    def batch(self, commands: Sequence[str]) -> List[Union[dict, str]]:
+        """Execute several commands in a single round trip, returning structured output of each.
+
+        NX-OS returns no output at all for some commands with nothing to
+        report, and plaintext errors such as ``% Invalid command`` for commands
+        it rejects. In either case, the concatenated output cannot be
+        attributed to individual commands, so each command is executed
+        separately instead. Commands without output then return an empty
+        dictionary, and commands whose output is not JSON return that output
+        as a string, without affecting the output of other commands.
+
+        Parameters
+        ----------
+        commands : Sequence[str]
+            Show commands to execute through NX-OS CLI libraries.
+
+        Returns
+        -------
+        List[Union[dict, str]]
+            Normalized structured output of each command, in order, or the
+            plaintext output of commands that did not return JSON.
+        """
+        self._bind()
+        if not commands:
+            return []
+        output = self._cli(" ; ".join(f"{cmd} | json" for cmd in commands))
+        try:
+            documents = split_json_documents(output)
+        except ValueError:
+            documents = []
+        if len(documents) == len(commands):
+            return [normalize_output(document) for document in documents]
+        outputs: List[Union[dict, str]] = []
+        for cmd in commands:
+            output = self._cli(f"{cmd} | json")
+            if not output.strip():
+                outputs.append({})
+                continue
+            try:
+                outputs.append(normalize_output(json.loads(output)))
+            except ValueError:
+                outputs.append(output)
+        return outputs
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def split_json_documents(output: str) -> List[Any]:
+    """Split output containing several concatenated JSON documents.
+
+    Parameters
+    ----------
+    output : str
+        Concatenated JSON documents, optionally separated by whitespace.
+
+    Returns
+    -------
+    List[Any]
+        Deserialized JSON documents, in order.
+    """
+    documents = []
+    index = 0
+    end = len(output)
+    while True:
+        while index < end and output[index].isspace():
+            index += 1
+        if index == end:
+            return documents
+        document, index = _JSON_DECODER.raw_decode(output, index)
+        documents.append(document)
+
+
+_EXECUTOR = OnBoxExecutor()
+
+
 def command(cmd: str, structured: bool = False) -> Union[str, dict]:
     """Execute a command through NX-OS CLI libraries.
 
     This function executes an NX-OS CLI command using NX-OS CLI Python
-    libraries. NX-OS CLI Python libraries are purposefully abstracted so that
-    they are imported in this function instead of at the module level so that
-    unit testing outside of a Nexus switch is easier. This is inefficient, but
-    stability is valued over speed.
+    libraries through a shared `OnBoxExecutor`, which imports them the first
+    time it is called.
 
     Parameters
     ----------
@@ -37,13 +158,7 @@ def command(cmd: str, structured: bool = False) -> Union[str, dict]:
         NX-OS CLI output. A string indicates raw CLI output. A dictionary
         indicates structured output through a JSON data structure.
     """
-    if structured:
-        from cli import clid
-
-        return normalize_output(json.loads(clid(cmd)))
-    from cli import cli
-
-    return cli(cmd)
+    return _EXECUTOR.command(cmd, structured=structured)
 
 
 def normalize_output(input: dict) -> dict:
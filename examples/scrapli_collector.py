@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""Contains an example of collecting normalized JSON data structures from many switches.
+
+When executed, this script executes one or more NX-OS CLI commands across every switch in an
+inventory file concurrently, printing each normalized result as soon as it has been collected.
+The inventory file contains one IP address or FQDN per line.
+
+Tests for this script can be found in the ./tests/examples/test_scrapli_collector.py file.
+
+This script was tested in CML2.1 with Nexus 9000v switches running NX-OS 9.3(7).
+"""
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import Executor
+from scrapli.driver.core import AsyncNXOSDriver
+
+
+class Device(NamedTuple):
+    """Describes how to connect to a switch.
+
+    Attributes
+    ----------
+    host : str
+        IP address or FQDN of Nexus switch to connect to via Scrapli.
+    username : str
+        Username to use to log into Nexus switch.
+    password : str
+        Password to use to log into Nexus switch.
+    """
+
+    host: str
+    username: str
+    password: str
+
+
+class CollectionResult(NamedTuple):
+    """Describes the result of executing a command on a switch.
+
+    Attributes
+    ----------
+    host : str
+        IP address or FQDN of the Nexus switch the command was executed on.
+    command : str
+        Command that was executed.
+    output : Union[str, dict, None]
+        NX-OS CLI output, or None if the command failed. A string indicates
+        raw CLI output. A dictionary indicates normalized structured output.
+    error : Optional[BaseException]
+        Exception raised while connecting to the switch or executing the
+        command, or None if the command succeeded. Commands that were not
+        executed before the switch's timeout expired have an
+        `asyncio.TimeoutError`.
+    elapsed : float
+        Seconds between the start of collection from the switch and the
+        completion of the command.
+    """
+
+    host: str
+    command: str
+    output: Union[str, dict, None]
+    error: Optional[BaseException]
+    elapsed: float
+
+
+def scrapli_driver(device: Device) -> Any:
+    """Build an asynchronous Scrapli driver for a switch.
+
+    Parameters
+    ----------
+    device : Device
+        Switch to connect to.
+
+    Returns
+    -------
+    AsyncNXOSDriver
+        Unopened Scrapli driver, which opens its connection when used as an
+        asynchronous context manager.
+    """
+    return AsyncNXOSDriver(
+        transport="asyncssh",
+        host=device.host,
+        auth_username=device.username,
+        auth_password=device.password,
+        auth_strict_key=False,
+    )
+
+
+async def collect_device(
+    device: Device,
+    commands: Sequence[str],
+    results: "asyncio.Queue[CollectionResult]",
+    structured: bool = True,
+    driver_factory: Callable[[Device], Any] = scrapli_driver,
+    parse_executor: Optional[Executor] = None,
+) -> None:
+    """Execute commands through a single remote connection to a switch via Scrapli.
+
+    A result is put onto `results` as soon as each command completes. If the
+    connection cannot be opened, a failed result is put onto `results` for
+    every command.
+
+    Parameters
+    ----------
+    device : Device
+        Switch to connect to.
+    commands : Sequence[str]
+        Commands to execute, in order.
+    results : asyncio.Queue[CollectionResult]
+        Queue that results are put onto.
+    structured : bool, optional
+        Indicates whether structured JSON output should be returned instead
+        of plaintext. Defaults to True.
+    driver_factory : Callable[[Device], Any], optional
+        Function that builds an unopened driver for a switch. Defaults to
+        `scrapli_driver`.
+    parse_executor : Optional[Executor], optional
+        Executor that deserializes and normalizes structured output, so that
+        large outputs do not stall other switches' sessions on the event loop.
+        Defaults to None, in which case the event loop's default thread pool
+        is used.
+    """
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+    remaining = list(commands)
+    try:
+        async with driver_factory(device) as conn:
+            while remaining:
+                cmd = remaining[0]
+                try:
+                    if structured:
+                        response = await conn.send_command(f"{cmd} | json")
+                        response.raise_for_status()
+                        output = await loop.run_in_executor(
+                            parse_executor, parse_structured_output, response.result
+                        )
+                    else:
+                        response = await conn.send_command(cmd)
+                        response.raise_for_status()
+                        output = response.result
+                except (asyncio.CancelledError, OSError):
+                    raise
+                except Exception as exc:
+                    result = CollectionResult(
+                        device.host, cmd, None, exc, time.monotonic() - start
+                    )
+                else:
+                    result = CollectionResult(
+                        device.host, cmd, output, None, time.monotonic() - start
+                    )
+                remaining.pop(0)
+                results.put_nowait(result)
+    except asyncio.CancelledError:
+        # The switch's timeout has expired. Every command that has not been
+        # executed yet has failed.
+        error = asyncio.TimeoutError()
+        for cmd in remaining:
+            results.put_nowait(
+                CollectionResult(
+                    device.host, cmd, None, error, time.monotonic() - start
+                )
+            )
+        raise
+    except Exception as exc:
+        for cmd in remaining:
+            results.put_nowait(
+                CollectionResult(device.host, cmd, None, exc, time.monotonic() - start)
+            )
+
+
+async def collect(
+    inventory: Sequence[Device],
+    commands: Sequence[str],
+    concurrency: int = 100,
+    timeout: Optional[float] = 60.0,
+    structured: bool = True,
+    driver_factory: Callable[[Device], Any] = scrapli_driver,
+    parse_executor: Optional[Executor] = None,
+) -> AsyncIterator[CollectionResult]:
+    """Execute commands across many switches concurrently, yielding results as they complete.
+
+    Each switch is connected to once, and its commands are executed in order
+    through that connection. At most `concurrency` switches are connected to
+    at the same time. Results are yielded in the order they complete, so slow
+    or unreachable switches do not delay results from other switches.
+
+    Parameters
+    ----------
+    inventory : Sequence[Device]
+        Switches to connect to.
+    commands : Sequence[str]
+        Commands to execute on every switch.
+    concurrency : int, optional
+        Maximum number of switches to connect to at the same time. Defaults
+        to 100.
+    timeout : Optional[float], optional
+        Seconds allowed for connecting to a switch and executing every command
+        on it, excluding time spent waiting for other switches to finish. If
+        None, switches are never timed out. Defaults to 60.
+    structured : bool, optional
+        Indicates whether structured JSON output should be returned instead
+        of plaintext. Defaults to True.
+    driver_factory : Callable[[Device], Any], optional
+        Function that builds an unopened driver for a switch, which must be
+        an asynchronous context manager with a `send_command` coroutine
+        method. Defaults to `scrapli_driver`.
+    parse_executor : Optional[Executor], optional
+        Executor that deserializes and normalizes structured output. Defaults
+        to None, in which case the event loop's default thread pool is used.
+
+    Yields
+    ------
+    CollectionResult
+        Result of executing a command on a switch. Exactly one result is
+        yielded for every command on every switch.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    results: "asyncio.Queue[CollectionResult]" = asyncio.Queue()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(device: Device) -> None:
+        async with semaphore:
+            try:
+                await asyncio.wait_for(
+                    collect_device(
+                        device,
+                        commands,
+                        results,
+                        structured,
+                        driver_factory,
+                        parse_executor,
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    tasks = [asyncio.ensure_future(bounded(device)) for device in inventory]
+    try:
+        for _ in range(len(tasks) * len(commands)):
+            yield await results.get()
+    finally:
+        # Stop collecting if the caller stops consuming results early.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def parse_structured_output(output: str) -> dict:
+    """Deserialize and normalize structured output, such as in an executor.
+
+    Parameters
+    ----------
+    output : str
+        JSON text returned by NX-OS.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    return normalize_output(json.loads(output))
+
+
+def normalize_output(input: dict) -> dict:
+    """Normalize structured output so that table rows are consistently lists.
+
+    The back-end NX-OS uses for structuring data revolves around XML. When this
+    XML data is converted to JSON, tables that have more than one row will be
+    represented as a list, but tables that have a single row will be
+    represented as a dictionary.
+
+    This function normalizes all structured output so that any key with the
+    phrase "ROW_" in it is converted into a list of dictionaries - even if
+    that list only has a single element in it.
+
+    Parameters
+    ----------
+    input : dict
+        JSON data structure returned by NX-OS that should be normalized.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    for k, v in input.items():
+        if "ROW_" in k and isinstance(v, dict):
+            input[k] = [normalize_output(v)]
+        elif isinstance(v, dict) and any("ROW_" in x for x in v.keys()):
+            input[k] = normalize_output(v)
+        # Taste to see if dictionary value is a list and if the list
+        # contains dictionaries. This prevents us from needlessly normalizing
+        # leaf nodes in the data structure.
+        elif isinstance(v, list) and isinstance(v[0], dict):
+            for index, item in enumerate(v):
+                input[k][index] = normalize_output(item)
+    return input
+
+
+def read_inventory(path: str, username: str, password: str) -> List[Device]:
+    """Read switches from an inventory file containing one IP address or FQDN per line.
+
+    Blank lines and lines starting with "#" are ignored.
+
+    Parameters
+    ----------
+    path : str
+        Path to inventory file.
+    username : str
+        Username to use to log into every Nexus switch.
+    password : str
+        Password to use to log into every Nexus switch.
+
+    Returns
+    -------
+    List[Device]
+        Switches to connect to.
+    """
+    with open(path) as inventory_file:
+        return [
+            Device(line.strip(), username, password)
+            for line in inventory_file
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+async def report(args: argparse.Namespace) -> int:
+    """Print results of executing commands across an inventory as they complete.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    int
+        Number of commands that failed.
+    """
+    inventory = read_inventory(args.inventory, args.username, args.password)
+    failures = 0
+    async for result in collect(
+        inventory,
+        args.command or ["show ip eigrp neighbors"],
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+    ):
+        if result.error is not None:
+            failures += 1
+            print(
+                f"{result.host}: {result.command}: failed: {result.error!r}",
+                file=sys.stderr,
+            )
+        else:
+            print(
+                json.dumps(
+                    {
+                        "host": result.host,
+                        "command": result.command,
+                        "output": result.output,
+                    }
+                )
+            )
+    return failures
+
+
+def main():
+    """Execute commands across every switch in an inventory concurrently."""
+    parser = argparse.ArgumentParser(
+        description="Execute commands across every switch in an inventory concurrently."
+    )
+
+    # Required arguments
+    parser.add_argument(
+        "inventory", metavar="Inventory file of Nexus switches", action="store"
+    )
+    parser.add_argument(
+        "username", metavar="Username to log into Nexus switches", action="store"
+    )
+    parser.add_argument(
+        "password", metavar="Password to log into Nexus switches", action="store"
+    )
+
+    # Optional arguments
+    parser.add_argument(
+        "-c",
+        "--command",
+        action="append",
+        help="Command to execute on every switch. May be repeated. Defaults to "
+        "'show ip eigrp neighbors'.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Maximum number of switches to connect to at the same time. Defaults to 100.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Seconds allowed per switch. Defaults to 60.",
+    )
+
+    args = parser.parse_args()
+    if asyncio.run(report(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit()
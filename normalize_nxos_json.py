@@ -1,4 +1,42 @@
-"""Contains the `normalize_output` utility function."""
+"""Contains the `normalize_output` utility function and related helpers."""
+
+import io
+import os
+import re
+import sys
+import glob
+import json
+import mmap
+import stat
+import time
+import codecs
+import fnmatch
+import argparse
+import tempfile
+import keyword
+import functools
+from datetime import timedelta
+from array import array
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor
+from json.decoder import scanstring
+from xml.etree import ElementTree
+from operator import itemgetter
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
 
 
 def normalize_output(input: dict) -> dict:
@@ -95,3 +133,3021 @@ def normalize_output(input: dict) -> dict:
             for index, item in enumerate(v):
                 input[k][index] = normalize_output(item)
     return input
+
+
+class JsonBackend(NamedTuple):
+    """Describes a library used to deserialize and serialize JSON documents.
+
+    Attributes
+    ----------
+    name : str
+        Name of the library, such as ``"orjson"``.
+    loads : Callable[[Union[str, bytes, bytearray]], Any]
+        Function that deserializes a JSON document.
+    dumps : Callable[[Any], bytes]
+        Function that serializes a data structure into a compact, UTF-8
+        encoded JSON document.
+    buffers : bool
+        Whether `loads` also accepts other objects supporting the buffer
+        protocol, such as a memoryview of a memory-mapped file, so that they
+        do not have to be copied into bytes first.
+    """
+
+    name: str
+    loads: Callable[[Union[str, bytes, bytearray]], Any]
+    dumps: Callable[[Any], bytes]
+    buffers: bool = False
+
+
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """Serialize a data structure into a compact, UTF-8 encoded JSON document."""
+    return _JSON_ENCODER.encode(obj).encode()
+
+
+def _load_orjson() -> JsonBackend:
+    """Build the orjson backend, raising ImportError if orjson is not installed."""
+    import orjson
+
+    return JsonBackend("orjson", orjson.loads, orjson.dumps, buffers=True)
+
+
+def _load_ujson() -> JsonBackend:
+    """Build the ujson backend, raising ImportError if ujson is not installed."""
+    import ujson
+
+    def dumps(obj: Any) -> bytes:
+        return ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False
+        ).encode()
+
+    return JsonBackend("ujson", ujson.loads, dumps)
+
+
+def _load_simdjson() -> JsonBackend:
+    """Build the simdjson backend, raising ImportError if pysimdjson is not installed.
+
+    pysimdjson only accelerates deserialization, so documents are serialized
+    with the standard library.
+    """
+    import simdjson
+
+    return JsonBackend("simdjson", simdjson.loads, _stdlib_dumps, buffers=True)
+
+
+# Backends in order of preference when auto-detecting which one to use.
+_JSON_BACKENDS: Dict[str, Callable[[], JsonBackend]] = {
+    "orjson": _load_orjson,
+    "ujson": _load_ujson,
+    "simdjson": _load_simdjson,
+    "json": lambda: JsonBackend("json", json.loads, _stdlib_dumps),
+}
+_JSON_BACKEND: Optional[JsonBackend] = None
+
+
+def available_json_backends() -> List[str]:
+    """Return the names of the JSON backends that are installed, in order of preference.
+
+    Returns
+    -------
+    List[str]
+        Names of installed backends. ``"json"``, the standard library, is
+        always last.
+    """
+    available = []
+    for name, load in _JSON_BACKENDS.items():
+        try:
+            load()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def set_json_backend(name: Optional[str] = None) -> JsonBackend:
+    """Select the JSON backend used by `loads`, `dumps`, and everything built on them.
+
+    Parameters
+    ----------
+    name : Optional[str], optional
+        Name of the backend to use: ``"orjson"``, ``"ujson"``,
+        ``"simdjson"``, or ``"json"``. Defaults to None, in which case the
+        first installed backend in that order is used.
+
+    Returns
+    -------
+    JsonBackend
+        Backend now in use.
+
+    Raises
+    ------
+    ValueError
+        If `name` is not a known backend.
+    ImportError
+        If the library of backend `name` is not installed.
+    """
+    global _JSON_BACKEND
+    if name is not None:
+        if name not in _JSON_BACKENDS:
+            raise ValueError(
+                f"Unknown JSON backend {name!r}, expected one of {', '.join(_JSON_BACKENDS)}"
+            )
+        _JSON_BACKEND = _JSON_BACKENDS[name]()
+        return _JSON_BACKEND
+    for load in _JSON_BACKENDS.values():
+        try:
+            _JSON_BACKEND = load()
+        except ImportError:
+            continue
+        return _JSON_BACKEND
+    raise AssertionError("The standard library backend is always available")
+
+
+def get_json_backend() -> JsonBackend:
+    """Return the JSON backend in use, auto-detecting it on first use.
+
+    Returns
+    -------
+    JsonBackend
+        Backend in use.
+    """
+    return _JSON_BACKEND or set_json_backend()
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Deserialize a JSON document with the JSON backend in use.
+
+    Parameters
+    ----------
+    data : Union[str, bytes, bytearray]
+        JSON document.
+
+    Returns
+    -------
+    Any
+        Deserialized data structure, which has not been normalized.
+
+    Raises
+    ------
+    ValueError
+        If `data` is not a valid JSON document. Every backend raises a
+        subclass of ValueError.
+    """
+    return (_JSON_BACKEND or set_json_backend()).loads(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+    """Serialize a data structure into a UTF-8 encoded JSON document with the backend in use.
+
+    Parameters
+    ----------
+    obj : Any
+        Data structure to serialize.
+    indent : Optional[int], optional
+        Indentation of the JSON document. Indented documents are meant for
+        people rather than programs, and are always serialized with the
+        standard library. Defaults to None, in which case the document is
+        serialized compactly on a single line.
+
+    Returns
+    -------
+    bytes
+        JSON document.
+    """
+    if indent is not None:
+        return json.dumps(obj, indent=indent, ensure_ascii=False).encode()
+    return (_JSON_BACKEND or set_json_backend()).dumps(obj)
+
+
+def _wrap_single_rows(obj: dict) -> dict:
+    """Wrap single-row ROW_ values of a freshly decoded JSON object in a list.
+
+    This is used as the ``object_hook`` of the JSON decoder. The decoder builds
+    JSON objects from the inside out, so by the time this hook sees an object,
+    every object nested within it has already been normalized.
+    """
+    for k, v in obj.items():
+        if "ROW_" in k and isinstance(v, dict):
+            obj[k] = [v]
+    return obj
+
+
+def loads_normalized(
+    data: Union[str, bytes, bytearray], intern: Optional["InternPool"] = None
+) -> dict:
+    """Deserialize and normalize a JSON document returned by NX-OS in a single pass.
+
+    This is equivalent to ``normalize_output(json.loads(data))``, except that
+    ROW_ values are wrapped into lists while the JSON decoder builds each
+    object. The resulting data structure is never walked a second time, which
+    matters for very large outputs such as ``show ip route vrf all | json``.
+
+    This single pass only happens with the standard library's JSON backend.
+    Third-party backends, one of which is used by default when installed (see
+    `set_json_backend`), offer no hook into each object as it is decoded, so
+    the document is deserialized by the backend and then normalized with
+    `normalize_output_iterative` in a second pass instead. The result is the
+    same, and the faster decoder usually more than makes up for the second
+    pass on large documents.
+
+    Unlike `normalize_output`, ROW_ keys are normalized no matter where they
+    are nested in the data structure.
+
+    Parameters
+    ----------
+    data : Union[str, bytes, bytearray]
+        JSON document returned by NX-OS. If the JSON backend in use accepts
+        buffers, any object supporting the buffer protocol is also accepted.
+    intern : Optional[InternPool], optional
+        Pool used to deduplicate keys and low-cardinality values as each
+        object is decoded. Defaults to None, in which case nothing is
+        deduplicated.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    backend = _JSON_BACKEND or set_json_backend()
+    if backend.name != "json":
+        value = backend.loads(data)
+        if isinstance(value, (dict, list)):
+            return normalize_output_iterative(value, intern=intern)
+        # Documents that are a single string, number, or null have nothing to normalize.
+        return value
+    return _loads_single_pass(data, intern)
+
+
+def _loads_single_pass(
+    data: Union[str, bytes, bytearray], intern: Optional["InternPool"] = None
+) -> dict:
+    """Deserialize and normalize a JSON document with the standard library's decoder."""
+    if intern is not None:
+        intern_dict = intern.intern_dict
+        return json.loads(
+            data, object_hook=lambda obj: _wrap_single_rows(intern_dict(obj))
+        )
+    return json.loads(data, object_hook=_wrap_single_rows)
+
+
+def normalize_output_iterative(
+    input: dict,
+    records: bool = False,
+    intern: Optional["InternPool"] = None,
+    coerce: Union[bool, Dict[str, Dict[str, Any]]] = False,
+    indexes: Iterable["TableIndex"] = (),
+) -> dict:
+    """Normalize structured output without recursion using an explicit stack.
+
+    This function produces the same normalized data structure as
+    `normalize_output`, but walks the data structure with an explicit stack
+    instead of one recursive call per nested dictionary. As a result, it
+    cannot exceed the interpreter's recursion limit on deeply nested output
+    and avoids the cost of a Python function call per dictionary.
+
+    It is also more thorough than `normalize_output`. Empty lists are left
+    alone instead of raising an IndexError, lists that mix dictionaries with
+    other values are handled, and ROW_ keys are normalized even when they are
+    nested beneath dictionaries that do not contain a ROW_ key themselves.
+
+    Optionally, table rows can be materialized as compact `Record` objects
+    instead of dictionaries, which greatly reduces the memory used by large
+    tables. See `rows_to_records` for details. Field values of table rows can
+    also be converted from strings into numbers, booleans, and durations. See
+    `infer_field_types` for details. Rows can also be added to `TableIndex`
+    objects as they are found, without walking the data structure again.
+    They are added once their fields have been converted, so indexes are
+    keyed by converted values.
+
+    Parameters
+    ----------
+    input : dict
+        JSON data structure returned by NX-OS that should be normalized.
+    records : bool, optional
+        Indicates whether table rows should be converted into `Record`
+        objects. Defaults to False.
+    intern : Optional[InternPool], optional
+        Pool used to deduplicate keys and low-cardinality values of the
+        normalized data structure. Defaults to None, in which case nothing is
+        deduplicated.
+    coerce : Union[bool, Dict[str, Dict[str, Any]]], optional
+        Field types of each table, keyed by ROW_ key, in the format returned
+        by `infer_field_types`. Each row is converted as soon as its table is
+        normalized. If True, field types are inferred from `input` itself and
+        rows are converted once all of them have been found. Defaults to
+        False, in which case values are left as-is.
+    indexes : Iterable[TableIndex], optional
+        Indexes that rows of their tables should be added to. Defaults to no
+        indexes.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    tables: Optional[Dict[str, List[list]]] = {} if records or coerce is True else None
+    coercers: Optional[Dict[str, Callable[[dict], None]]] = None
+    if coerce and coerce is not True:
+        coercers = {key: _compile_coercer(types) for key, types in coerce.items()}
+    indexer = _Indexer(input, indexes) if indexes else None
+    stack = [input]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        if indexer is not None and id(node) in indexer.tracked:
+            indexer.visit(node)
+        if isinstance(node, dict):
+            # The stack is last in, first out, so children are pushed in
+            # reverse when indexing, so that rows are indexed in document order.
+            items = node.items() if indexer is None else list(node.items())[::-1]
+            for k, v in items:
+                if isinstance(v, dict):
+                    if "ROW_" in k:
+                        node[k] = [v]
+                        if tables is not None:
+                            tables.setdefault(k, []).append(node[k])
+                        if coercers is not None and k in coercers:
+                            coercers[k](v)
+                    push(v)
+                elif isinstance(v, list):
+                    if "ROW_" in k:
+                        if tables is not None:
+                            tables.setdefault(k, []).append(v)
+                        if coercers is not None and k in coercers:
+                            coercer = coercers[k]
+                            for item in v:
+                                if isinstance(item, dict):
+                                    coercer(item)
+                    push(v)
+        else:
+            for item in node if indexer is None else reversed(node):
+                if isinstance(item, (dict, list)):
+                    push(item)
+    if coerce is True and tables:
+        for key, types in _infer_table_types(tables).items():
+            coercer = _compile_coercer(types)
+            for rows in tables[key]:
+                for row in rows:
+                    if isinstance(row, dict):
+                        coercer(row)
+    if indexer is not None:
+        indexer.flush()
+    if intern is not None:
+        intern.intern_tree(input)
+    if records and tables:
+        originals = [
+            (rows, rows[:]) for row_lists in tables.values() for rows in row_lists
+        ]
+        for key, row_lists in tables.items():
+            rows_to_records(key, row_lists)
+        if indexer is not None:
+            indexer.replace_rows(
+                {
+                    id(original): row
+                    for rows, copies in originals
+                    for original, row in zip(copies, rows)
+                    if original is not row
+                }
+            )
+    return input
+
+
+# Matches the next token of a JSON document, skipping whitespace and separators. The groups are
+# a structural character, a string without escape sequences (followed by a colon if it is a key),
+# the opening quote of a string with escape sequences, a number, and a literal.
+_JSON_TOKEN = re.compile(
+    r"[ \t\n\r,:]*(?:([\[\]{}])"
+    r'|"([^"\\]*)"[ \t\n\r]*(:)?'
+    r'|(")'
+    r"|(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)(?![0-9.eE+-])"
+    r"|(true|false|null))"
+)
+_JSON_COLON = re.compile(r"[ \t\n\r]*(:)?")
+_JSON_LITERALS = {"true": True, "false": False, "null": None}
+_JSON_STRUCTURE_EVENTS = {
+    "{": "start_map",
+    "}": "end_map",
+    "[": "start_array",
+    "]": "end_array",
+}
+
+
+def _iter_json_events(source: Any, chunk_size: int) -> Iterator[Tuple[str, Any]]:
+    """Incrementally tokenize a JSON document read from a file-like object or socket.
+
+    Events are modeled after those of the ijson library: ``start_map``,
+    ``map_key``, ``end_map``, ``start_array``, ``end_array``, and ``scalar``.
+    Only a single chunk of the document is held in memory at any time. The
+    tokenizer is lenient about separators and does not validate the document.
+    """
+    read = getattr(source, "read", None) or source.recv
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(buf: str, pos: int) -> Tuple[str, bool]:
+        chunk = read(chunk_size)
+        if isinstance(chunk, (bytes, bytearray)):
+            eof = not chunk
+            chunk = decoder.decode(chunk, final=eof)
+        else:
+            eof = not chunk
+        return buf[pos:] + chunk, eof
+
+    match = _JSON_TOKEN.match
+    structure_events = _JSON_STRUCTURE_EVENTS
+    buf, eof = fill("", 0)
+    pos = 0
+    while True:
+        token = match(buf, pos)
+        # A token that reaches the end of the buffer may continue in the next
+        # chunk, or may turn out to be a key once the next chunk is read.
+        if token is None or (not eof and token.end() >= len(buf)):
+            if eof:
+                if buf[pos:].strip(" \t\n\r,:"):
+                    raise ValueError(
+                        f"Unexpected data in JSON document at {buf[pos:pos + 20]!r}"
+                    )
+                return
+            buf, eof = fill(buf, pos)
+            pos = 0
+            continue
+        group = token.lastindex
+        if group == 1:
+            pos = token.end()
+            yield structure_events[token.group(1)], None
+        elif group == 2:
+            pos = token.end()
+            yield "scalar", token.group(2)
+        elif group == 3:
+            pos = token.end()
+            yield "map_key", token.group(2)
+        elif group == 4:
+            try:
+                value, end = scanstring(buf, token.end())
+                colon = _JSON_COLON.match(buf, end)
+                if not eof and colon.end() >= len(buf):
+                    raise ValueError(
+                        "String may be followed by a colon in the next chunk"
+                    )
+            except ValueError:
+                if eof:
+                    raise
+                buf, eof = fill(buf, pos)
+                pos = 0
+                continue
+            pos = colon.end()
+            yield ("map_key" if colon.group(1) else "scalar"), value
+        elif group == 5:
+            pos = token.end()
+            number = token.group(5)
+            if "." in number or "e" in number or "E" in number:
+                yield "scalar", float(number)
+            else:
+                yield "scalar", int(number)
+        else:
+            pos = token.end()
+            yield "scalar", _JSON_LITERALS[token.group(6)]
+
+
+class StreamedRow(NamedTuple):
+    """A leaf table row yielded by `iter_normalized_rows`.
+
+    Attributes
+    ----------
+    path : Tuple[str, ...]
+        Keys leading from the root of the document to the row's ROW_ key, such
+        as ``("TABLE_asn", "ROW_asn", "TABLE_vrf", "ROW_vrf")``.
+    ancestors : Tuple[dict, ...]
+        Scalar fields of each enclosing table row, outermost first.
+    row : dict
+        The row itself.
+    """
+
+    path: Tuple[str, ...]
+    ancestors: Tuple[dict, ...]
+    row: dict
+
+
+def iter_normalized_rows(source: Any, chunk_size: int = 65536) -> Iterator[StreamedRow]:
+    """Incrementally read a JSON document returned by NX-OS and yield its table rows.
+
+    Rather than deserializing an entire document (such as the output of
+    ``show ip route vrf all | json``) and normalizing it afterwards, this
+    function reads the document in chunks and yields each leaf table row as
+    soon as it has been read. A leaf table row is a row that does not contain
+    any nested ROW_ keys. Rows are yielded the same way regardless of whether
+    NX-OS represented their table as a dictionary or as a list.
+
+    Rows that contain nested tables are never yielded or kept in memory.
+    Instead, the scalar fields that precede their first nested table are made
+    available to every row nested within them through the ``ancestors``
+    attribute. As a result, peak memory depends upon the size of a single row
+    instead of the size of the document. Content outside of any table row is
+    discarded.
+
+    Parameters
+    ----------
+    source : Any
+        File-like object opened in text or binary mode, or a connected socket,
+        from which the JSON document is read.
+    chunk_size : int, optional
+        Number of bytes or characters to read at a time. Defaults to 65536.
+
+    Yields
+    ------
+    StreamedRow
+        Each leaf table row along with its path and ancestor context.
+    """
+    # Each frame is [container, is dictionary, pending key, is ROW_ list, path].
+    # The container is None when the values within it do not need to be kept.
+    frames: List[list] = [[None, True, None, False, ()]]
+    # Each open row is [frame index, ancestor context]. The context is None
+    # until a nested row is found, which turns the row into a parent row.
+    rows: List[list] = []
+    for event, value in _iter_json_events(source, chunk_size):
+        parent = frames[-1]
+        container, is_map, key, is_row_list, path = parent
+        if event == "scalar":
+            if container is None:
+                continue
+            if is_map:
+                container[key] = value
+            else:
+                container.append(value)
+        elif event == "map_key":
+            parent[2] = value
+        elif event == "start_map" or event == "start_array":
+            if is_map and key is not None:
+                path = path + (key,)
+                is_row = "ROW_" in key
+            else:
+                is_row = is_row_list
+            node = {} if event == "start_map" else []
+            if event == "start_map" and is_row:
+                if rows and rows[-1][1] is None:
+                    _promote_row(rows[-1], frames)
+                rows.append([len(frames), None])
+            elif container is None:
+                node = None
+            elif is_map:
+                container[key] = node
+            else:
+                container.append(node)
+            is_child_row_list = event == "start_array" and is_map and is_row
+            frames.append([node, event == "start_map", None, is_child_row_list, path])
+        else:
+            frame = frames.pop()
+            if rows and rows[-1][0] == len(frames):
+                _, context = rows.pop()
+                if context is None:
+                    yield StreamedRow(
+                        path=frame[4], ancestors=tuple(r[1] for r in rows), row=frame[0]
+                    )
+
+
+def _promote_row(row: list, frames: List[list]) -> None:
+    """Turn an open leaf row into a parent row once a nested row is found within it.
+
+    The scalar fields read so far are kept as the row's ancestor context, and
+    anything else read within the row is discarded.
+    """
+    index = row[0]
+    row[1] = {
+        k: v for k, v in frames[index][0].items() if not isinstance(v, (dict, list))
+    }
+    for frame in frames[index:]:
+        frame[0] = None
+
+
+def normalize_xml(source: Any, intern: Optional["InternPool"] = None) -> dict:
+    """Build the normalized JSON data structure directly from XML output returned by NX-OS.
+
+    NX-OS structures output as XML, and ``| json`` output is converted from
+    that XML. The conversion is what represents tables with a single row as a
+    dictionary instead of a list, because a lone ``<ROW_peer>`` element looks
+    the same as any other nested element. This function converts
+    ``| xml`` output itself, so every ROW_ element becomes a list of rows no
+    matter how many of them there are, and the ambiguous data structure is
+    never built.
+
+    The XML document is read incrementally with
+    `xml.etree.ElementTree.iterparse`. Each element is converted as soon as
+    it has been read, then removed from the element tree, so peak memory
+    depends upon the size of the normalized data structure rather than the
+    size of the XML document and its element tree.
+
+    As in ``| json`` output, elements that contain text become strings, and
+    XML namespaces are dropped. If the document contains a
+    ``<__readonly__>`` element, as the output of ``show`` commands does, only
+    the contents of that element are returned. Anything after the end of the
+    document, such as the ``]]>]]>`` NETCONF delimiter, is ignored.
+
+    Parameters
+    ----------
+    source : Any
+        XML document returned by NX-OS as a string or bytes, or a file-like
+        object opened in binary mode from which it is read.
+    intern : Optional[InternPool], optional
+        Pool used to deduplicate keys and low-cardinality values as each
+        element is converted. Defaults to None, in which case nothing is
+        deduplicated.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+
+    Raises
+    ------
+    xml.etree.ElementTree.ParseError
+        If `source` is not a well-formed XML document.
+    ValueError
+        If the document contains no data.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    intern_dict = intern.intern_dict if intern is not None else None
+    # Each item is an element that has been started but not ended, and the
+    # children converted so far.
+    stack: List[Tuple[Any, dict]] = []
+    push = stack.append
+    pop = stack.pop
+    # Maps each tag, which includes its namespace, to the key it becomes.
+    keys: Dict[str, str] = {}
+    readonly: Any = None
+    for event, element in ElementTree.iterparse(source, ("start", "end")):
+        if event == "start":
+            push((element, {}))
+            continue
+        _, children = pop()
+        tag = element.tag
+        key = keys.get(tag)
+        if key is None:
+            key = keys[tag] = tag.rpartition("}")[2]
+        if not children:
+            value: Any = element.text or ""
+        elif intern_dict is not None:
+            value = intern_dict(children)
+        else:
+            value = children
+        if key == "__readonly__":
+            readonly = value
+        if not stack:
+            break
+        parent, siblings = stack[-1]
+        if "ROW_" in key:
+            rows = siblings.get(key)
+            if rows is None:
+                siblings[key] = [value]
+            else:
+                rows.append(value)
+        elif key in siblings:
+            # Like the JSON conversion, repeated elements become a list.
+            existing = siblings[key]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                siblings[key] = [existing, value]
+        else:
+            siblings[key] = value
+        # Elements are removed as soon as they end, so this is always the
+        # parent's only child.
+        parent.remove(element)
+    if readonly is not None:
+        value = readonly
+    if not isinstance(value, dict):
+        raise ValueError("XML document contains no data")
+    return value
+
+
+class _UnknownShapeError(Exception):
+    """Raised by a compiled normalizer when output does not have the expected shape."""
+
+
+_COMPILED_NORMALIZERS: Dict[str, Callable[[dict], dict]] = {}
+
+
+def learn_row_paths(samples: Iterable[dict]) -> List[str]:
+    """Learn the paths of every ROW_ key found in sample output of a command.
+
+    Paths are made up of the keys leading from the root of the data structure
+    to a ROW_ key, joined by periods, such as
+    ``"TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf"``. List indices are not part of a
+    path, so rows represented as a dictionary and rows represented as a list
+    share the same path.
+
+    Parameters
+    ----------
+    samples : Iterable[dict]
+        Normalized or unnormalized JSON data structures returned by NX-OS for
+        the same command.
+
+    Returns
+    -------
+    List[str]
+        Sorted paths of every ROW_ key found in any of the samples.
+    """
+    paths = set()
+    stack: List[Tuple[Any, str]] = [(sample, "") for sample in samples]
+    while stack:
+        node, prefix = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                path = f"{prefix}.{k}" if prefix else k
+                if "ROW_" in k and isinstance(v, (dict, list)):
+                    paths.add(path)
+                if isinstance(v, (dict, list)):
+                    stack.append((v, path))
+        elif isinstance(node, list):
+            stack.extend((item, prefix) for item in node)
+    return sorted(paths)
+
+
+def _contains_row_keys(node: Any) -> bool:
+    """Return whether a JSON data structure contains a ROW_ key at any depth."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is dict:
+            for k, v in node.items():
+                if "ROW_" in k:
+                    return True
+                if v.__class__ is dict or v.__class__ is list:
+                    stack.append(v)
+        elif node.__class__ is list:
+            stack.extend(node)
+    return False
+
+
+def _check_unknown_keys(node: dict, known: frozenset) -> None:
+    """Raise `_UnknownShapeError` if a value outside of the known keys contains ROW_ keys."""
+    for k, v in node.items():
+        if k in known or not (v.__class__ is dict or v.__class__ is list):
+            continue
+        if "ROW_" in k or _contains_row_keys(v):
+            raise _UnknownShapeError(k)
+
+
+def _generate_normalizer_source(
+    paths: Iterable[str],
+) -> Tuple[str, Dict[str, frozenset]]:
+    """Generate the source code of a normalizer that only visits the given paths.
+
+    Every dictionary the normalizer visits is checked for values outside of the
+    known paths that contain ROW_ keys, in which case it raises ``error``. The
+    number of its values that are dictionaries or lists is counted by built-in
+    functions and compared with the number of known keys it has, so only
+    dictionaries with other such values are searched in Python.
+
+    Returns
+    -------
+    Tuple[str, Dict[str, frozenset]]
+        Source code, and the names and values of the sets of known keys it uses.
+    """
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        for key in path.split("."):
+            node = node.setdefault(key, {})
+
+    lines = [
+        "def normalizer(data):",
+        "    if data.__class__ is not dict:",
+        "        raise error",
+    ]
+    counter = [0]
+    constants: Dict[str, frozenset] = {}
+
+    def emit(node: dict, var: str, indent: str) -> None:
+        known = f"known{len(constants)}"
+        constants[known] = frozenset(node)
+        if not node:
+            lines.append(f"{indent}if not scalars(map(type, {var}.values())):")
+            lines.append(f"{indent}    check({var}, {known})")
+            return
+        values = {}
+        for key in node:
+            counter[0] += 1
+            values[key] = f"v{counter[0]}"
+            lines.append(f"{indent}{values[key]} = {var}.get({key!r})")
+        # Values of known keys that are not dictionaries or lists raise error below, so
+        # counting the known keys that are present is enough.
+        present = " + ".join(f"({value} is not None)" for value in values.values())
+        lines.append(
+            f"{indent}if not {var}.keys() <= {known} and "
+            f"sum(map(container, map(type, {var}.values()))) > {present}:"
+        )
+        lines.append(f"{indent}    check({var}, {known})")
+        for key, children in node.items():
+            value = values[key]
+            lines.append(f"{indent}if {value} is not None:")
+            if "ROW_" in key:
+                lines.append(f"{indent}    if {value}.__class__ is dict:")
+                lines.append(f"{indent}        {value} = {var}[{key!r}] = [{value}]")
+                lines.append(f"{indent}    elif {value}.__class__ is not list:")
+                lines.append(f"{indent}        raise error")
+                row = f"r{value[1:]}"
+                lines.append(f"{indent}    for {row} in {value}:")
+                lines.append(f"{indent}        if {row}.__class__ is not dict:")
+                lines.append(f"{indent}            raise error")
+                emit(children, row, indent + "        ")
+            else:
+                lines.append(f"{indent}    if {value}.__class__ is not dict:")
+                lines.append(f"{indent}        raise error")
+                emit(children, value, indent + "    ")
+
+    emit(tree, "data", "    ")
+    lines.append("    return data")
+    return "\n".join(lines) + "\n", constants
+
+
+def compile_normalizer(
+    command: str,
+    paths: Optional[Iterable[str]] = None,
+    samples: Optional[Iterable[dict]] = None,
+) -> Callable[[dict], dict]:
+    """Compile and cache a normalizer specialized for the output of a single command.
+
+    The output of a given NX-OS command always has the same layout of TABLE_
+    and ROW_ keys. For example, the output of ``show ip eigrp neighbors`` has
+    ``TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer``. Rather than
+    testing every key of every dictionary for the phrase "ROW_", the compiled
+    normalizer is generated straight-line code that only visits these paths.
+
+    If the output does not have the expected shape along a known path (for
+    example, a row that is not a dictionary), or contains ROW_ keys outside of
+    the known paths (for example, a table that was missing from the samples
+    because it had no rows), the compiled normalizer falls back to
+    `normalize_output_iterative`.
+
+    The compiled normalizer is cached under `command` for use with
+    `normalize_command_output`.
+
+    Parameters
+    ----------
+    command : str
+        NX-OS CLI command whose output the normalizer is for.
+    paths : Optional[Iterable[str]], optional
+        Declared paths of the ROW_ keys in the command's output, in the format
+        returned by `learn_row_paths`.
+    samples : Optional[Iterable[dict]], optional
+        Sample output of the command from which paths of the ROW_ keys are
+        learned with `learn_row_paths`. Used in addition to `paths`.
+
+    Returns
+    -------
+    Callable[[dict], dict]
+        Normalizer that normalizes output of the command in-place.
+    """
+    known = set(paths or ())
+    if samples is not None:
+        known.update(learn_row_paths(samples))
+    namespace = {
+        "error": _UnknownShapeError,
+        "check": _check_unknown_keys,
+        "scalars": frozenset((dict, list)).isdisjoint,
+        "container": frozenset((dict, list)).__contains__,
+    }
+    try:
+        source, constants = _generate_normalizer_source(sorted(known))
+        namespace.update(constants)
+        exec(source, namespace)
+    except (SyntaxError, RecursionError):
+        # Output nested too deeply for straight-line code to be compiled.
+        specialized = normalize_output_iterative
+    else:
+        specialized = namespace["normalizer"]
+
+    def normalizer(input: dict) -> dict:
+        try:
+            return specialized(input)
+        except _UnknownShapeError:
+            return normalize_output_iterative(input)
+
+    normalizer.__doc__ = f"Normalize output of the {command!r} command."
+    _COMPILED_NORMALIZERS[command] = normalizer
+    return normalizer
+
+
+def normalize_command_output(command: str, input: dict) -> dict:
+    """Normalize output of a command with its compiled normalizer, if one exists.
+
+    Output of commands without a normalizer compiled by `compile_normalizer`
+    is normalized with `normalize_output_iterative`.
+
+    Parameters
+    ----------
+    command : str
+        NX-OS CLI command that returned `input`.
+    input : dict
+        JSON data structure returned by NX-OS that should be normalized.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    return _COMPILED_NORMALIZERS.get(command, normalize_output_iterative)(input)
+
+
+class NormalizedView(Mapping):
+    """Read-only view of an unnormalized JSON data structure that normalizes on access.
+
+    Consumers that only read a small part of a large output do not need to
+    pay for normalizing all of it. A `NormalizedView` wraps the data structure
+    returned by NX-OS without modifying it and presents every ROW_ value as a
+    list (following the same rules as `normalize_output_iterative`) only when
+    that value is accessed. Nested dictionaries and lists are presented as
+    views as well, and each view is cached once it has been created, so
+    subtrees that are never accessed cost nothing.
+
+    Views can be indexed, iterated, and measured with `len` like the
+    dictionaries and lists of normalized output. For example:
+
+    >>> view = NormalizedView({"TABLE_peer": {"ROW_peer": {"peer_ipaddr": "10.1.0.1"}}})
+    >>> len(view["TABLE_peer"]["ROW_peer"])
+    1
+    >>> view["TABLE_peer"]["ROW_peer"][0]["peer_ipaddr"]
+    '10.1.0.1'
+
+    Parameters
+    ----------
+    data : dict
+        JSON data structure returned by NX-OS.
+    """
+
+    __slots__ = ("_data", "_cache")
+
+    def __init__(self, data: dict):
+        self._data = data
+        self._cache: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of `key`, presenting ROW_ values as lists."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = self._data[key]
+        if isinstance(value, dict):
+            value = (
+                NormalizedListView([value]) if "ROW_" in key else NormalizedView(value)
+            )
+        elif isinstance(value, list):
+            value = NormalizedListView(value)
+        else:
+            return value
+        self._cache[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys of the wrapped dictionary."""
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        """Return the number of items in the wrapped data structure."""
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        """Return a representation of the view and the data structure it wraps."""
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class NormalizedListView(Sequence):
+    """Read-only view of a list within an unnormalized JSON data structure.
+
+    This is the counterpart of `NormalizedView` for lists, including the list
+    that a ROW_ value represented as a single dictionary is presented as. Its
+    dictionaries and lists are presented as views when they are accessed.
+
+    Parameters
+    ----------
+    data : list
+        List within a JSON data structure returned by NX-OS.
+    """
+
+    __slots__ = ("_data", "_cache")
+
+    def __init__(self, data: list):
+        self._data = data
+        self._cache: Dict[int, Any] = {}
+
+    def __getitem__(self, index):
+        """Return the item at `index`, presenting dictionaries and lists as views."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._data)))]
+        if index < 0:
+            index += len(self._data)
+            if index < 0:
+                raise IndexError("list index out of range")
+        try:
+            return self._cache[index]
+        except KeyError:
+            pass
+        value = self._data[index]
+        if isinstance(value, dict):
+            value = NormalizedView(value)
+        elif isinstance(value, list):
+            value = NormalizedListView(value)
+        else:
+            return value
+        self._cache[index] = value
+        return value
+
+    def __len__(self) -> int:
+        """Return the number of items in the wrapped data structure."""
+        return len(self._data)
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare items with those of a list or another list view."""
+        if isinstance(other, (list, NormalizedListView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Return a representation of the view and the data structure it wraps."""
+        return f"{type(self).__name__}({self._data!r})"
+
+
+def normalized_copy(input: dict) -> dict:
+    """Return a normalized copy of structured output without modifying the original.
+
+    This function follows the same rules as `normalize_output_iterative`, but
+    instead of modifying `input` in-place, it returns a new data structure.
+    Only the dictionaries and lists along the path to a ROW_ value that needs
+    to be wrapped in a list are copied. Every other dictionary, list, and
+    value is shared with `input`, which makes this far cheaper than
+    normalizing a ``copy.deepcopy`` of `input`. If nothing needs to be
+    normalized, `input` itself is returned.
+
+    Because the copy shares data with `input`, modifying one may modify the
+    other.
+
+    Parameters
+    ----------
+    input : dict
+        JSON data structure returned by NX-OS that should be normalized.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    # Each frame is [original container, iterator over its items, copy of the
+    # container (or None while nothing within it has changed), pending key].
+    stack: List[list] = [[input, iter(input.items()), None, None]]
+    result: Any = input
+    while stack:
+        frame = stack[-1]
+        for key, value in frame[1]:
+            if isinstance(value, dict):
+                frame[3] = key
+                stack.append([value, iter(value.items()), None, None])
+                break
+            elif isinstance(value, list):
+                frame[3] = key
+                stack.append([value, enumerate(value), None, None])
+                break
+        else:
+            stack.pop()
+            node, _, copy, _ = frame
+            result = node if copy is None else copy
+            if not stack:
+                break
+            parent = stack[-1]
+            original, _, parent_copy, key = parent
+            if isinstance(original, dict) and isinstance(node, dict) and "ROW_" in key:
+                result = [result]
+            if result is not node:
+                if parent_copy is None:
+                    parent_copy = parent[2] = (
+                        dict(original) if isinstance(original, dict) else list(original)
+                    )
+                parent_copy[key] = result
+    return result
+
+
+def _split_row_path(path: str) -> List[Tuple[str, ...]]:
+    """Split a path of ROW_ keys into segments that each end with a ROW_ key."""
+    segments = []
+    segment: List[str] = []
+    for key in path.split("."):
+        segment.append(key)
+        if "ROW_" in key:
+            segments.append(tuple(segment))
+            segment = []
+    if segment or not segments:
+        raise ValueError(f"Path {path!r} must end with a ROW_ key")
+    return segments
+
+
+def _resolve_rows(node: dict, segment: Tuple[str, ...]) -> Sequence[Any]:
+    """Return the rows found by following a path segment, whether they are a dictionary or list."""
+    for key in segment[:-1]:
+        node = node.get(key)
+        if not isinstance(node, dict):
+            return ()
+    rows = node.get(segment[-1])
+    if isinstance(rows, dict):
+        return (rows,)
+    if isinstance(rows, list):
+        return rows
+    return ()
+
+
+def iter_rows(
+    data: dict, path: str, ancestors: Union[bool, Sequence[str]] = False
+) -> Iterator[Any]:
+    """Iterate over the rows of a table in normalized or unnormalized output.
+
+    Rows are found by following `path`, which is made up of the keys leading
+    from the root of the data structure to the table's ROW_ key, joined by
+    periods. Every ROW_ key along the path may be represented as either a
+    dictionary or a list, so `data` does not need to be normalized or copied
+    beforehand. Missing tables are skipped. For example, every EIGRP neighbor
+    across all EIGRP processes and VRFs can be counted with:
+
+    >>> data = {"TABLE_asn": {"ROW_asn": {"asn": "1", "TABLE_vrf": {"ROW_vrf": {
+    ...     "vrf": "default", "TABLE_peer": {"ROW_peer": {"peer_ipaddr": "10.1.0.1"}}}}}}}
+    >>> path = "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+    >>> sum(1 for _ in iter_rows(data, path))
+    1
+
+    Fields of the rows enclosing each row (such as the ASN and VRF of an
+    EIGRP neighbor) can be yielded alongside each row with `ancestors`:
+
+    >>> next(iter_rows(data, path, ancestors=["asn", "vrf"]))
+    ({'asn': '1', 'vrf': 'default'}, {'peer_ipaddr': '10.1.0.1'})
+
+    Parameters
+    ----------
+    data : dict
+        Normalized or unnormalized JSON data structure returned by NX-OS.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods, such as
+        ``"TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"``.
+    ancestors : Union[bool, Sequence[str]], optional
+        If True, each row is yielded alongside a dictionary of the scalar
+        fields of every row enclosing it. If a sequence of field names, each
+        row is yielded alongside a dictionary of only those fields, which are
+        None if no enclosing row has them. Fields of nearer rows take
+        precedence. Defaults to False, in which case only rows are yielded.
+
+    Yields
+    ------
+    Any
+        Each row of the table, or a tuple of the ancestor fields of each row
+        and the row itself. Ancestor dictionaries are shared between rows and
+        should not be modified.
+    """
+    segments = _split_row_path(path)
+    last = len(segments) - 1
+    fields = None if isinstance(ancestors, bool) else tuple(ancestors)
+    with_context = fields is not None or ancestors is True
+    context: Optional[dict] = dict.fromkeys(fields) if fields is not None else {}
+    stack = [(iter(_resolve_rows(data, segments[0])), 0, context)]
+    end = object()
+    while stack:
+        rows, depth, context = stack[-1]
+        row = next(rows, end)
+        if row is end:
+            stack.pop()
+            continue
+        if not isinstance(row, (dict, Record)):
+            continue
+        if depth == last:
+            yield (context, row) if with_context else row
+            continue
+        if with_context:
+            context = dict(context)
+            if fields is None:
+                context.update(
+                    (k, v) for k, v in row.items() if not isinstance(v, (dict, list))
+                )
+            else:
+                context.update((k, row[k]) for k in fields if k in row)
+        stack.append(
+            (iter(_resolve_rows(row, segments[depth + 1])), depth + 1, context)
+        )
+
+
+class DictionaryColumn(NamedTuple):
+    """A column of a `ColumnarTable` whose values are dictionary-encoded.
+
+    Each distinct value is stored once in `categories`, and each row stores
+    the index of its value in `codes`. This is well suited for columns with
+    few distinct values, such as interface names or neighbor states.
+
+    Attributes
+    ----------
+    codes : array
+        Index of each row's value in `categories`.
+    categories : list
+        Distinct values of the column, in order of first appearance. Missing
+        values are represented by None.
+    """
+
+    codes: array
+    categories: list
+
+    def __len__(self) -> int:
+        """Return the number of rows in the column."""
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Any:
+        """Return the decoded value of the row at `index`."""
+        return self.categories[self.codes[index]]
+
+    def decode(self) -> list:
+        """Return the decoded value of every row in the column.
+
+        Returns
+        -------
+        list
+            Value of each row.
+        """
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+
+class ColumnarTable:
+    """Column-oriented copy of a table, as created by `to_columnar`.
+
+    Integer and floating point columns are stored in arrays of 64-bit
+    integers and doubles, and every other column is stored as a
+    `DictionaryColumn`. This takes a fraction of the memory of a list of
+    dictionaries, and operations over a single column touch only that column.
+
+    Parameters
+    ----------
+    columns : Dict[str, Union[array, DictionaryColumn]]
+        Columns of the table, keyed by field name.
+    length : int
+        Number of rows in the table.
+    """
+
+    __slots__ = ("columns", "length")
+
+    def __init__(self, columns: Dict[str, Union[array, DictionaryColumn]], length: int):
+        self.columns = columns
+        self.length = length
+
+    def __len__(self) -> int:
+        """Return the number of rows in the table."""
+        return self.length
+
+    def __getitem__(self, name: str) -> Union[array, DictionaryColumn]:
+        """Return the column of field `name`."""
+        return self.columns[name]
+
+    def __repr__(self) -> str:
+        """Return a representation of the table's size and columns."""
+        return (
+            f"{type(self).__name__}(rows={self.length}, columns={list(self.columns)!r})"
+        )
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Convert every column to a NumPy array.
+
+        Numeric columns share memory with their arrays instead of being
+        copied. Dictionary-encoded columns are decoded into arrays of objects
+        by indexing an array of their categories with their codes. NumPy is
+        an optional dependency, so it is only imported when this is called.
+
+        Returns
+        -------
+        Dict[str, numpy.ndarray]
+            NumPy array of each column, keyed by field name.
+        """
+        import numpy
+
+        arrays = {}
+        for name, column in self.columns.items():
+            if isinstance(column, DictionaryColumn):
+                categories = numpy.empty(len(column.categories), dtype=object)
+                categories[:] = column.categories
+                codes = numpy.frombuffer(
+                    column.codes, dtype=f"i{column.codes.itemsize}"
+                )
+                arrays[name] = categories[codes]
+            else:
+                dtype = numpy.int64 if column.typecode == "q" else numpy.float64
+                arrays[name] = numpy.frombuffer(column, dtype=dtype)
+        return arrays
+
+
+# Matches numbers with leading zeros, such as "0010", which are identifiers rather than numbers.
+_ZERO_PADDED = re.compile(r"-?0[0-9]")
+
+
+def _is_numeric_column(pattern: Pattern[str], values: Iterable[str]) -> bool:
+    """Return whether every string of a column is a number matching `pattern` exactly.
+
+    Unlike `int` and `float`, values that would not survive a round trip, such
+    as ``"0010"``, ``"1_000"``, ``" 7 "``, and ``"nan"``, are rejected.
+    Zero-padded values are identifiers, not numbers.
+    """
+    fullmatch = pattern.fullmatch
+    padded = _ZERO_PADDED.match
+    return all(fullmatch(value) and not padded(value) for value in values)
+
+
+def _encode_column(values: list) -> Union[array, DictionaryColumn]:
+    """Encode a column as an array of numbers if possible, or as a dictionary-encoded column."""
+    kinds = set(map(type, values))
+    try:
+        if kinds == {int}:
+            return array("q", values)
+        if kinds == {float} or kinds == {int, float}:
+            return array("d", values)
+        if kinds == {str}:
+            if _is_numeric_column(_INTEGER, values):
+                return array("q", map(int, values))
+            if _is_numeric_column(_FLOAT, values):
+                return array("d", map(float, values))
+    except OverflowError:
+        pass
+    index: Dict[Any, int] = {}
+    codes = array("i", [index.setdefault(value, len(index)) for value in values])
+    return DictionaryColumn(codes, list(index))
+
+
+def to_columnar(
+    data: dict, path: str, ancestors: Union[bool, Sequence[str]] = True
+) -> ColumnarTable:
+    """Convert a table in normalized or unnormalized output into a `ColumnarTable`.
+
+    Rows are found with `iter_rows`, and the fields of the rows enclosing
+    them (such as the VRF of a route) are flattened into additional columns.
+    A row's own fields take precedence over fields of the same name in its
+    ancestors. Fields whose values are dictionaries or lists are skipped.
+
+    Columns where every value is an integer, or every value is a string that
+    represents an integer, become arrays of 64-bit integers. Columns of
+    floating point numbers become arrays of doubles. Every other column,
+    including columns with missing values, is dictionary-encoded.
+
+    Parameters
+    ----------
+    data : dict
+        Normalized or unnormalized JSON data structure returned by NX-OS.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    ancestors : Union[bool, Sequence[str]], optional
+        Fields of enclosing rows to flatten into additional columns, as
+        accepted by `iter_rows`. Defaults to True, in which case every scalar
+        field of every enclosing row is flattened.
+
+    Returns
+    -------
+    ColumnarTable
+        Column-oriented copy of the table.
+    """
+    columns: Dict[str, list] = {}
+    length = 0
+    for item in iter_rows(data, path, ancestors):
+        sources = item if ancestors is not False else (item,)
+        for source in sources:
+            for k, v in source.items():
+                if isinstance(v, (dict, list)):
+                    continue
+                column = columns.get(k)
+                if column is None:
+                    column = columns[k] = [None] * length
+                elif len(column) < length:
+                    column.extend([None] * (length - len(column)))
+                elif len(column) > length:
+                    column[length] = v
+                    continue
+                column.append(v)
+        length += 1
+    for column in columns.values():
+        column.extend([None] * (length - len(column)))
+    return ColumnarTable({k: _encode_column(v) for k, v in columns.items()}, length)
+
+
+class Record(Mapping):
+    """Base class of the compact table rows created by `rows_to_records`.
+
+    Each table gets its own subclass of `Record` whose ``__slots__`` are the
+    fields of the table. Unlike a dictionary, a `Record` does not have a
+    per-row hash table, so it takes a fraction of the memory of a dictionary
+    with the same fields.
+
+    Records are read-only mappings, so fields are accessed by their original
+    name with ``row["peer_ipaddr"]`` or ``row.get("peer_ipaddr")``. Fields are
+    also attributes, such as ``row.peer_ipaddr``. Characters of field names
+    that are not valid in identifiers are replaced with underscores, so the
+    ``ucast-nhops`` field is the ``ucast_nhops`` attribute. A row that lacks
+    some of its table's fields behaves like a dictionary that lacks them.
+    """
+
+    __slots__ = ()
+    _attributes: Dict[str, str] = {}
+    _from_dict: Optional[Callable[[dict], "Record"]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of field `key`."""
+        try:
+            return getattr(self, self._attributes[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names of the fields the row has."""
+        for key, attribute in self._attributes.items():
+            if hasattr(self, attribute):
+                yield key
+
+    def __len__(self) -> int:
+        """Return the number of fields the row has."""
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        """Return a representation of the row's fields and values."""
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+_RECORD_CLASSES: Dict[Tuple[str, Tuple[str, ...]], type] = {}
+
+
+def _record_class(key: str, fields: Tuple[str, ...]) -> type:
+    """Return the `Record` subclass for a table's ROW_ key and fields, creating it if needed."""
+    try:
+        return _RECORD_CLASSES[key, fields]
+    except KeyError:
+        pass
+    reserved = set(dir(Record))
+    attributes: Dict[str, str] = {}
+    for field in fields:
+        attribute = re.sub(r"\W", "_", field)
+        if not attribute or attribute[0].isdigit():
+            attribute = f"_{attribute}"
+        while keyword.iskeyword(attribute) or attribute in reserved:
+            attribute = f"{attribute}_"
+        reserved.add(attribute)
+        attributes[field] = attribute
+    name = re.sub(r"\W", "_", key)
+    namespace = {
+        "__slots__": tuple(attributes.values()),
+        "__module__": __name__,
+        "_attributes": attributes,
+    }
+    cls = type(name, (Record,), namespace)
+    cls._from_dict = staticmethod(_generate_record_converter(cls, attributes))
+    _RECORD_CLASSES[key, fields] = cls
+    return cls
+
+
+def _generate_record_converter(
+    cls: type, attributes: Dict[str, str]
+) -> Callable[[dict], Any]:
+    """Generate a function that converts a dictionary into a `cls` record.
+
+    Rows that have every field take a fast path of straight-line attribute
+    assignments. Rows that lack some fields only set the fields they have.
+    """
+    lines = [
+        "def convert(row):",
+        "    record = new(cls)",
+        f"    if len(row) == {len(attributes)}:",
+    ]
+    for field, attribute in attributes.items():
+        lines.append(f"        record.{attribute} = row[{field!r}]")
+    lines.append("    else:")
+    lines.append("        for field, value in row.items():")
+    lines.append("            setters[field](record, value)")
+    lines.append("    return record")
+    setters = {
+        field: getattr(cls, attribute).__set__
+        for field, attribute in attributes.items()
+    }
+    namespace = {"new": cls.__new__, "cls": cls, "setters": setters}
+    exec("\n".join(lines) + "\n", namespace)
+    return namespace["convert"]
+
+
+def rows_to_records(key: str, row_lists: Iterable[list]) -> type:
+    """Convert the rows of a table from dictionaries into `Record` objects in-place.
+
+    The fields of the table are inferred from the union of the keys of every
+    row, in order of first appearance, and a `Record` subclass with a slot
+    for each field is generated (or reused, if one was already generated for
+    the same ROW_ key and fields). Items of the lists that are not
+    dictionaries are left as-is.
+
+    Parameters
+    ----------
+    key : str
+        ROW_ key of the table, which is used to name the generated class.
+    row_lists : Iterable[list]
+        Normalized lists of rows of the table, such as every ``ROW_peer`` list
+        across every VRF of ``show ip eigrp neighbors`` output.
+
+    Returns
+    -------
+    type
+        `Record` subclass the rows were converted into.
+    """
+    row_lists = list(row_lists)
+    fields: Dict[str, None] = {}
+    for rows in row_lists:
+        for row in rows:
+            if isinstance(row, dict):
+                fields.update(dict.fromkeys(row))
+    cls = _record_class(key, tuple(fields))
+    convert = cls._from_dict
+    for rows in row_lists:
+        rows[:] = [convert(row) if isinstance(row, dict) else row for row in rows]
+    return cls
+
+
+class InternPool:
+    """Deduplicates the keys and low-cardinality values of NX-OS data structures.
+
+    NX-OS output repeats the same keys (such as ``peer_ipaddr``, ``intf``, and
+    ``state``) and the same low-cardinality values (such as ``EXSTART``,
+    ``DROTHER``, and ``Vlan10``) many times over, and each occurrence is a
+    separate string once it has been deserialized. An `InternPool` replaces
+    every occurrence with a single shared string. Pools can be shared across
+    many outputs, such as a snapshot of every switch in a fleet, so that
+    strings are shared across outputs as well.
+
+    Keys are always deduplicated. String values are deduplicated for each key
+    until the key has been seen with more than `max_cardinality` distinct
+    values, at which point the key is considered high-cardinality (such as an
+    IP address or uptime), and its values are no longer deduplicated.
+
+    Parameters
+    ----------
+    max_cardinality : int, optional
+        Maximum number of distinct values of a key for its values to be
+        deduplicated. Defaults to 1000.
+
+    Attributes
+    ----------
+    bytes_saved : int
+        Approximate total size of the duplicate strings that have been
+        replaced with a shared string, as measured by `sys.getsizeof`.
+    """
+
+    def __init__(self, max_cardinality: int = 1000):
+        self.max_cardinality = max_cardinality
+        self.bytes_saved = 0
+        self._keys: Dict[str, str] = {}
+        # JSON decoders usually share key strings within a document already,
+        # so each replaced key string is only counted towards bytes saved once.
+        self._replaced_keys: set = set()
+        # Shared values of each key, or None once the key is high-cardinality.
+        self._values: Dict[str, Optional[Dict[str, str]]] = {}
+
+    def intern_dict(self, obj: dict) -> dict:
+        """Return a copy of a dictionary with its keys and low-cardinality values deduplicated.
+
+        Parameters
+        ----------
+        obj : dict
+            Dictionary whose keys and values should be deduplicated. Nested
+            dictionaries and lists are not visited.
+
+        Returns
+        -------
+        dict
+            Dictionary with deduplicated keys and values.
+        """
+        keys = self._keys
+        values = self._values
+        max_cardinality = self.max_cardinality
+        getsizeof = sys.getsizeof
+        replaced_keys = self._replaced_keys
+        if len(replaced_keys) > 65536:
+            replaced_keys.clear()
+        saved = 0
+        result = {}
+        for k, v in obj.items():
+            key = keys.setdefault(k, k)
+            if key is not k and id(k) not in replaced_keys:
+                replaced_keys.add(id(k))
+                saved += getsizeof(k)
+            if v.__class__ is str:
+                pool = values.get(key, False)
+                if pool is False:
+                    pool = values[key] = {}
+                if pool is not None:
+                    shared = pool.setdefault(v, v)
+                    if shared is not v:
+                        saved += getsizeof(v)
+                        v = shared
+                    elif len(pool) > max_cardinality:
+                        values[key] = None
+            result[key] = v
+        self.bytes_saved += saved
+        return result
+
+    def intern_tree(self, data: Any) -> Any:
+        """Deduplicate the keys and low-cardinality values of a data structure in-place.
+
+        Parameters
+        ----------
+        data : Any
+            JSON data structure whose dictionaries should be deduplicated.
+
+        Returns
+        -------
+        Any
+            The same data structure.
+        """
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                interned = self.intern_dict(node)
+                node.clear()
+                node.update(interned)
+                stack.extend(
+                    v for v in interned.values() if isinstance(v, (dict, list))
+                )
+            elif isinstance(node, list):
+                stack.extend(v for v in node if isinstance(v, (dict, list)))
+        return data
+
+
+_DURATION = re.compile(
+    r"P(?:([0-9]+)Y)?(?:([0-9]+)M)?(?:([0-9]+)W)?(?:([0-9]+)D)?"
+    r"(?:T(?:([0-9]+)H)?(?:([0-9]+)M)?(?:([0-9]+(?:\.[0-9]+)?)S)?)?"
+)
+_INTEGER = re.compile(r"-?[0-9]+")
+_FLOAT = re.compile(r"-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+_BOOLEANS = {"true": True, "false": False}
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_duration(value: str) -> timedelta:
+    """Parse an ISO 8601 duration, such as the ``P14DT19H11M58S`` uptimes NX-OS returns.
+
+    Uptimes repeat heavily across the rows of a table, so parsed durations
+    are memoized. Years and months are treated as 365 and 30 days.
+
+    Parameters
+    ----------
+    value : str
+        ISO 8601 duration.
+
+    Returns
+    -------
+    timedelta
+        Parsed duration.
+
+    Raises
+    ------
+    ValueError
+        If `value` is not an ISO 8601 duration.
+    """
+    match = _DURATION.fullmatch(value)
+    if match is None or value in ("P", "PT") or value.endswith("T"):
+        raise ValueError(f"Invalid ISO 8601 duration: {value!r}")
+    years, months, weeks, days, hours, minutes, seconds = match.groups()
+    return timedelta(
+        days=int(years or 0) * 365 + int(months or 0) * 30 + int(days or 0),
+        weeks=int(weeks or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=float(seconds or 0),
+    )
+
+
+def _parse_boolean(value: str) -> bool:
+    """Parse the ``true`` and ``false`` strings NX-OS returns for booleans."""
+    try:
+        return _BOOLEANS[value]
+    except KeyError:
+        raise ValueError(f"Invalid boolean: {value!r}") from None
+
+
+_FIELD_TYPES: Dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "float": float,
+    "bool": _parse_boolean,
+    "duration": parse_duration,
+}
+
+
+def _matches_field_type(field_type: str, value: str) -> bool:
+    """Return whether a string value can be converted to a field type."""
+    if field_type == "int":
+        return _is_numeric_column(_INTEGER, (value,))
+    if field_type == "float":
+        return _is_numeric_column(_FLOAT, (value,))
+    if field_type == "bool":
+        return value in _BOOLEANS
+    try:
+        parse_duration(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _infer_table_types(tables: Dict[str, List[list]]) -> Dict[str, Dict[str, str]]:
+    """Infer the field types of each table from lists of its rows, keyed by ROW_ key."""
+    inferred: Dict[str, Dict[str, str]] = {}
+    for key, row_lists in tables.items():
+        candidates: Dict[str, List[str]] = {}
+        for rows in row_lists:
+            for row in rows:
+                if not isinstance(row, (dict, Record)):
+                    continue
+                for field, value in row.items():
+                    remaining = candidates.get(field)
+                    if remaining is None:
+                        remaining = candidates[field] = list(_FIELD_TYPES)
+                    if not remaining:
+                        continue
+                    if value.__class__ is not str:
+                        remaining.clear()
+                        continue
+                    remaining[:] = [
+                        t for t in remaining if _matches_field_type(t, value)
+                    ]
+        types = {
+            field: remaining[0] for field, remaining in candidates.items() if remaining
+        }
+        if types:
+            inferred[key] = types
+    return inferred
+
+
+def infer_field_types(samples: Iterable[dict]) -> Dict[str, Dict[str, str]]:
+    """Infer the types of the fields of every table found in sample output of a command.
+
+    NX-OS returns every value as a string, such as ``"nbrcount": "2"`` or
+    ``"uptime": "P14DT19H11M58S"``. A field is given a type if every one of
+    its values in every sample can be converted to that type. The types are
+    tried in order: ``"int"``, ``"float"``, ``"bool"`` (the strings ``true``
+    and ``false``), and ``"duration"`` (ISO 8601 durations, which are
+    converted into `datetime.timedelta` objects). Zero-padded values, such as
+    ``"0010"``, are identifiers whose text would be lost by a conversion, so
+    they match neither ``"int"`` nor ``"float"``. Fields that do not match any
+    type are left out.
+
+    The result can be passed to the `coerce` parameter of
+    `normalize_output_iterative`. Types can also be declared by hand in the
+    same format, and a callable that converts a string may be given in place
+    of a type name.
+
+    Parameters
+    ----------
+    samples : Iterable[dict]
+        Normalized or unnormalized JSON data structures returned by NX-OS for
+        the same command.
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        Type of each field of each table, keyed by ROW_ key and field name,
+        such as ``{"ROW_nbr": {"priority": "int", "uptime": "duration"}}``.
+    """
+    tables: Dict[str, List[list]] = {}
+    for sample in samples:
+        stack = [sample]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    if "ROW_" in k and isinstance(v, (dict, list)):
+                        tables.setdefault(k, []).append(
+                            [v] if isinstance(v, dict) else v
+                        )
+                    if isinstance(v, (dict, list)):
+                        stack.append(v)
+            elif isinstance(node, list):
+                stack.extend(node)
+    return _infer_table_types(tables)
+
+
+_COERCERS: Dict[Tuple[Tuple[str, Any], ...], Callable[[dict], None]] = {}
+
+
+def _compile_coercer(types: Dict[str, Any]) -> Callable[[dict], None]:
+    """Generate a function that converts the fields of a row in-place, as described by `types`.
+
+    Values that are not strings, or that cannot be converted, are left as-is.
+    """
+    cache_key = tuple(types.items())
+    try:
+        return _COERCERS[cache_key]
+    except (KeyError, TypeError):
+        pass
+    namespace: Dict[str, Any] = {}
+    lines = ["def coerce(row):"]
+    for index, (field, field_type) in enumerate(types.items()):
+        namespace[f"convert{index}"] = _FIELD_TYPES.get(field_type, field_type)
+        lines.append(f"    value = row.get({field!r})")
+        lines.append("    if value.__class__ is str:")
+        lines.append("        try:")
+        lines.append(f"            row[{field!r}] = convert{index}(value)")
+        lines.append("        except ValueError:")
+        lines.append("            pass")
+    if len(lines) == 1:
+        lines.append("    pass")
+    exec("\n".join(lines) + "\n", namespace)
+    coercer = namespace["coerce"]
+    try:
+        _COERCERS[cache_key] = coercer
+    except TypeError:
+        pass
+    return coercer
+
+
+_PROCESS_POOL: Optional[Executor] = None
+
+
+def _process_pool() -> Executor:
+    """Return the process pool shared by calls to `normalize_async`, creating it if needed."""
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _PROCESS_POOL = ProcessPoolExecutor()
+    return _PROCESS_POOL
+
+
+async def _normalize_cooperatively(input: dict, yield_every: int) -> dict:
+    """Normalize a data structure on the event loop, yielding to it every `yield_every` nodes."""
+    import asyncio
+
+    stack = [input]
+    pop = stack.pop
+    push = stack.append
+    visited = 0
+    while stack:
+        visited += 1
+        if visited >= yield_every:
+            visited = 0
+            await asyncio.sleep(0)
+        node = pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if isinstance(v, dict):
+                    if "ROW_" in k:
+                        node[k] = [v]
+                    push(v)
+                elif isinstance(v, list):
+                    push(v)
+        else:
+            for item in node:
+                if isinstance(item, (dict, list)):
+                    push(item)
+    return input
+
+
+async def normalize_async(
+    data: Union[str, bytes, bytearray, dict],
+    executor: Optional[Executor] = None,
+    process_threshold: Optional[int] = None,
+    yield_every: Optional[int] = None,
+) -> dict:
+    """Deserialize and normalize output without blocking the event loop.
+
+    Deserializing and normalizing a large output, such as the output of
+    ``show ip route vrf all | json``, can take long enough to stall every
+    other task on the event loop. This coroutine runs that work in an
+    executor instead. JSON text is deserialized in the event loop's default
+    thread pool, unless it is at least `process_threshold` bytes, in which
+    case it is deserialized with `loads_normalized` in a shared process pool.
+    Data structures that are already deserialized are normalized in the
+    thread pool.
+
+    In threads, JSON text is always deserialized with the standard library's
+    decoder, whichever JSON backend is in use. Its object hook runs Python
+    code for every object, which lets the interpreter hand the GIL back to
+    the event loop while the document is decoded. Third-party backends, such
+    as orjson, decode the whole document without releasing the GIL, so they
+    would stall the event loop for as long as deserializing takes.
+
+    A process pool keeps deserialization from competing with the event loop
+    for the GIL, but the result must be copied back, and unpickling it holds
+    the GIL for about as long as deserializing it would. It pays off when many
+    large outputs are deserialized at once and CPU time is the bottleneck, not
+    for reducing event loop stalls, so it is not used by default.
+
+    If `yield_every` is given, a data structure that is already deserialized
+    is instead normalized on the event loop, which is given a chance to run
+    other tasks after every `yield_every` nodes. This avoids handing the data
+    structure to another thread.
+
+    Parameters
+    ----------
+    data : Union[str, bytes, bytearray, dict]
+        JSON document returned by NX-OS, or a data structure that has already
+        been deserialized from it.
+    executor : Optional[Executor], optional
+        Executor to use no matter the size of `data`. Defaults to None, in
+        which case the executor is chosen as described above.
+    process_threshold : Optional[int], optional
+        Size in bytes of JSON text at which a process pool is used instead of
+        a thread pool. Defaults to None, in which case a process pool is never
+        used.
+    yield_every : Optional[int], optional
+        Number of nodes to normalize before yielding to the event loop in
+        cooperative mode. Defaults to None, in which case cooperative mode is
+        not used.
+
+    Returns
+    -------
+    dict
+        Normalized JSON data structure.
+    """
+    import asyncio
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    if isinstance(data, dict):
+        if yield_every is not None:
+            return await _normalize_cooperatively(data, yield_every)
+        return await loop.run_in_executor(executor, normalize_output_iterative, data)
+    if (
+        executor is None
+        and process_threshold is not None
+        and len(data) >= process_threshold
+    ):
+        executor = _process_pool()
+    if isinstance(executor, ProcessPoolExecutor):
+        return await loop.run_in_executor(executor, loads_normalized, data)
+    return await loop.run_in_executor(executor, _loads_single_pass, data)
+
+
+class RowDiff(NamedTuple):
+    """Describes the rows of a table that differ between two snapshots.
+
+    Rows are keyed by their identity, which is a tuple of the values of the
+    identity key fields in the order they were given.
+
+    Attributes
+    ----------
+    added : Dict[tuple, Any]
+        Rows only found in the newer snapshot.
+    removed : Dict[tuple, Any]
+        Rows only found in the older snapshot.
+    changed : Dict[tuple, Tuple[Any, Any]]
+        Rows found in both snapshots whose fields differ, as a tuple of the
+        older and newer row.
+    """
+
+    added: Dict[tuple, Any]
+    removed: Dict[tuple, Any]
+    changed: Dict[tuple, Tuple[Any, Any]]
+
+
+def _index_rows(data: dict, path: str, key: Tuple[str, ...]) -> Dict[tuple, Any]:
+    """Map the identity of each row of a table to the row.
+
+    Identity key fields are taken from the row itself if present, and from
+    the rows enclosing it otherwise.
+    """
+    index: Dict[tuple, Any] = {}
+    setdefault = index.setdefault
+    getter = itemgetter(*key)
+    single = len(key) == 1
+    for context, row in iter_rows(data, path, ancestors=key):
+        try:
+            identity = (getter(row),) if single else getter(row)
+        except KeyError:
+            identity = tuple(row[k] if k in row else context[k] for k in key)
+        if setdefault(identity, row) is not row:
+            raise ValueError(f"Identity {identity!r} is not unique in table {path!r}")
+    return index
+
+
+def _diff_indexes(
+    old: Dict[tuple, Any], new: Dict[tuple, Any], ignore: Tuple[str, ...]
+) -> RowDiff:
+    """Compare two indexes of the rows of a table, built by `_index_rows`."""
+    added = {identity: row for identity, row in new.items() if identity not in old}
+    removed: Dict[tuple, Any] = {}
+    changed: Dict[tuple, Tuple[Any, Any]] = {}
+    for identity, old_row in old.items():
+        new_row = new.get(identity, removed)
+        if new_row is removed:
+            removed[identity] = old_row
+        elif old_row != new_row:
+            if ignore and all(
+                old_row.get(k) == new_row.get(k)
+                for k in old_row.keys() | new_row.keys()
+                if k not in ignore
+            ):
+                continue
+            changed[identity] = (old_row, new_row)
+    return RowDiff(added, removed, changed)
+
+
+def diff_rows(
+    old: dict,
+    new: dict,
+    path: str,
+    key: Union[str, Sequence[str]],
+    ignore: Iterable[str] = (),
+) -> RowDiff:
+    """Compare the rows of a table between two snapshots of output of the same command.
+
+    Rows are found with `iter_rows`, so the snapshots do not need to be
+    normalized. Rows of each snapshot are matched by their identity key,
+    such as ``["vrf", "peer_ipaddr"]`` for EIGRP neighbors. Identity key
+    fields are taken from the row itself if present, and from the rows
+    enclosing it (such as the VRF of a neighbor) otherwise. Only rows that
+    were added, removed, or changed are returned, so consumers of the
+    difference only have to process the rows that changed.
+
+    To compare successive polls of the same command, `RowDiffer` avoids
+    indexing each snapshot twice.
+
+    Parameters
+    ----------
+    old : dict
+        Older normalized or unnormalized JSON data structure.
+    new : dict
+        Newer normalized or unnormalized JSON data structure.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    key : Union[str, Sequence[str]]
+        Field or fields that uniquely identify each row of the table.
+    ignore : Iterable[str], optional
+        Fields whose changes should not make a row count as changed, such as
+        uptimes and counters. Defaults to no fields.
+
+    Returns
+    -------
+    RowDiff
+        Rows that were added, removed, or changed.
+
+    Raises
+    ------
+    ValueError
+        If `path` does not end with a ROW_ key, or the identity key of two
+        rows of the same snapshot is the same.
+    """
+    key = (key,) if isinstance(key, str) else tuple(key)
+    return _diff_indexes(
+        _index_rows(old, path, key), _index_rows(new, path, key), tuple(ignore)
+    )
+
+
+class RowDiffer:
+    """Compares the rows of a table across successive polls of the same command.
+
+    Each call to `update` indexes only the newest snapshot, which is kept for
+    comparison with the next one. See `diff_rows` for details.
+
+    Parameters
+    ----------
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    key : Union[str, Sequence[str]]
+        Field or fields that uniquely identify each row of the table.
+    ignore : Iterable[str], optional
+        Fields whose changes should not make a row count as changed. Defaults
+        to no fields.
+    """
+
+    def __init__(
+        self, path: str, key: Union[str, Sequence[str]], ignore: Iterable[str] = ()
+    ):
+        _split_row_path(path)
+        self.path = path
+        self.key = (key,) if isinstance(key, str) else tuple(key)
+        self.ignore = tuple(ignore)
+        self._previous: Dict[tuple, Any] = {}
+
+    def update(self, data: dict) -> RowDiff:
+        """Compare a snapshot with the previous one, then keep it for the next comparison.
+
+        Every row of the first snapshot is reported as added.
+
+        Parameters
+        ----------
+        data : dict
+            Normalized or unnormalized JSON data structure. Rows are kept
+            until the next call, so they should not be modified.
+
+        Returns
+        -------
+        RowDiff
+            Rows that were added, removed, or changed since the previous
+            snapshot.
+        """
+        current = _index_rows(data, self.path, self.key)
+        diff = _diff_indexes(self._previous, current, self.ignore)
+        self._previous = current
+        return diff
+
+
+class IndexedRow(NamedTuple):
+    """Describes a row found in a `TableIndex`.
+
+    Attributes
+    ----------
+    context : dict
+        Fields of the rows enclosing the row, as yielded by `iter_rows`.
+        Context dictionaries are shared between rows and should not be
+        modified.
+    row : Any
+        Row of the table.
+    """
+
+    context: dict
+    row: Any
+
+
+class TableIndex(Mapping):
+    """Maps the values of one or more key fields to the rows of a table that have them.
+
+    Rows are added with `add`, with `build_index`, or while normalizing with
+    `normalize_output_iterative`. Looking up a key returns a list of every
+    `IndexedRow` with that key, in the order the rows appear in the output,
+    whichever way the index was built. For example, the EIGRP neighbors on an
+    interface can be found with:
+
+    >>> data = {"TABLE_asn": {"ROW_asn": {"asn": "1", "TABLE_vrf": {"ROW_vrf": {
+    ...     "vrf": "default", "TABLE_peer": {"ROW_peer": {
+    ...         "peer_ipaddr": "10.1.0.1", "peer_ifname": "Eth1/1"}}}}}}}
+    >>> path = "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+    >>> index = build_index(data, path, "peer_ifname")
+    >>> [(entry.context["vrf"], entry.row["peer_ipaddr"]) for entry in index["Eth1/1"]]
+    [('default', '10.1.0.1')]
+
+    Keys can also be iterated in sorted order with `range` and `prefix`. The
+    sorted order is built the first time it is needed after rows are added.
+
+    Parameters
+    ----------
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    key : Union[str, Sequence[str]]
+        Field or fields to index rows by. Fields are taken from the row itself
+        if present, and from the rows enclosing it otherwise. If there are
+        several fields, keys are tuples of their values. Missing fields have a
+        value of None.
+    ancestors : Union[bool, Sequence[str]], optional
+        Fields of the rows enclosing each row to keep alongside it, as
+        accepted by `iter_rows`. Defaults to True, in which case every scalar
+        field of every enclosing row is kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key: Union[str, Sequence[str]],
+        ancestors: Union[bool, Sequence[str]] = True,
+    ):
+        self.segments = _split_row_path(path)
+        self.path = path
+        self.key = key
+        self.fields = (key,) if isinstance(key, str) else tuple(key)
+        self.ancestors = ancestors
+        self._getter = itemgetter(*self.fields)
+        if len(self.fields) == 1 and not isinstance(key, str):
+            field = self.fields[0]
+            self._getter = lambda row: (row[field],)
+        self._entries: Dict[Any, List[IndexedRow]] = {}
+        self._sorted_keys: Optional[list] = None
+        # Rows of the same table share their context, so its projection is memoized.
+        self._context: Optional[dict] = None
+        self._projection: dict = {}
+
+    def __getitem__(self, key: Any) -> List[IndexedRow]:
+        """Return every row with a key."""
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over keys in the order they were first added."""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """Return the number of distinct keys."""
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        """Return a representation of the index."""
+        return f"TableIndex({self.path!r}, {self.key!r}, {len(self)} keys)"
+
+    def _key_of(self, context: dict, row: Any) -> Any:
+        """Return the key of a row that lacks some key fields itself."""
+        values = tuple(row[k] if k in row else context.get(k) for k in self.fields)
+        return values[0] if isinstance(self.key, str) else values
+
+    def add(self, context: dict, row: Any) -> None:
+        """Add a row of the table to the index.
+
+        Parameters
+        ----------
+        context : dict
+            Fields of the rows enclosing the row, which must include any key
+            fields the row does not have itself. Only the fields selected by
+            `ancestors` are kept.
+        row : Any
+            Row of the table.
+        """
+        try:
+            key = self._getter(row)
+        except KeyError:
+            key = self._key_of(context, row)
+        if context is not self._context:
+            self._context = context
+            self._projection = _project_context(self, context)
+        entries = self._entries.get(key)
+        if entries is None:
+            self._entries[key] = [IndexedRow(self._projection, row)]
+            self._sorted_keys = None
+        else:
+            entries.append(IndexedRow(self._projection, row))
+
+    def _sorted(self) -> list:
+        """Return keys in sorted order, skipping keys with missing fields."""
+        if self._sorted_keys is None:
+            if isinstance(self.key, str):
+                keys = [key for key in self._entries if key is not None]
+            else:
+                keys = [key for key in self._entries if None not in key]
+            keys.sort()
+            self._sorted_keys = keys
+        return self._sorted_keys
+
+    def range(
+        self, low: Any = None, high: Any = None
+    ) -> Iterator[Tuple[Any, List[IndexedRow]]]:
+        """Iterate over keys between two bounds in sorted order, and the rows with each key.
+
+        Parameters
+        ----------
+        low : Any, optional
+            Smallest key to include. Defaults to None, in which case keys
+            start with the smallest key.
+        high : Any, optional
+            Key to stop before. Defaults to None, in which case keys end with
+            the largest key.
+
+        Yields
+        ------
+        Tuple[Any, List[IndexedRow]]
+            Each key and every row with that key.
+        """
+        keys = self._sorted()
+        start = 0 if low is None else bisect_left(keys, low)
+        stop = len(keys) if high is None else bisect_left(keys, high)
+        for key in keys[start:stop]:
+            yield key, self._entries[key]
+
+    def prefix(self, prefix: str) -> Iterator[Tuple[Any, List[IndexedRow]]]:
+        """Iterate over string keys that start with a prefix in sorted order, and their rows.
+
+        For an index with several key fields, the prefix applies to the first
+        field.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix keys should start with, such as ``"0050.56"`` for MAC
+            addresses of a vendor.
+
+        Yields
+        ------
+        Tuple[Any, List[IndexedRow]]
+            Each key and every row with that key.
+        """
+        keys = self._sorted()
+        composite = not isinstance(self.key, str)
+        start = bisect_left(keys, (prefix,) if composite else prefix)
+        for key in keys[start:]:
+            value = key[0] if composite else key
+            if not isinstance(value, str) or not value.startswith(prefix):
+                return
+            yield key, self._entries[key]
+
+
+def build_index(
+    data: dict,
+    path: str,
+    key: Union[str, Sequence[str]],
+    ancestors: Union[bool, Sequence[str]] = True,
+) -> TableIndex:
+    """Build a `TableIndex` over a table in normalized or unnormalized output.
+
+    To build indexes while normalizing output instead, pass `TableIndex`
+    objects to `normalize_output_iterative`.
+
+    Parameters
+    ----------
+    data : dict
+        Normalized or unnormalized JSON data structure returned by NX-OS.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    key : Union[str, Sequence[str]]
+        Field or fields to index rows by.
+    ancestors : Union[bool, Sequence[str]], optional
+        Fields of the rows enclosing each row to keep alongside it. Defaults
+        to True, in which case every scalar field of every enclosing row is
+        kept.
+
+    Returns
+    -------
+    TableIndex
+        Index over the rows of the table.
+    """
+    index = TableIndex(path, key, ancestors)
+    for context, row in iter_rows(data, path, ancestors=_index_ancestors(index)):
+        index.add(context, row)
+    return index
+
+
+def _index_ancestors(index: TableIndex) -> Union[bool, Tuple[str, ...]]:
+    """Return the ancestor fields needed to build an index, including its key fields."""
+    if index.ancestors is True:
+        return True
+    fields = tuple(index.ancestors) if index.ancestors else ()
+    return fields + tuple(k for k in index.fields if k not in fields)
+
+
+def _project_context(index: TableIndex, context: dict) -> dict:
+    """Return the ancestor fields of a context that an index keeps."""
+    if index.ancestors is True:
+        return context
+    if not index.ancestors:
+        return {}
+    return {k: context.get(k) for k in index.ancestors}
+
+
+class _Indexer:
+    """Adds rows to indexes while `normalize_output_iterative` walks a data structure.
+
+    Dictionaries along the paths of the indexes are tracked by their id,
+    alongside the keys leading to them and the rows enclosing them. When the
+    walk reaches a tracked dictionary, `visit` normalizes its ROW_ keys,
+    records the rows of indexed tables, and tracks its children that lead to
+    other indexed tables. Rows are only added to the indexes by `flush`, once
+    their fields have been converted by ``coerce``, so that they are keyed by
+    the values they hold.
+    """
+
+    def __init__(self, root: dict, indexes: Iterable[TableIndex]):
+        self.targets: Dict[Tuple[str, ...], List[TableIndex]] = {}
+        self.prefixes = set()
+        for index in indexes:
+            keys = tuple(k for segment in index.segments for k in segment)
+            self.targets.setdefault(keys, []).append(index)
+            self.prefixes.update(keys[:depth] for depth in range(1, len(keys)))
+        self.tracked: Dict[int, Tuple[Tuple[str, ...], Tuple[dict, ...]]] = {
+            id(root): ((), ())
+        }
+        self.pending: List[Tuple[List[TableIndex], Tuple[dict, ...], list]] = []
+
+    def visit(self, node: dict) -> None:
+        """Record the rows of the indexed tables directly beneath a tracked dictionary."""
+        path, enclosing = self.tracked.pop(id(node))
+        for k, v in node.items():
+            child_path = path + (k,)
+            targets = self.targets.get(child_path)
+            deeper = child_path in self.prefixes
+            if targets is None and not deeper:
+                continue
+            if "ROW_" not in k:
+                if deeper and isinstance(v, dict):
+                    self.tracked[id(v)] = (child_path, enclosing)
+                continue
+            if isinstance(v, dict):
+                v = node[k] = [v]
+            elif not isinstance(v, list):
+                continue
+            if targets is not None:
+                self.pending.append((targets, enclosing, v))
+            if deeper:
+                for row in v:
+                    if isinstance(row, dict):
+                        self.tracked[id(row)] = (child_path, enclosing + (row,))
+
+    def flush(self) -> None:
+        """Add the recorded rows to the indexes, in the order they were found."""
+        contexts: Dict[Tuple[int, ...], dict] = {}
+        for targets, enclosing, rows in self.pending:
+            key = tuple(map(id, enclosing))
+            context = contexts.get(key)
+            if context is None:
+                context = contexts[key] = {
+                    f: value
+                    for row in enclosing
+                    for f, value in row.items()
+                    if not isinstance(value, (dict, list))
+                }
+            for index in targets:
+                for row in rows:
+                    if isinstance(row, (dict, Record)):
+                        index.add(context, row)
+        self.pending = []
+
+    def replace_rows(self, replacements: Dict[int, Any]) -> None:
+        """Point index entries at the objects that replaced their rows, such as records."""
+        if not replacements:
+            return
+        for indexes in self.targets.values():
+            for index in indexes:
+                for entries in index._entries.values():
+                    for position, entry in enumerate(entries):
+                        row = replacements.get(id(entry.row))
+                        if row is not None:
+                            entries[position] = IndexedRow(entry.context, row)
+
+
+def _iter_outputs(data: Union[dict, Iterable[dict]]) -> Iterable[dict]:
+    """Return the outputs to aggregate over, whether a single output or several are given."""
+    return (data,) if isinstance(data, dict) else data
+
+
+def _iter_group_keys(
+    data: Union[dict, Iterable[dict]], path: str, by: Union[str, Sequence[str]]
+) -> Iterator[Tuple[Any, Any]]:
+    """Yield the group key and row of every row of a table across one or more outputs."""
+    fields = (by,) if isinstance(by, str) else tuple(by)
+    getter = itemgetter(*fields)
+    single = isinstance(by, str)
+    for output in _iter_outputs(data):
+        for context, row in iter_rows(output, path, ancestors=fields):
+            try:
+                key = getter(row)
+            except KeyError:
+                values = tuple(row[k] if k in row else context[k] for k in fields)
+                key = values[0] if single else values
+            else:
+                if not single and len(fields) == 1:
+                    key = (key,)
+            yield key, row
+
+
+def _number(value: Any) -> Union[int, float]:
+    """Convert a field value, which NX-OS usually returns as a string, into a number."""
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def count_rows(
+    data: Union[dict, Iterable[dict]],
+    path: str,
+    by: Union[None, str, Sequence[str]] = None,
+) -> Union[int, Dict[Any, int]]:
+    """Count the rows of a table across one or more outputs, optionally grouped by fields.
+
+    Rows are found with `iter_rows`, so outputs may be normalized or not, and
+    no intermediate lists of rows are built. For example, the EIGRP neighbors
+    of every switch in a fleet can be counted per VRF and state with:
+
+    >>> outputs = [{"TABLE_asn": {"ROW_asn": {"asn": "1", "TABLE_vrf": {"ROW_vrf": {
+    ...     "vrf": "default", "TABLE_peer": {"ROW_peer": [
+    ...         {"peer_ipaddr": "10.1.0.1", "peer_state": "UP"},
+    ...         {"peer_ipaddr": "10.1.0.2", "peer_state": "UP"}]}}}}}}]
+    >>> path = "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+    >>> count_rows(outputs, path, by=["vrf", "peer_state"])
+    {('default', 'UP'): 2}
+
+    Parameters
+    ----------
+    data : Union[dict, Iterable[dict]]
+        Normalized or unnormalized JSON data structure returned by NX-OS, or
+        several of them, such as outputs of the same command from every
+        switch of a fleet.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    by : Union[None, str, Sequence[str]], optional
+        Field or fields to group rows by. Fields are taken from the row itself
+        if present, and from the rows enclosing it (such as the VRF of an
+        EIGRP neighbor) otherwise, and are None if neither has them. If there
+        are several fields, groups are keyed by tuples of their values.
+        Defaults to None, in which case rows are not grouped.
+
+    Returns
+    -------
+    Union[int, Dict[Any, int]]
+        Number of rows, or number of rows in each group if `by` is given.
+    """
+    if by is None:
+        return sum(1 for output in _iter_outputs(data) for _ in iter_rows(output, path))
+    counts: Dict[Any, int] = Counter(key for key, _ in _iter_group_keys(data, path, by))
+    return dict(counts)
+
+
+def sum_field(
+    data: Union[dict, Iterable[dict]],
+    path: str,
+    field: str,
+    by: Union[None, str, Sequence[str]] = None,
+) -> Union[int, float, Dict[Any, Union[int, float]]]:
+    """Sum a numeric field of the rows of a table across one or more outputs.
+
+    Values are converted into numbers, since NX-OS usually returns them as
+    strings. Rows without the field are skipped. See `count_rows` for details
+    on finding and grouping rows.
+
+    Parameters
+    ----------
+    data : Union[dict, Iterable[dict]]
+        Normalized or unnormalized JSON data structure returned by NX-OS, or
+        several of them.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    field : str
+        Field of each row to sum, such as ``"peer_q_cnt"``.
+    by : Union[None, str, Sequence[str]], optional
+        Field or fields to group rows by. Defaults to None, in which case
+        rows are not grouped.
+
+    Returns
+    -------
+    Union[int, float, Dict[Any, Union[int, float]]]
+        Sum of the field, or sum of the field in each group if `by` is given.
+
+    Raises
+    ------
+    ValueError
+        If a value of the field is not a number.
+    """
+    if by is None:
+        return sum(
+            _number(row[field])
+            for output in _iter_outputs(data)
+            for row in iter_rows(output, path)
+            if field in row
+        )
+    sums: Dict[Any, Union[int, float]] = {}
+    for key, row in _iter_group_keys(data, path, by):
+        if field in row:
+            sums[key] = sums.get(key, 0) + _number(row[field])
+    return sums
+
+
+def group_rows(
+    data: Union[dict, Iterable[dict]], path: str, by: Union[str, Sequence[str]]
+) -> Dict[Any, List[Any]]:
+    """Group the rows of a table across one or more outputs by the values of fields.
+
+    Unlike `count_rows` and `sum_field`, this builds a list of the rows in
+    each group. See `count_rows` for details on finding and grouping rows.
+
+    Parameters
+    ----------
+    data : Union[dict, Iterable[dict]]
+        Normalized or unnormalized JSON data structure returned by NX-OS, or
+        several of them.
+    path : str
+        Keys leading to the ROW_ key of the table, joined by periods.
+    by : Union[str, Sequence[str]]
+        Field or fields to group rows by.
+
+    Returns
+    -------
+    Dict[Any, List[Any]]
+        Rows of each group, in the order they were found.
+    """
+    groups: Dict[Any, List[Any]] = {}
+    for key, row in _iter_group_keys(data, path, by):
+        rows = groups.get(key)
+        if rows is None:
+            groups[key] = [row]
+        else:
+            rows.append(row)
+    return groups
+
+
+class BatchReport(NamedTuple):
+    """Describes the outcome of normalizing a batch of files with `normalize_files`.
+
+    Attributes
+    ----------
+    files : int
+        Number of files normalized.
+    bytes : int
+        Combined size of the files normalized.
+    failures : List[Tuple[str, str]]
+        Path and error message of each file that could not be normalized.
+    elapsed : float
+        Seconds taken to normalize every file.
+    """
+
+    files: int
+    bytes: int
+    failures: List[Tuple[str, str]]
+    elapsed: float
+
+    def __str__(self) -> str:
+        """Return a summary of the throughput of the batch."""
+        elapsed = self.elapsed or 1e-9
+        return (
+            f"Normalized {self.files} files ({self.bytes / 1_000_000:.1f} MB) in "
+            f"{self.elapsed:.2f} s: {self.files / elapsed:.1f} files/s, "
+            f"{self.bytes / 1_000_000 / elapsed:.1f} MB/s, {len(self.failures)} failed"
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _default_file_mode() -> int:
+    """Return the permissions `open` gives new files under the umask of the process."""
+    # The umask can only be read by setting it, so it is read once rather than on every write.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Write a file by renaming a temporary file over it, so readers never see partial output.
+
+    The temporary file is created readable by its owner only, so it is given the permissions of
+    the file it replaces, or those of a new file under the umask, before being renamed.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as output_file:
+            output_file.write(data)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _default_file_mode()
+        os.chmod(temporary, mode)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def normalize_file(
+    source: str, destination: str, indent: Optional[int] = None
+) -> Tuple[str, int, Optional[str]]:
+    """Normalize a file containing a JSON document returned by NX-OS.
+
+    The file is deserialized and normalized with `loads_normalized`. If the
+    JSON backend in use accepts buffers (see `JsonBackend`), the file is
+    memory-mapped and deserialized straight from the mapping, without being
+    copied into memory first. Otherwise it is read into memory once. The
+    result is written to `destination` atomically, so `destination` may be
+    the same file.
+
+    Parameters
+    ----------
+    source : str
+        Path to the file to normalize.
+    destination : str
+        Path to write the normalized JSON document to.
+    indent : Optional[int], optional
+        Indentation of the normalized JSON document. Defaults to None, in
+        which case it is written compactly on a single line.
+
+    Returns
+    -------
+    Tuple[str, int, Optional[str]]
+        Path to the source file, its size, and an error message if it could
+        not be normalized, or None if it was.
+    """
+    try:
+        with open(source, "rb") as source_file:
+            size = os.fstat(source_file.fileno()).st_size
+            if size == 0:
+                raise ValueError("File is empty")
+            if get_json_backend().buffers:
+                with mmap.mmap(
+                    source_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as mapped:
+                    # The view must be released before the mapping can be closed.
+                    with memoryview(mapped) as view:
+                        data = loads_normalized(view)
+            else:
+                data = loads_normalized(source_file.read())
+        _write_atomically(destination, dumps(data, indent))
+    except (OSError, ValueError, TypeError) as exc:
+        return source, 0, f"{type(exc).__name__}: {exc}"
+    return source, size, None
+
+
+def _normalize_file_task(
+    task: Tuple[str, str, Optional[int], str],
+) -> Tuple[str, int, Optional[str]]:
+    """Normalize a file described by a tuple of `normalize_file` arguments, for `Executor.map`.
+
+    The last item is the name of the JSON backend in use by the process that
+    submitted the task, which worker processes do not necessarily inherit.
+    """
+    source, destination, indent, backend = task
+    if get_json_backend().name != backend:
+        set_json_backend(backend)
+    return normalize_file(source, destination, indent)
+
+
+def find_input_files(
+    inputs: Iterable[str], pattern: str = "*.json"
+) -> List[Tuple[str, str]]:
+    """Find files to normalize from paths to files, paths to directories, and glob patterns.
+
+    Directories are searched recursively for files whose names match
+    `pattern`.
+
+    Parameters
+    ----------
+    inputs : Iterable[str]
+        Paths to files or directories, or glob patterns such as
+        ``"captures/**/*.json"``.
+    pattern : str, optional
+        Pattern names of files in directories must match. Defaults to
+        ``"*.json"``.
+
+    Returns
+    -------
+    List[Tuple[str, str]]
+        Path to each file, and its path relative to the directory it was
+        found in, to the directory a glob pattern starts from (such as
+        ``captures`` for ``"captures/**/*.json"``), or its name, for files.
+    """
+    found: List[Tuple[str, str]] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for directory, _, names in os.walk(item):
+                for name in sorted(fnmatch.filter(names, pattern)):
+                    path = os.path.join(directory, name)
+                    found.append((path, os.path.relpath(path, item)))
+        elif glob.has_magic(item):
+            root = os.path.dirname(item)
+            while glob.has_magic(root):
+                root = os.path.dirname(root)
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    found.append((path, os.path.relpath(path, root or os.curdir)))
+        else:
+            found.append((item, os.path.basename(item)))
+    return found
+
+
+def normalize_files(
+    files: Iterable[Tuple[str, str]],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    indent: Optional[int] = None,
+) -> BatchReport:
+    """Normalize many files containing JSON documents returned by NX-OS across processes.
+
+    Files are distributed to a process pool in chunks, so that each worker
+    receives many small files at a time instead of one per round trip.
+
+    Parameters
+    ----------
+    files : Iterable[Tuple[str, str]]
+        Path to each file to normalize, and the path to write its normalized
+        JSON document to.
+    workers : Optional[int], optional
+        Number of worker processes. If 1, files are normalized in the calling
+        process. Defaults to None, in which case one worker per CPU is used.
+    chunksize : Optional[int], optional
+        Number of files handed to a worker at a time. Defaults to None, in
+        which case files are split into about four chunks per worker.
+    indent : Optional[int], optional
+        Indentation of the normalized JSON documents. Defaults to None, in
+        which case they are written compactly on a single line.
+
+    Returns
+    -------
+    BatchReport
+        Number and size of files normalized, files that failed, and the time
+        taken.
+
+    Raises
+    ------
+    ValueError
+        If more than one file would be written to the same destination, in
+        which case nothing is written.
+    """
+    backend = get_json_backend().name
+    tasks = [(source, destination, indent, backend) for source, destination in files]
+    sources: Dict[str, str] = {}
+    for source, destination, _, _ in tasks:
+        other = sources.setdefault(os.path.abspath(destination), source)
+        if other != source:
+            raise ValueError(
+                f"{other} and {source} would both be written to {destination}"
+            )
+    start = time.perf_counter()
+    if workers == 1:
+        results: Iterable[Tuple[str, int, Optional[str]]] = map(
+            _normalize_file_task, tasks
+        )
+        report = _summarize(results)
+    else:
+        workers = workers or os.cpu_count() or 1
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            report = _summarize(
+                executor.map(_normalize_file_task, tasks, chunksize=chunksize)
+            )
+    return report._replace(elapsed=time.perf_counter() - start)
+
+
+def _summarize(results: Iterable[Tuple[str, int, Optional[str]]]) -> BatchReport:
+    """Combine the results of `normalize_file` into a `BatchReport`, without timing."""
+    files = 0
+    size = 0
+    failures: List[Tuple[str, str]] = []
+    for source, source_size, error in results:
+        if error is not None:
+            failures.append((source, error))
+        else:
+            files += 1
+            size += source_size
+    return BatchReport(files, size, failures, 0.0)
+
+
+def normalize_ndjson(
+    source: Any,
+    destination: Any,
+    envelope: Optional[str] = None,
+    chunk_size: int = 65536,
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """Normalize a stream of newline-delimited JSON documents returned by NX-OS.
+
+    Each line of `source` is deserialized and normalized with
+    `loads_normalized`, then written to `destination` as a single compact
+    line. Input is read in chunks of whatever is available, and the output of
+    every complete line in a chunk is written and flushed at once. Under load,
+    many records are written per system call, while a record arriving on an
+    idle stream is written as soon as it is read.
+
+    Lines that cannot be deserialized are skipped and reported. Blank lines
+    are skipped.
+
+    Parameters
+    ----------
+    source : Any
+        Binary file-like object to read from, such as ``sys.stdin.buffer``.
+    destination : Any
+        Binary file-like object to write to, such as ``sys.stdout.buffer``.
+    envelope : Optional[str], optional
+        Field of each record that contains the output, for records that wrap
+        output with metadata such as
+        ``{"host": "leaf1", "command": "show ip route", "output": {...}}``.
+        The output may be a JSON object or a string containing one. Other
+        fields are written unchanged. Defaults to None, in which case each
+        record is the output itself.
+    chunk_size : int, optional
+        Maximum number of bytes to read at a time. Defaults to 64 KiB.
+
+    Returns
+    -------
+    Tuple[int, List[Tuple[int, str]]]
+        Number of records written, and the line number and error message of
+        each line that was skipped.
+    """
+    read = getattr(source, "read1", source.read)
+    write = destination.write
+    flush = destination.flush
+    encode = (_JSON_BACKEND or set_json_backend()).dumps
+    failures: List[Tuple[int, str]] = []
+    records = 0
+    line_number = 0
+    pending = b""
+    while True:
+        chunk = read(chunk_size)
+        if chunk:
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+        else:
+            lines = [pending]
+        output = []
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = loads_normalized(line)
+                if envelope is not None and isinstance(record.get(envelope), str):
+                    record[envelope] = loads_normalized(record[envelope])
+                output.append(encode(record))
+            except (ValueError, TypeError, AttributeError) as exc:
+                failures.append((line_number, f"{type(exc).__name__}: {exc}"))
+        if output:
+            output.append(b"")
+            write(b"\n".join(output))
+            flush()
+            records += len(output) - 1
+        if not chunk:
+            return records, failures
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Normalize files, or a stream of newline-delimited JSON documents, returned by NX-OS.
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]], optional
+        Command line arguments. Defaults to None, in which case `sys.argv` is
+        used.
+
+    Returns
+    -------
+    int
+        Exit status, which is 1 if any file or record could not be normalized.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m normalize_nxos_json",
+        description="Normalize files containing JSON documents returned by NX-OS.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Files, directories (searched recursively), or glob patterns to normalize.",
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Normalize newline-delimited JSON documents from standard input to standard "
+        "output instead of files.",
+    )
+    parser.add_argument(
+        "--envelope",
+        metavar="FIELD",
+        help="With --ndjson, field of each record that contains the output, for records "
+        "that wrap output with metadata such as host and command.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        help="Directory to write normalized files to, preserving their paths relative to "
+        "input directories. Defaults to overwriting input files in place.",
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.json",
+        help="Pattern names of files in input directories must match. Defaults to *.json.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Number of worker processes. Defaults to one per CPU.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Number of files handed to a worker at a time. Defaults to about four "
+        "chunks per worker.",
+    )
+    parser.add_argument(
+        "--indent", type=int, help="Indentation of normalized files. Defaults to none."
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=list(_JSON_BACKENDS),
+        help="Library used to deserialize and serialize JSON documents. Defaults to the "
+        "first of orjson, ujson, simdjson, and json that is installed.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        set_json_backend(args.json_backend)
+    except ImportError as exc:
+        parser.error(f"JSON backend {args.json_backend} is not installed: {exc}")
+
+    if args.ndjson:
+        if args.inputs:
+            parser.error("--ndjson reads from standard input and accepts no inputs")
+        _, failures = normalize_ndjson(
+            sys.stdin.buffer, sys.stdout.buffer, args.envelope
+        )
+        for line_number, error in failures:
+            print(f"Line {line_number}: {error}", file=sys.stderr)
+        return 1 if failures else 0
+    if not args.inputs:
+        parser.error("at least one input is required")
+    files = [
+        (path, os.path.join(args.output_dir, relative) if args.output_dir else path)
+        for path, relative in find_input_files(args.inputs, args.pattern)
+    ]
+    try:
+        report = normalize_files(files, args.workers, args.chunksize, args.indent)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for source, error in report.failures:
+        print(f"{source}: {error}", file=sys.stderr)
+    print(report, file=sys.stderr)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit()
@@ -0,0 +1,112 @@
+"""Contains unit tests for functions in the benchmarks.payloads module."""
+
+import pytest
+from normalize_nxos_json import normalize_output, normalize_xml, learn_row_paths
+from benchmarks.payloads import (
+    PRESETS,
+    Level,
+    count_nodes,
+    generate_payload,
+    generate_xml_output,
+    scale_levels,
+    uniform_levels,
+)
+
+
+@pytest.mark.parametrize(
+    "levels, paths",
+    [
+        pytest.param(
+            uniform_levels(2, 3),
+            [
+                "TABLE_level0.ROW_level0",
+                "TABLE_level0.ROW_level0.TABLE_level1.ROW_level1",
+            ],
+            id="Test uniform levels",
+        ),
+        pytest.param(
+            PRESETS["eigrp-500"],
+            [
+                "TABLE_asn.ROW_asn",
+                "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf",
+                "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer",
+            ],
+            id="Test EIGRP neighbors preset",
+        ),
+    ],
+)
+def test_generate_payload_paths(levels, paths):
+    """Tests whether `generate_payload` nests tables as described by its levels."""
+    assert learn_row_paths([generate_payload(levels)]) == paths
+
+
+@pytest.mark.parametrize(
+    "single_row_ratio, row_type",
+    [
+        pytest.param(0.0, list, id="Test multi-row tables are lists"),
+        pytest.param(1.0, dict, id="Test single-row tables are dictionaries"),
+    ],
+)
+def test_generate_payload_single_row_ratio(single_row_ratio, row_type):
+    """Tests whether `generate_payload` honors the single-row ratio of each level."""
+    payload = generate_payload([Level("peer", 5, single_row_ratio, 3)])
+    assert isinstance(payload["TABLE_peer"]["ROW_peer"], row_type)
+
+
+def test_generate_payload_row_width():
+    """Tests whether `generate_payload` generates named and generic fields up to the row width."""
+    payload = generate_payload(
+        [Level("peer", 2, 0.0, 3, ("peer_ipaddr", "peer_state"))]
+    )
+    row = payload["TABLE_peer"]["ROW_peer"][0]
+    assert list(row) == ["peer_ipaddr", "peer_state", "peer_field2"]
+    assert row["peer_ipaddr"] == "10.0.0.0"
+
+
+def test_generate_payload_is_reproducible():
+    """Tests whether `generate_payload` generates the same payload for the same seed."""
+    levels = scale_levels(PRESETS["routes-1m"], 0.0001)
+    assert generate_payload(levels, seed=1) == generate_payload(levels, seed=1)
+
+
+def test_eigrp_preset_neighbor_count():
+    """Tests whether the EIGRP neighbors preset has 500 neighbors."""
+    payload = normalize_output(generate_payload(PRESETS["eigrp-500"]))
+    assert (
+        sum(
+            len(vrf["TABLE_peer"]["ROW_peer"])
+            for asn in payload["TABLE_asn"]["ROW_asn"]
+            for vrf in asn["TABLE_vrf"]["ROW_vrf"]
+        )
+        == 500
+    )
+
+
+def test_scale_levels():
+    """Tests whether `scale_levels` only scales the widest level."""
+    assert [level.fanout for level in scale_levels(PRESETS["routes-1m"], 0.01)] == [
+        10,
+        1,
+        1000,
+        2,
+    ]
+
+
+def test_count_nodes():
+    """Tests whether `count_nodes` counts dictionaries, lists, and scalar values."""
+    assert count_nodes({"a": ["b", {"c": "d"}]}) == 5
+
+
+@pytest.mark.parametrize(
+    "levels",
+    [
+        pytest.param(PRESETS["eigrp-500"], id="Test multi-row tables"),
+        pytest.param(uniform_levels(3, 3, 0.5), id="Test mix of single-row tables"),
+    ],
+)
+def test_generate_xml_output(levels):
+    """Tests whether generated XML output converts into the normalized payload."""
+    payload = generate_payload(levels)
+    xml = generate_xml_output(payload)
+    assert xml.endswith("</nf:rpc-reply>\n]]>]]>\n")
+    assert normalize_xml(xml) == normalize_output(payload)
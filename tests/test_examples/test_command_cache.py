@@ -0,0 +1,172 @@
+"""Contains unit tests for functions in the command_cache module."""
+
+import time
+import asyncio
+import threading
+import pytest
+from examples.command_cache import CommandCache, estimate_size
+
+
+class FakeClock:
+    """Stands in for `time.monotonic`, advancing only when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current fake time."""
+        return self.now
+
+
+def test_command_cache_ttl():
+    """Tests whether `CommandCache` serves outputs until their command's time to live expires."""
+    clock = FakeClock()
+    cache = CommandCache(default_ttl=10, ttls={"show version": 100}, clock=clock)
+    fetches = []
+
+    def fetch(host, cmd):
+        fetches.append((host, cmd))
+        return {"host": host, "cmd": cmd, "poll": len(fetches)}
+
+    for now in (0, 5, 15):
+        clock.now = now
+        for host in ("switch1", "switch2"):
+            for cmd in ("show version", "show ip eigrp neighbors"):
+                cache.get(host, cmd, lambda: fetch(host, cmd))
+    assert fetches == [
+        ("switch1", "show version"),
+        ("switch1", "show ip eigrp neighbors"),
+        ("switch2", "show version"),
+        ("switch2", "show ip eigrp neighbors"),
+        ("switch1", "show ip eigrp neighbors"),
+        ("switch2", "show ip eigrp neighbors"),
+    ]
+    assert (cache.hits, cache.misses) == (6, 6)
+    assert cache.get("switch1", "show version", lambda: None)["poll"] == 1
+
+
+def test_command_cache_eviction():
+    """Tests whether `CommandCache` evicts least recently used outputs to stay within its size."""
+    cache = CommandCache(max_bytes=30, sizeof=len)
+    cache.get("switch1", "a", lambda: "x" * 10)
+    cache.get("switch1", "b", lambda: "x" * 10)
+    cache.get("switch1", "a", lambda: "unused")
+    cache.get("switch1", "c", lambda: "x" * 15)
+    assert len(cache) == 2
+    assert cache.size == 25
+    assert cache.evictions == 1
+    assert cache.get("switch1", "b", lambda: "refetched") == "refetched"
+    # Outputs larger than the cache are returned but never cached.
+    assert cache.get("switch1", "d", lambda: "x" * 40) == "x" * 40
+    assert cache.get("switch1", "d", lambda: "refetched") == "refetched"
+
+
+def test_command_cache_coalescing():
+    """Tests whether concurrent identical requests in threads share a single fetch."""
+    cache = CommandCache()
+    fetches = []
+    release = threading.Event()
+
+    def fetch():
+        fetches.append(None)
+        release.wait()
+        return {"TABLE_peer": {"ROW_peer": []}}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                cache.get("switch1", "show ip eigrp neighbors", fetch)
+            )
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.misses + cache.coalesced < 8:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(fetches) == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+    assert (cache.misses, cache.coalesced) == (1, 7)
+
+
+def test_command_cache_fetch_failure():
+    """Tests whether failed fetches raise to the caller and are not cached."""
+    cache = CommandCache()
+
+    def fail():
+        raise ConnectionRefusedError("switch1")
+
+    with pytest.raises(ConnectionRefusedError):
+        cache.get("switch1", "show version", fail)
+    assert cache.get("switch1", "show version", lambda: "output") == "output"
+
+
+def test_command_cache_async_coalescing():
+    """Tests whether concurrent identical requests on an event loop share a single fetch."""
+    cache = CommandCache()
+    fetches = []
+
+    async def fetch():
+        fetches.append(None)
+        await asyncio.sleep(0.01)
+        return {"TABLE_peer": {"ROW_peer": []}}
+
+    async def poll():
+        first = await asyncio.gather(
+            *[cache.aget("switch1", "show ip eigrp neighbors", fetch) for _ in range(8)]
+        )
+        second = await cache.aget("switch1", "show ip eigrp neighbors", fetch)
+        return first, second
+
+    first, second = asyncio.run(poll())
+    assert len(fetches) == 1
+    assert all(result is second for result in first)
+    assert (cache.misses, cache.coalesced, cache.hits) == (1, 7, 1)
+
+
+def test_command_cache_async_cancelled_owner():
+    """Tests whether a fetch is cached when the request that started it is cancelled."""
+    cache = CommandCache()
+    fetches = []
+
+    async def fetch():
+        fetches.append(None)
+        await asyncio.sleep(0.01)
+        if len(fetches) > 1:
+            raise ConnectionRefusedError("switch1")
+        return "output"
+
+    async def poll():
+        owner = asyncio.ensure_future(cache.aget("switch1", "show version", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.aget("switch1", "show version", fetch))
+        await asyncio.sleep(0)
+        owner.cancel()
+        assert await waiter == "output"
+        assert await cache.aget("switch1", "show version", fetch) == "output"
+        # Failed fetches are not cached, whoever awaits them.
+        cache.invalidate()
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError):
+                await cache.aget("switch1", "show version", fetch)
+        return owner
+
+    owner = asyncio.run(poll())
+    assert owner.cancelled()
+    assert len(fetches) == 3
+    assert (cache.misses, cache.coalesced, cache.hits) == (3, 1, 1)
+
+
+def test_command_cache_invalidate():
+    """Tests whether `CommandCache.invalidate` evicts outputs of a switch."""
+    cache = CommandCache()
+    for host in ("switch1", "switch2"):
+        cache.get(host, "show version", lambda: {"host": host})
+    cache.invalidate(host="switch1")
+    assert len(cache) == 1
+    assert cache.size == estimate_size({"host": "switch2"})
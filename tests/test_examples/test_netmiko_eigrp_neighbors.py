@@ -1,7 +1,16 @@
 """Contains unit tests for functions in the netmiko_eigrp_neighbors module."""
 
+import json
+import time
 import pytest
-from examples.netmiko_eigrp_neighbors import get_number_of_eigrp_neighbors
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from examples.netmiko_eigrp_neighbors import (
+    get_number_of_eigrp_neighbors,
+    NetmikoSession,
+    SessionPool,
+    collect_fleet,
+)
 
 
 @pytest.mark.parametrize(
@@ -242,3 +251,169 @@ from examples.netmiko_eigrp_neighbors import get_number_of_eigrp_neighbors
 def test_get_number_of_eigrp_neighbors(input: dict, neighbor_count: int) -> None:
     """Ensure the `get_number_of_eigrp_neighbors` function returns correct quantity of neighbors."""
     assert get_number_of_eigrp_neighbors(input) == neighbor_count
+
+
+class FakeConnection:
+    """Stands in for a Netmiko connection to an NX-OS switch."""
+
+    def __init__(self, **kwargs):
+        self.host = kwargs["host"]
+        if self.host.startswith("down"):
+            raise ConnectionRefusedError(self.host)
+        self.timeouts = {k: v for k, v in kwargs.items() if k.endswith("_timeout")}
+        self.commands = []
+        self.alive = True
+        self.disconnected = False
+        self.busy = False
+
+    def send_command(self, cmd: str, read_timeout: Optional[float] = None) -> str:
+        """Return fake structured output of a command.
+
+        Commands on hosts starting with "slow" take 0.1 seconds. Like a real
+        SSH channel, the connection cannot execute two commands at once.
+        """
+        if self.busy:
+            raise RuntimeError("Output of concurrent commands was interleaved")
+        self.busy = True
+        try:
+            if self.host.startswith("slow"):
+                if read_timeout is not None and read_timeout < 0.1:
+                    time.sleep(read_timeout)
+                    raise TimeoutError(cmd)
+                time.sleep(0.1)
+        finally:
+            self.busy = False
+        self.commands.append(cmd)
+        return json.dumps({"TABLE_cmd": {"ROW_cmd": {"host": self.host, "cmd": cmd}}})
+
+    def is_alive(self) -> bool:
+        """Report whether the connection is still open."""
+        return self.alive
+
+    def disconnect(self) -> None:
+        """Close the fake connection."""
+        self.disconnected = True
+
+
+def test_netmiko_session():
+    """Tests whether `NetmikoSession` executes many commands through one connection."""
+    with NetmikoSession("switch1", "admin", "password", FakeConnection) as session:
+        assert session.command("show version", structured=True) == {
+            "TABLE_cmd": {
+                "ROW_cmd": [{"host": "switch1", "cmd": "show version | json"}]
+            }
+        }
+        connection = session.connection
+        session.command("show ip eigrp neighbors")
+        assert session.connection is connection
+        assert connection.commands == ["show version | json", "show ip eigrp neighbors"]
+    assert connection.disconnected
+    assert session.connection is None
+
+
+def test_session_pool():
+    """Tests whether `SessionPool` reuses one connection per switch and replaces dead ones."""
+    with SessionPool("admin", "password", FakeConnection) as pool:
+        for _ in range(3):
+            for host in ("switch1", "switch2"):
+                pool.command(host, "show version", structured=True)
+        first = pool.session("switch1").connection
+        second = pool.session("switch2").connection
+        assert first.commands == ["show version | json"] * 3
+        assert second.commands == ["show version | json"] * 3
+        first.alive = False
+        pool.command("switch1", "show version")
+        assert first.disconnected
+        assert pool.session("switch1").connection is not first
+    assert second.disconnected
+    assert pool.sessions == {}
+
+
+@pytest.mark.parametrize(
+    "parse_pool",
+    [
+        pytest.param(None, id="Test parsing in collecting threads"),
+        pytest.param(ThreadPoolExecutor, id="Test parsing in a thread pool"),
+        pytest.param(ProcessPoolExecutor, id="Test parsing in a process pool"),
+    ],
+)
+def test_collect_fleet(parse_pool):
+    """Tests whether `collect_fleet` yields results of every command on every switch in order."""
+    hosts = [f"switch{index}" for index in range(6)]
+    commands = ["show version", "show ip eigrp neighbors"]
+    with SessionPool("admin", "password", FakeConnection) as pool:
+        if parse_pool is None:
+            results = list(
+                collect_fleet(hosts, commands, pool, workers=3, ordered=True)
+            )
+        else:
+            with parse_pool(max_workers=2) as executor:
+                results = list(
+                    collect_fleet(
+                        hosts,
+                        commands,
+                        pool,
+                        workers=3,
+                        ordered=True,
+                        parse_pool=executor,
+                    )
+                )
+    assert [(result.host, result.command) for result in results] == [
+        (host, cmd) for host in hosts for cmd in commands
+    ]
+    assert [result.output for result in results] == [
+        {"TABLE_cmd": {"ROW_cmd": [{"host": host, "cmd": f"{cmd} | json"}]}}
+        for host in hosts
+        for cmd in commands
+    ]
+
+
+def test_collect_fleet_failures():
+    """Tests whether unreachable and slow switches fail without failing other switches."""
+    commands = ["show version", "show interface", "show ip eigrp neighbors"]
+    with SessionPool("admin", "password", FakeConnection) as pool:
+        results = list(
+            collect_fleet(["down1", "slow1", "switch1"], commands, pool, deadline=0.15)
+        )
+    errors = {
+        (result.host, result.command): type(result.error).__name__ for result in results
+    }
+    assert errors == {
+        ("down1", "show version"): "ConnectionRefusedError",
+        ("down1", "show interface"): "ConnectionRefusedError",
+        ("down1", "show ip eigrp neighbors"): "ConnectionRefusedError",
+        ("slow1", "show version"): "NoneType",
+        ("slow1", "show interface"): "TimeoutError",
+        ("slow1", "show ip eigrp neighbors"): "TimeoutError",
+        ("switch1", "show version"): "NoneType",
+        ("switch1", "show interface"): "NoneType",
+        ("switch1", "show ip eigrp neighbors"): "NoneType",
+    }
+    # Results are yielded as each switch completes, so the slow switch is last.
+    assert results[-1].host == "slow1"
+
+
+def test_collect_fleet_connect_timeouts():
+    """Tests whether connecting to a switch times out no later than the switch's deadline."""
+    with SessionPool("admin", "password", FakeConnection) as pool:
+        list(collect_fleet(["switch1"], ["show version"], pool, deadline=5))
+        assert pool.session("switch1").connection.timeouts == {
+            "conn_timeout": 5,
+            "banner_timeout": 5,
+            "auth_timeout": 5,
+        }
+        list(collect_fleet(["switch2"], ["show version"], pool))
+        assert pool.session("switch2").connection.timeouts == {
+            "conn_timeout": 10,
+            "banner_timeout": 15,
+            "auth_timeout": 30,
+        }
+
+
+def test_collect_fleet_duplicate_hosts():
+    """Tests whether duplicate switches never execute commands on one connection at once."""
+    commands = ["show version", "show interface"]
+    with SessionPool("admin", "password", FakeConnection) as pool:
+        results = list(collect_fleet(["slow1", "slow1"], commands, pool, workers=2))
+        assert [result.error for result in results] == [None] * 4
+        assert len(pool.session("slow1").connection.commands) == 4
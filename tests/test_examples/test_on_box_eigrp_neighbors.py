@@ -1,7 +1,14 @@
 """Contains unit tests for functions in the on_box_eigrp_neighbors module."""
 
+import sys
+import json
+import types
 import pytest
-from examples.on_box_eigrp_neighbors import get_number_of_eigrp_neighbors
+from examples.on_box_eigrp_neighbors import (
+    get_number_of_eigrp_neighbors,
+    OnBoxExecutor,
+    split_json_documents,
+)
 
 
 @pytest.mark.parametrize(
@@ -242,3 +249,96 @@ from examples.on_box_eigrp_neighbors import get_number_of_eigrp_neighbors
 def test_get_number_of_eigrp_neighbors(input: dict, neighbor_count: int) -> None:
     """Ensure the `get_number_of_eigrp_neighbors` function returns correct quantity of neighbors."""
     assert get_number_of_eigrp_neighbors(input) == neighbor_count
+
+
+@pytest.fixture
+def stub_cli(monkeypatch):
+    """Install a stub of the NX-OS `cli` module, returning the commands it executes."""
+    executed = []
+
+    def show(cmd: str) -> str:
+        name = cmd.replace(" | json", "")
+        if name == "show nothing":
+            return ""
+        if name == "show bogus":
+            return "% Invalid command at '^' marker.\n"
+        return json.dumps({"TABLE_cmd": {"ROW_cmd": {"cmd": name}}})
+
+    def cli(cmd: str) -> str:
+        executed.append(cmd)
+        if cmd.endswith(" | json"):
+            return "\n".join(show(part) for part in cmd.split(" ; "))
+        return f"{cmd} output"
+
+    def clid(cmd: str) -> str:
+        executed.append(f"{cmd} | json")
+        return show(cmd)
+
+    module = types.ModuleType("cli")
+    module.cli = cli
+    module.clid = clid
+    monkeypatch.setitem(sys.modules, "cli", module)
+    return executed
+
+
+def test_on_box_executor_command(stub_cli):
+    """Tests whether `OnBoxExecutor` binds NX-OS CLI libraries once for every command."""
+    executor = OnBoxExecutor()
+    assert executor.command("show version", structured=True) == {
+        "TABLE_cmd": {"ROW_cmd": [{"cmd": "show version"}]}
+    }
+    sys.modules.pop("cli")
+    assert executor.command("show clock") == "show clock output"
+    assert stub_cli == ["show version | json", "show clock"]
+
+
+@pytest.mark.parametrize(
+    "commands, executed",
+    [
+        pytest.param(
+            ["show version", "show interface"],
+            ["show version | json ; show interface | json"],
+            id="Test single round trip",
+        ),
+        pytest.param(
+            ["show version", "show nothing"],
+            [
+                "show version | json ; show nothing | json",
+                "show version | json",
+                "show nothing | json",
+            ],
+            id="Test command without output",
+        ),
+        pytest.param(
+            ["show version", "show bogus", "show interface"],
+            [
+                "show version | json ; show bogus | json ; show interface | json",
+                "show version | json",
+                "show bogus | json",
+                "show interface | json",
+            ],
+            id="Test command with plaintext error",
+        ),
+    ],
+)
+def test_on_box_executor_batch(stub_cli, commands, executed):
+    """Tests whether `OnBoxExecutor.batch` splits batched output into one result per command."""
+    outputs = OnBoxExecutor().batch(commands)
+    expected = {
+        "show nothing": {},
+        "show bogus": "% Invalid command at '^' marker.\n",
+    }
+    assert outputs == [
+        expected.get(cmd, {"TABLE_cmd": {"ROW_cmd": [{"cmd": cmd}]}})
+        for cmd in commands
+    ]
+    assert stub_cli == executed
+
+
+def test_split_json_documents():
+    """Tests whether `split_json_documents` splits concatenated JSON documents."""
+    assert split_json_documents('{"a": "1"}{"b": ["2"]}\n {"c": {}}\n') == [
+        {"a": "1"},
+        {"b": ["2"]},
+        {"c": {}},
+    ]
@@ -0,0 +1,140 @@
+"""Contains unit tests for functions in the scrapli_collector module."""
+
+import json
+import asyncio
+import pytest
+from examples.scrapli_collector import Device, collect
+
+
+class FakeResponse:
+    """Stands in for a Scrapli response."""
+
+    def __init__(self, result: str, failed: bool = False):
+        self.result = result
+        self.failed = failed
+
+    def raise_for_status(self):
+        """Raise an exception if the command failed, like Scrapli does."""
+        if self.failed:
+            raise RuntimeError(f"Command failed: {self.result}")
+
+
+class FakeSwitch:
+    """Stands in for an asynchronous Scrapli driver connected to an NX-OS switch.
+
+    Hosts starting with "down" refuse connections, hosts starting with "slow"
+    never respond, and hosts starting with "bad" reject every command.
+    """
+
+    active = 0
+    peak = 0
+    connections = 0
+
+    def __init__(self, device: Device):
+        self.host = device.host
+
+    async def __aenter__(self):
+        """Open the fake connection."""
+        await asyncio.sleep(0.01)
+        if self.host.startswith("down"):
+            raise ConnectionRefusedError(self.host)
+        FakeSwitch.connections += 1
+        FakeSwitch.active += 1
+        FakeSwitch.peak = max(FakeSwitch.peak, FakeSwitch.active)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Close the fake connection."""
+        FakeSwitch.active -= 1
+
+    async def send_command(self, command: str) -> FakeResponse:
+        """Return fake structured output of a command."""
+        if self.host.startswith("slow"):
+            await asyncio.sleep(10)
+        await asyncio.sleep(0.01)
+        if self.host.startswith("bad"):
+            return FakeResponse("% Invalid command", failed=True)
+        row = {"host": self.host, "command": command}
+        return FakeResponse(json.dumps({"TABLE_test": {"ROW_test": row}}))
+
+
+async def gather_results(inventory, commands, **kwargs):
+    """Collect every result from `collect` into a list."""
+    return [result async for result in collect(inventory, commands, **kwargs)]
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_switch():
+    """Reset connection counters of `FakeSwitch` between tests."""
+    FakeSwitch.active = FakeSwitch.peak = FakeSwitch.connections = 0
+
+
+def test_collect():
+    """Tests whether `collect` executes every command on every switch through one connection."""
+    inventory = [Device(f"switch{index}", "admin", "password") for index in range(20)]
+    commands = ["show version", "show ip eigrp neighbors"]
+    results = asyncio.run(
+        gather_results(inventory, commands, concurrency=5, driver_factory=FakeSwitch)
+    )
+    assert len(results) == 40
+    assert all(result.error is None for result in results)
+    assert {(result.host, result.command) for result in results} == {
+        (device.host, command) for device in inventory for command in commands
+    }
+    assert results[0].output == {
+        "TABLE_test": {
+            "ROW_test": [
+                {"host": results[0].host, "command": f"{results[0].command} | json"}
+            ]
+        }
+    }
+    assert FakeSwitch.connections == 20
+    assert FakeSwitch.peak == 5
+
+
+@pytest.mark.parametrize(
+    "host, error",
+    [
+        pytest.param("down1", ConnectionRefusedError, id="Test refused connection"),
+        pytest.param("slow1", asyncio.TimeoutError, id="Test timed out switch"),
+        pytest.param("bad1", RuntimeError, id="Test failed command"),
+    ],
+)
+def test_collect_failure(host, error):
+    """Tests whether a failing switch yields failed results without delaying other switches."""
+    inventory = [
+        Device(host, "admin", "password"),
+        Device("switch1", "admin", "password"),
+    ]
+    commands = ["show version", "show ip eigrp neighbors"]
+    results = asyncio.run(
+        gather_results(inventory, commands, timeout=0.2, driver_factory=FakeSwitch)
+    )
+    assert len(results) == 4
+    failed = [result for result in results if result.host == host]
+    assert [result.command for result in failed] == commands
+    assert all(
+        isinstance(result.error, error) and result.output is None for result in failed
+    )
+    succeeded = [result for result in results if result.host == "switch1"]
+    assert all(result.error is None for result in succeeded)
+    if host == "slow1":
+        # Results from the healthy switch are not delayed by the timeout.
+        assert results[:2] == succeeded
+
+
+def test_collect_early_exit():
+    """Tests whether `collect` closes every connection when the caller stops consuming results."""
+
+    async def first_result():
+        results = collect(
+            [Device(f"switch{index}", "admin", "password") for index in range(10)],
+            ["show version"],
+            driver_factory=FakeSwitch,
+        )
+        result = await results.__anext__()
+        await results.aclose()
+        return result
+
+    assert asyncio.run(first_result()).error is None
+    assert FakeSwitch.active == 0
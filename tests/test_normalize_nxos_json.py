@@ -1,7 +1,54 @@
 """Contains unit tests for functions in the normalize_nxos_json module."""
 
+import io
+import os
+import sys
+import stat
+import json
+import socket
+import asyncio
 import pytest
-from normalize_nxos_json import normalize_output
+from xml.etree.ElementTree import ParseError
+from datetime import timedelta
+from array import array
+from normalize_nxos_json import (
+    normalize_output,
+    loads_normalized,
+    normalize_output_iterative,
+    iter_normalized_rows,
+    StreamedRow,
+    learn_row_paths,
+    compile_normalizer,
+    normalize_command_output,
+    NormalizedView,
+    normalized_copy,
+    iter_rows,
+    to_columnar,
+    DictionaryColumn,
+    Record,
+    rows_to_records,
+    InternPool,
+    parse_duration,
+    infer_field_types,
+    normalize_async,
+    diff_rows,
+    RowDiffer,
+    TableIndex,
+    build_index,
+    count_rows,
+    sum_field,
+    group_rows,
+    find_input_files,
+    normalize_files,
+    normalize_ndjson,
+    main,
+    loads,
+    dumps,
+    available_json_backends,
+    get_json_backend,
+    set_json_backend,
+    normalize_xml,
+)
 
 
 @pytest.mark.parametrize(
@@ -87,3 +134,1668 @@ from normalize_nxos_json import normalize_output
 def test_normalize_output(input, output):
     """Tests whether `normalize_output` function works as expected."""
     assert normalize_output(input) == output
+
+
+@pytest.mark.parametrize(
+    "input, output",
+    [
+        pytest.param(
+            {"test": "one"},
+            {"test": "one"},
+            id="Test simple dictionary is not modified",
+        ),
+        pytest.param(
+            {"test": []},
+            {"test": []},
+            id="Test dictionary with empty list as value is not modified",
+        ),
+        pytest.param(
+            {"ROW_example": {"test": "one"}},
+            {"ROW_example": [{"test": "one"}]},
+            id="Test dictionary with ROW_ in key and dictionary as value is modified",
+        ),
+        pytest.param(
+            {"ROW_example": [{"test": "one"}, {"test": "two"}]},
+            {"ROW_example": [{"test": "one"}, {"test": "two"}]},
+            id="Test dictionary with ROW_ in key and list as value is not modified",
+        ),
+        pytest.param(
+            {"nested": {"TABLE_peer": {"ROW_peer": {"test": "one"}}}},
+            {"nested": {"TABLE_peer": {"ROW_peer": [{"test": "one"}]}}},
+            id="Test ROW_ key nested beneath plain dictionaries is modified",
+        ),
+        pytest.param(
+            {
+                "TABLE_asn": {
+                    "ROW_asn": {
+                        "asn": "1",
+                        "TABLE_vrf": {
+                            "ROW_vrf": [
+                                {
+                                    "vrf": "default",
+                                    "TABLE_peer": {
+                                        "ROW_peer": {
+                                            "peer_ipaddr": "10.1.0.1",
+                                            "peer_ifname": "Eth1/1",
+                                        }
+                                    },
+                                },
+                                {
+                                    "vrf": "non-default",
+                                    "TABLE_peer": {
+                                        "ROW_peer": [
+                                            {
+                                                "peer_ipaddr": "10.1.0.2",
+                                                "peer_ifname": "Eth1/2",
+                                            },
+                                            {
+                                                "peer_ipaddr": "10.1.0.3",
+                                                "peer_ifname": "Eth1/3",
+                                            },
+                                        ]
+                                    },
+                                },
+                            ]
+                        },
+                    },
+                }
+            },
+            {
+                "TABLE_asn": {
+                    "ROW_asn": [
+                        {
+                            "asn": "1",
+                            "TABLE_vrf": {
+                                "ROW_vrf": [
+                                    {
+                                        "vrf": "default",
+                                        "TABLE_peer": {
+                                            "ROW_peer": [
+                                                {
+                                                    "peer_ipaddr": "10.1.0.1",
+                                                    "peer_ifname": "Eth1/1",
+                                                }
+                                            ]
+                                        },
+                                    },
+                                    {
+                                        "vrf": "non-default",
+                                        "TABLE_peer": {
+                                            "ROW_peer": [
+                                                {
+                                                    "peer_ipaddr": "10.1.0.2",
+                                                    "peer_ifname": "Eth1/2",
+                                                },
+                                                {
+                                                    "peer_ipaddr": "10.1.0.3",
+                                                    "peer_ifname": "Eth1/3",
+                                                },
+                                            ]
+                                        },
+                                    },
+                                ]
+                            },
+                        }
+                    ],
+                }
+            },
+            id="Test NX-OS routing protocol data with mixed single and multiple rows",
+        ),
+    ],
+)
+def test_loads_normalized(input, output):
+    """Tests whether `loads_normalized` function works as expected."""
+    assert loads_normalized(json.dumps(input)) == output
+
+
+@pytest.mark.parametrize(
+    "input, output",
+    [
+        pytest.param(
+            {"test": "one"},
+            {"test": "one"},
+            id="Test simple dictionary is not modified",
+        ),
+        pytest.param(
+            {"test": []},
+            {"test": []},
+            id="Test dictionary with empty list as value is not modified",
+        ),
+        pytest.param(
+            {"test": ["one", {"ROW_example": {"test": "two"}}]},
+            {"test": ["one", {"ROW_example": [{"test": "two"}]}]},
+            id="Test list mixing dictionaries and other values is normalized",
+        ),
+        pytest.param(
+            {"ROW_example": {"test": "one"}},
+            {"ROW_example": [{"test": "one"}]},
+            id="Test dictionary with ROW_ in key and dictionary as value is modified",
+        ),
+        pytest.param(
+            {"nested": {"TABLE_peer": {"ROW_peer": {"test": "one"}}}},
+            {"nested": {"TABLE_peer": {"ROW_peer": [{"test": "one"}]}}},
+            id="Test ROW_ key nested beneath plain dictionaries is modified",
+        ),
+        pytest.param(
+            {
+                "TABLE_asn": {
+                    "ROW_asn": {
+                        "asn": "1",
+                        "TABLE_vrf": {
+                            "ROW_vrf": {
+                                "vrf": "default",
+                                "TABLE_peer": {
+                                    "ROW_peer": {
+                                        "peer_ipaddr": "10.1.0.1",
+                                        "peer_ifname": "Eth1/1",
+                                    }
+                                },
+                            }
+                        },
+                    },
+                }
+            },
+            {
+                "TABLE_asn": {
+                    "ROW_asn": [
+                        {
+                            "asn": "1",
+                            "TABLE_vrf": {
+                                "ROW_vrf": [
+                                    {
+                                        "vrf": "default",
+                                        "TABLE_peer": {
+                                            "ROW_peer": [
+                                                {
+                                                    "peer_ipaddr": "10.1.0.1",
+                                                    "peer_ifname": "Eth1/1",
+                                                }
+                                            ]
+                                        },
+                                    }
+                                ]
+                            },
+                        }
+                    ],
+                }
+            },
+            id="Test complex NX-OS routing protocol data with multiple processes/VRFs",
+        ),
+    ],
+)
+def test_normalize_output_iterative(input, output):
+    """Tests whether `normalize_output_iterative` function works as expected."""
+    assert normalize_output_iterative(input) == output
+
+
+def test_normalize_output_iterative_beyond_recursion_limit():
+    """Tests whether `normalize_output_iterative` handles nesting beyond the recursion limit."""
+    depth = sys.getrecursionlimit() + 100
+    data = {"leaf": "value"}
+    for _ in range(depth):
+        data = {"TABLE_level": {"ROW_level": data}}
+    node = normalize_output_iterative(data)
+    for _ in range(depth):
+        rows = node["TABLE_level"]["ROW_level"]
+        assert isinstance(rows, list) and len(rows) == 1
+        node = rows[0]
+    assert node == {"leaf": "value"}
+
+
+EIGRP_STREAM_INPUT = {
+    "TABLE_asn": {
+        "ROW_asn": {
+            "asn": "1",
+            "TABLE_vrf": {
+                "ROW_vrf": [
+                    {
+                        "vrf": "default",
+                        "TABLE_peer": {
+                            "ROW_peer": {
+                                "peer_ipaddr": "10.1.0.1",
+                                "peer_ifname": "Eth1/1",
+                                "peer_srtt": 12,
+                                "peer_rto": 1.5e2,
+                                "peer_up": True,
+                                "peer_ifdesc": None,
+                                "peer_comment": 'Quoted "description" \u00e9',
+                            }
+                        },
+                    },
+                    {
+                        "vrf": "non-default",
+                        "TABLE_peer": {
+                            "ROW_peer": [
+                                {"peer_ipaddr": "10.1.0.2", "peer_ifname": "Eth1/2"},
+                                {"peer_ipaddr": "10.1.0.3", "peer_ifname": "Eth1/3"},
+                            ]
+                        },
+                    },
+                ]
+            },
+        }
+    }
+}
+EIGRP_STREAM_PATH = (
+    "TABLE_asn",
+    "ROW_asn",
+    "TABLE_vrf",
+    "ROW_vrf",
+    "TABLE_peer",
+    "ROW_peer",
+)
+EIGRP_STREAM_OUTPUT = [
+    StreamedRow(
+        path=EIGRP_STREAM_PATH,
+        ancestors=({"asn": "1"}, {"vrf": "default"}),
+        row=EIGRP_STREAM_INPUT["TABLE_asn"]["ROW_asn"]["TABLE_vrf"]["ROW_vrf"][0][
+            "TABLE_peer"
+        ]["ROW_peer"],
+    ),
+    StreamedRow(
+        path=EIGRP_STREAM_PATH,
+        ancestors=({"asn": "1"}, {"vrf": "non-default"}),
+        row={"peer_ipaddr": "10.1.0.2", "peer_ifname": "Eth1/2"},
+    ),
+    StreamedRow(
+        path=EIGRP_STREAM_PATH,
+        ancestors=({"asn": "1"}, {"vrf": "non-default"}),
+        row={"peer_ipaddr": "10.1.0.3", "peer_ifname": "Eth1/3"},
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "source, chunk_size",
+    [
+        pytest.param(
+            io.StringIO(json.dumps(EIGRP_STREAM_INPUT)), 65536, id="Test text file"
+        ),
+        pytest.param(
+            io.BytesIO(json.dumps(EIGRP_STREAM_INPUT, ensure_ascii=False).encode()),
+            65536,
+            id="Test binary file",
+        ),
+        pytest.param(
+            io.StringIO(json.dumps(EIGRP_STREAM_INPUT, indent=4)),
+            1,
+            id="Test text file read one character at a time",
+        ),
+        pytest.param(
+            io.BytesIO(json.dumps(EIGRP_STREAM_INPUT, ensure_ascii=False).encode()),
+            1,
+            id="Test binary file read one byte at a time",
+        ),
+    ],
+)
+def test_iter_normalized_rows(source, chunk_size):
+    """Tests whether `iter_normalized_rows` function works as expected."""
+    assert list(iter_normalized_rows(source, chunk_size)) == EIGRP_STREAM_OUTPUT
+
+
+def test_iter_normalized_rows_from_socket():
+    """Tests whether `iter_normalized_rows` function reads from a socket."""
+    reader, writer = socket.socketpair()
+    with reader, writer:
+        writer.sendall(json.dumps(EIGRP_STREAM_INPUT).encode())
+        writer.shutdown(socket.SHUT_WR)
+        assert list(iter_normalized_rows(reader, 16)) == EIGRP_STREAM_OUTPUT
+
+
+def test_iter_normalized_rows_invalid_document():
+    """Tests whether `iter_normalized_rows` function rejects documents that are not JSON."""
+    with pytest.raises(ValueError):
+        list(
+            iter_normalized_rows(
+                io.StringIO('{"TABLE_peer": {"ROW_peer": {"a": nope}}}')
+            )
+        )
+
+
+EIGRP_PATHS = [
+    "TABLE_asn.ROW_asn",
+    "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf",
+    "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer",
+]
+
+
+def test_learn_row_paths():
+    """Tests whether `learn_row_paths` function works as expected."""
+    assert learn_row_paths(
+        [EIGRP_STREAM_INPUT, {"TABLE_other": {"ROW_other": []}}]
+    ) == sorted(EIGRP_PATHS + ["TABLE_other.ROW_other"])
+
+
+@pytest.mark.parametrize(
+    "paths, samples, input, output",
+    [
+        pytest.param(
+            EIGRP_PATHS,
+            None,
+            json.loads(json.dumps(EIGRP_STREAM_INPUT)),
+            normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT))),
+            id="Test normalizer compiled from declared paths",
+        ),
+        pytest.param(
+            None,
+            [EIGRP_STREAM_INPUT],
+            json.loads(json.dumps(EIGRP_STREAM_INPUT)),
+            normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT))),
+            id="Test normalizer compiled from sample output",
+        ),
+        pytest.param(
+            ["TABLE_peer.ROW_peer"],
+            None,
+            {
+                "TABLE_peer": {"ROW_peer": {"a": "1"}},
+                "TABLE_other": {"ROW_other": {"b": "2"}},
+            },
+            {
+                "TABLE_peer": {"ROW_peer": [{"a": "1"}]},
+                "TABLE_other": {"ROW_other": [{"b": "2"}]},
+            },
+            id="Test ROW_ keys outside of known paths fall back to generic normalizer",
+        ),
+        pytest.param(
+            None,
+            [{"TABLE_vrf": {"ROW_vrf": {"vrf": "default"}}}],
+            {
+                "TABLE_vrf": {
+                    "ROW_vrf": {
+                        "vrf": "default",
+                        "TABLE_peer": {"ROW_peer": {"a": "1"}},
+                        "stats": {"sent": "1"},
+                    }
+                }
+            },
+            {
+                "TABLE_vrf": {
+                    "ROW_vrf": [
+                        {
+                            "vrf": "default",
+                            "TABLE_peer": {"ROW_peer": [{"a": "1"}]},
+                            "stats": {"sent": "1"},
+                        }
+                    ]
+                }
+            },
+            id="Test table missing from samples falls back to generic normalizer",
+        ),
+        pytest.param(
+            ["TABLE_peer.ROW_peer", "TABLE_other.ROW_other"],
+            None,
+            {
+                "TABLE_peer": {"ROW_peer": {"a": "1"}},
+                "TABLE_other": {"ROW_other": {"b": "2"}},
+            },
+            {
+                "TABLE_peer": {"ROW_peer": [{"a": "1"}]},
+                "TABLE_other": {"ROW_other": [{"b": "2"}]},
+            },
+            id="Test missing and present tables are normalized",
+        ),
+        pytest.param(
+            ["TABLE_peer.ROW_peer.TABLE_nbr.ROW_nbr"],
+            None,
+            {"TABLE_peer": "unexpected", "TABLE_other": {"ROW_other": {"b": "2"}}},
+            {"TABLE_peer": "unexpected", "TABLE_other": {"ROW_other": [{"b": "2"}]}},
+            id="Test unexpected shape falls back to generic normalizer",
+        ),
+        pytest.param(
+            [".".join(["TABLE_level.ROW_level"] * 200)],
+            None,
+            {"TABLE_level": {"ROW_level": {"a": "1"}}},
+            {"TABLE_level": {"ROW_level": [{"a": "1"}]}},
+            id="Test paths too deep to compile fall back to generic normalizer",
+        ),
+    ],
+)
+def test_compile_normalizer(paths, samples, input, output):
+    """Tests whether `compile_normalizer` function works as expected."""
+    normalizer = compile_normalizer("show test", paths=paths, samples=samples)
+    assert normalizer(input) == output
+
+
+def test_normalize_command_output(monkeypatch):
+    """Tests whether `normalize_command_output` function uses compiled normalizers."""
+    compile_normalizer("show compiled test", paths=["TABLE_peer.ROW_peer"])
+    input = {"TABLE_peer": {"ROW_peer": {"a": "1"}}, "TABLE_other": {"b": "2"}}
+    output = {"TABLE_peer": {"ROW_peer": [{"a": "1"}]}, "TABLE_other": {"b": "2"}}
+    assert (
+        normalize_command_output("show uncompiled test", json.loads(json.dumps(input)))
+        == output
+    )
+    monkeypatch.setattr(
+        "normalize_nxos_json.normalize_output_iterative", lambda input: None
+    )
+    assert (
+        normalize_command_output("show compiled test", json.loads(json.dumps(input)))
+        == output
+    )
+    input["TABLE_other"] = {"ROW_other": {"b": "2"}}
+    assert (
+        normalize_command_output("show compiled test", json.loads(json.dumps(input)))
+        is None
+    )
+
+
+def test_normalized_view():
+    """Tests whether `NormalizedView` presents the same data as `normalize_output`."""
+    raw = json.loads(json.dumps(EIGRP_STREAM_INPUT))
+    view = NormalizedView(raw)
+    assert view == normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT)))
+    assert raw == EIGRP_STREAM_INPUT
+
+
+def test_normalized_view_access():
+    """Tests whether `NormalizedView` supports the access patterns of normalized output."""
+    view = NormalizedView(json.loads(json.dumps(EIGRP_STREAM_INPUT)))
+    qty = 0
+    for asn in view["TABLE_asn"]["ROW_asn"]:
+        for vrf in asn["TABLE_vrf"]["ROW_vrf"]:
+            qty += len(vrf["TABLE_peer"]["ROW_peer"])
+    assert qty == 3
+    peers = view["TABLE_asn"]["ROW_asn"][0]["TABLE_vrf"]["ROW_vrf"][-1]["TABLE_peer"][
+        "ROW_peer"
+    ]
+    assert [peer["peer_ipaddr"] for peer in peers[:2]] == ["10.1.0.2", "10.1.0.3"]
+    assert peers[0] is peers[-2]
+    assert view["TABLE_asn"] is view["TABLE_asn"]
+    assert "TABLE_vrf" in view["TABLE_asn"]["ROW_asn"][0]
+    with pytest.raises(IndexError):
+        peers[-3]
+    with pytest.raises(KeyError):
+        view["TABLE_missing"]
+
+
+def test_normalized_view_is_lazy():
+    """Tests whether `NormalizedView` only creates views for values that are accessed."""
+    view = NormalizedView(
+        {"TABLE_a": {"ROW_a": {"a": "1"}}, "TABLE_b": {"ROW_b": {"b": "2"}}}
+    )
+    view["TABLE_a"]["ROW_a"]
+    assert list(view._cache) == ["TABLE_a"]
+
+
+@pytest.mark.parametrize(
+    "input, output",
+    [
+        pytest.param(
+            {"test": "one"},
+            {"test": "one"},
+            id="Test simple dictionary is not modified",
+        ),
+        pytest.param(
+            {"test": ["one", {"ROW_example": {"test": "two"}}, []]},
+            {"test": ["one", {"ROW_example": [{"test": "two"}]}, []]},
+            id="Test list mixing dictionaries and other values is normalized",
+        ),
+        pytest.param(
+            {"nested": {"TABLE_peer": {"ROW_peer": {"test": "one"}}}},
+            {"nested": {"TABLE_peer": {"ROW_peer": [{"test": "one"}]}}},
+            id="Test ROW_ key nested beneath plain dictionaries is modified",
+        ),
+        pytest.param(
+            EIGRP_STREAM_INPUT,
+            normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT))),
+            id="Test NX-OS routing protocol data with mixed single and multiple rows",
+        ),
+    ],
+)
+def test_normalized_copy(input, output):
+    """Tests whether `normalized_copy` function works as expected."""
+    original = json.loads(json.dumps(input))
+    assert normalized_copy(input) == output
+    assert input == original
+
+
+def test_normalized_copy_shares_structure():
+    """Tests whether `normalized_copy` only copies containers along changed paths."""
+    untouched = {"TABLE_other": {"ROW_other": [{"b": "2"}]}}
+    row = {"a": "1", "list": ["x"]}
+    input = {"changed": {"TABLE_peer": {"ROW_peer": row}}, "untouched": untouched}
+    output = normalized_copy(input)
+    assert output is not input
+    assert output["changed"] is not input["changed"]
+    assert output["changed"]["TABLE_peer"]["ROW_peer"][0] is row
+    assert output["untouched"] is untouched
+    assert normalized_copy(untouched) is untouched
+
+
+EIGRP_PEER_PATH = ".".join(EIGRP_STREAM_PATH)
+
+
+@pytest.mark.parametrize(
+    "input",
+    [
+        pytest.param(EIGRP_STREAM_INPUT, id="Test unnormalized output"),
+        pytest.param(
+            normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT))),
+            id="Test normalized output",
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "ancestors, output",
+    [
+        pytest.param(
+            False,
+            [row.row for row in EIGRP_STREAM_OUTPUT],
+            id="Test rows without ancestors",
+        ),
+        pytest.param(
+            True,
+            [
+                (dict(a for d in row.ancestors for a in d.items()), row.row)
+                for row in EIGRP_STREAM_OUTPUT
+            ],
+            id="Test rows with every ancestor field",
+        ),
+        pytest.param(
+            ["vrf", "missing"],
+            [
+                ({"vrf": row.ancestors[1]["vrf"], "missing": None}, row.row)
+                for row in EIGRP_STREAM_OUTPUT
+            ],
+            id="Test rows with selected ancestor fields",
+        ),
+    ],
+)
+def test_iter_rows(input, ancestors, output):
+    """Tests whether `iter_rows` function works as expected."""
+    assert list(iter_rows(input, EIGRP_PEER_PATH, ancestors)) == output
+
+
+@pytest.mark.parametrize(
+    "input, path, count",
+    [
+        pytest.param({}, EIGRP_PEER_PATH, 0, id="Test missing table"),
+        pytest.param(
+            {"TABLE_asn": "unexpected"}, EIGRP_PEER_PATH, 0, id="Test unexpected table"
+        ),
+        pytest.param(
+            {"TABLE_peer": {"ROW_peer": [{"a": "1"}, "unexpected", {"a": "2"}]}},
+            "TABLE_peer.ROW_peer",
+            2,
+            id="Test rows that are not dictionaries are skipped",
+        ),
+        pytest.param(
+            EIGRP_STREAM_INPUT, "TABLE_asn.ROW_asn", 1, id="Test parent table"
+        ),
+    ],
+)
+def test_iter_rows_count(input, path, count):
+    """Tests whether `iter_rows` function tolerates missing and unexpected tables."""
+    assert sum(1 for _ in iter_rows(input, path)) == count
+
+
+def test_iter_rows_invalid_path():
+    """Tests whether `iter_rows` function rejects paths that do not end with a ROW_ key."""
+    with pytest.raises(ValueError):
+        list(iter_rows(EIGRP_STREAM_INPUT, "TABLE_asn.ROW_asn.TABLE_vrf"))
+
+
+COLUMNAR_INPUT = {
+    "TABLE_vrf": {
+        "ROW_vrf": [
+            {
+                "vrf": "default",
+                "TABLE_peer": {
+                    "ROW_peer": [
+                        {
+                            "peer_ifname": "Eth1/1",
+                            "srtt": "12",
+                            "rto": 1.5,
+                            "state": "FULL",
+                        },
+                        {"peer_ifname": "Eth1/2", "srtt": "-3", "rto": 2, "up": True},
+                    ]
+                },
+            },
+            {
+                "vrf": "red",
+                "TABLE_peer": {
+                    "ROW_peer": {
+                        "peer_ifname": "Eth1/1",
+                        "srtt": "7",
+                        "rto": 3.0,
+                        "vrf": "override",
+                        "nested": {"ignored": "value"},
+                    }
+                },
+            },
+        ]
+    }
+}
+
+
+@pytest.mark.parametrize(
+    "name, column",
+    [
+        pytest.param(
+            "srtt", array("q", [12, -3, 7]), id="Test integer strings become integers"
+        ),
+        pytest.param(
+            "rto", array("d", [1.5, 2.0, 3.0]), id="Test numbers become doubles"
+        ),
+        pytest.param(
+            "peer_ifname",
+            DictionaryColumn(array("i", [0, 1, 0]), ["Eth1/1", "Eth1/2"]),
+            id="Test strings are dictionary-encoded",
+        ),
+        pytest.param(
+            "state",
+            DictionaryColumn(array("i", [0, 1, 1]), ["FULL", None]),
+            id="Test missing values are dictionary-encoded",
+        ),
+        pytest.param(
+            "vrf",
+            DictionaryColumn(array("i", [0, 0, 1]), ["default", "override"]),
+            id="Test ancestor fields are flattened and overridden by row fields",
+        ),
+    ],
+)
+def test_to_columnar(name, column):
+    """Tests whether `to_columnar` function works as expected."""
+    table = to_columnar(COLUMNAR_INPUT, "TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer")
+    assert len(table) == 3
+    assert "nested" not in table.columns
+    assert table[name] == column
+
+
+@pytest.mark.parametrize(
+    "values, column",
+    [
+        pytest.param(["10", "-20"], array("q", [10, -20]), id="Test integers"),
+        pytest.param(
+            ["0", "1.5", "2e3"], array("d", [0.0, 1.5, 2000.0]), id="Test floats"
+        ),
+        pytest.param(
+            ["0010", "0020"],
+            DictionaryColumn(array("i", [0, 1]), ["0010", "0020"]),
+            id="Test zero-padded integers are not numbers",
+        ),
+        pytest.param(
+            ["00.5", "1.5"],
+            DictionaryColumn(array("i", [0, 1]), ["00.5", "1.5"]),
+            id="Test zero-padded floats are not numbers",
+        ),
+        pytest.param(
+            ["nan", "inf"],
+            DictionaryColumn(array("i", [0, 1]), ["nan", "inf"]),
+            id="Test nan and inf are not numbers",
+        ),
+        pytest.param(
+            ["1_000", " 7 "],
+            DictionaryColumn(array("i", [0, 1]), ["1_000", " 7 "]),
+            id="Test underscores and whitespace are not numbers",
+        ),
+    ],
+)
+def test_to_columnar_numeric_strings(values, column):
+    """Tests whether `to_columnar` only converts strings that are numbers without losing data."""
+    data = {"TABLE_peer": {"ROW_peer": [{"value": value} for value in values]}}
+    assert to_columnar(data, "TABLE_peer.ROW_peer")["value"] == column
+
+
+def test_to_columnar_without_ancestors():
+    """Tests whether `to_columnar` function only flattens ancestor fields when asked to."""
+    table = to_columnar(
+        COLUMNAR_INPUT, "TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer", ancestors=False
+    )
+    assert table["vrf"].decode() == [None, None, "override"]
+
+
+def test_to_columnar_to_numpy():
+    """Tests whether `ColumnarTable.to_numpy` method converts every column."""
+    numpy = pytest.importorskip("numpy")
+    arrays = to_columnar(
+        COLUMNAR_INPUT, "TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+    ).to_numpy()
+    assert arrays["srtt"].dtype == numpy.int64
+    assert arrays["srtt"].tolist() == [12, -3, 7]
+    assert arrays["rto"].tolist() == [1.5, 2.0, 3.0]
+    assert arrays["peer_ifname"].tolist() == ["Eth1/1", "Eth1/2", "Eth1/1"]
+
+
+def test_normalize_output_iterative_records():
+    """Tests whether `normalize_output_iterative` function converts rows into records."""
+    output = normalize_output_iterative(
+        json.loads(json.dumps(EIGRP_STREAM_INPUT)), records=True
+    )
+    assert output == normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT)))
+    asn = output["TABLE_asn"]["ROW_asn"][0]
+    assert isinstance(asn, Record)
+    assert asn.asn == "1"
+    assert [row for _, row in iter_rows(output, EIGRP_PEER_PATH, ancestors=True)] == [
+        row.row for row in EIGRP_STREAM_OUTPUT
+    ]
+
+
+def test_rows_to_records():
+    """Tests whether `rows_to_records` function handles missing and unusual field names."""
+    rows = [
+        {"ucast-nhops": "1", "items": "2", "class": "3", "1st": "4"},
+        {"ucast-nhops": "5"},
+        "unexpected",
+    ]
+    cls = rows_to_records("ROW_test", [rows])
+    full, partial, unexpected = rows
+    assert isinstance(full, cls) and isinstance(partial, cls)
+    assert unexpected == "unexpected"
+    assert full == {"ucast-nhops": "1", "items": "2", "class": "3", "1st": "4"}
+    assert (full.ucast_nhops, full.items_, full.class_, full._1st) == (
+        "1",
+        "2",
+        "3",
+        "4",
+    )
+    assert dict(full.items()) == {
+        "ucast-nhops": "1",
+        "items": "2",
+        "class": "3",
+        "1st": "4",
+    }
+    assert partial == {"ucast-nhops": "5"}
+    assert len(partial) == 1
+    assert "items" not in partial
+    assert partial.get("items", "default") == "default"
+    with pytest.raises(KeyError):
+        partial["items"]
+    with pytest.raises(AttributeError):
+        partial.items_
+    assert (
+        rows_to_records("ROW_test", [[{"ucast-nhops": "6", "items": "7"}]]) is not cls
+    )
+    assert rows_to_records("ROW_test", [[{"ucast-nhops": "6"}, dict(full)]]) is cls
+
+
+@pytest.mark.parametrize(
+    "normalize",
+    [
+        pytest.param(
+            lambda document, pool: loads_normalized(document, intern=pool),
+            id="Test loads_normalized",
+        ),
+        pytest.param(
+            lambda document, pool: normalize_output_iterative(
+                json.loads(document), intern=pool
+            ),
+            id="Test normalize_output_iterative",
+        ),
+    ],
+)
+def test_intern_pool(normalize):
+    """Tests whether `InternPool` deduplicates keys and low-cardinality values across outputs."""
+    pool = InternPool(max_cardinality=2)
+    documents = [
+        json.dumps({"TABLE_peer": {"ROW_peer": {"state": "FULL", "addr": "10.1.0.1"}}}),
+        json.dumps({"TABLE_peer": {"ROW_peer": {"state": "FULL", "addr": "10.1.0.2"}}}),
+        json.dumps({"TABLE_peer": {"ROW_peer": {"state": "INIT", "addr": "10.1.0.3"}}}),
+        json.dumps({"TABLE_peer": {"ROW_peer": {"state": "INIT", "addr": "10.1.0.3"}}}),
+    ]
+    first, second, third, fourth = [normalize(document, pool) for document in documents]
+    assert second == {
+        "TABLE_peer": {"ROW_peer": [{"state": "FULL", "addr": "10.1.0.2"}]}
+    }
+    first_row = first["TABLE_peer"]["ROW_peer"][0]
+    second_row = second["TABLE_peer"]["ROW_peer"][0]
+    third_row = third["TABLE_peer"]["ROW_peer"][0]
+    fourth_row = fourth["TABLE_peer"]["ROW_peer"][0]
+    assert list(first_row)[0] is list(second_row)[0]
+    assert first_row["state"] is second_row["state"]
+    assert third_row["state"] is fourth_row["state"]
+    # The addr key has been seen with more than 2 distinct values by now.
+    assert third_row["addr"] is not fourth_row["addr"]
+    assert pool.bytes_saved > 0
+
+
+COERCE_INPUT = {
+    "TABLE_nbr": {
+        "ROW_nbr": [
+            {
+                "rid": "10.0.0.1",
+                "priority": "1",
+                "cost": "2.5",
+                "passive": "false",
+                "uptime": "P14DT19H11M58S",
+            },
+            {
+                "rid": "10.0.0.2",
+                "priority": "-3",
+                "cost": "10",
+                "passive": "true",
+                "uptime": "PT42S",
+            },
+        ]
+    },
+    "TABLE_intf": {"ROW_intf": {"intf": "Eth1/1", "mtu": "9216", "state": "up"}},
+}
+COERCE_TYPES = {
+    "ROW_nbr": {
+        "priority": "int",
+        "cost": "float",
+        "passive": "bool",
+        "uptime": "duration",
+    },
+    "ROW_intf": {"mtu": "int"},
+}
+COERCE_OUTPUT = {
+    "TABLE_nbr": {
+        "ROW_nbr": [
+            {
+                "rid": "10.0.0.1",
+                "priority": 1,
+                "cost": 2.5,
+                "passive": False,
+                "uptime": timedelta(days=14, hours=19, minutes=11, seconds=58),
+            },
+            {
+                "rid": "10.0.0.2",
+                "priority": -3,
+                "cost": 10.0,
+                "passive": True,
+                "uptime": timedelta(seconds=42),
+            },
+        ]
+    },
+    "TABLE_intf": {"ROW_intf": [{"intf": "Eth1/1", "mtu": 9216, "state": "up"}]},
+}
+
+
+def test_infer_field_types():
+    """Tests whether `infer_field_types` finds the narrowest type every value of a field matches."""
+    assert infer_field_types([COERCE_INPUT]) == COERCE_TYPES
+
+
+def test_infer_field_types_zero_padded():
+    """Tests whether zero-padded values are treated as identifiers rather than numbers."""
+    data = {
+        "TABLE_vlan": {
+            "ROW_vlan": [
+                {"id": "0010", "weight": "0.5", "count": "0"},
+                {"id": "200", "weight": "00.5", "count": "10"},
+            ]
+        }
+    }
+    assert infer_field_types([data]) == {"ROW_vlan": {"count": "int"}}
+    rows = normalize_output_iterative(data, coerce=True)["TABLE_vlan"]["ROW_vlan"]
+    assert [(row["id"], row["weight"], row["count"]) for row in rows] == [
+        ("0010", "0.5", 0),
+        ("200", "00.5", 10),
+    ]
+
+
+@pytest.mark.parametrize(
+    "coerce",
+    [
+        pytest.param(COERCE_TYPES, id="Test declared field types"),
+        pytest.param(True, id="Test inferred field types"),
+    ],
+)
+def test_normalize_output_iterative_coerce(coerce):
+    """Tests whether `normalize_output_iterative` converts field values while normalizing."""
+    assert normalize_output_iterative(
+        json.loads(json.dumps(COERCE_INPUT)), coerce=coerce
+    ) == (COERCE_OUTPUT)
+
+
+def test_normalize_output_iterative_coerce_invalid():
+    """Tests whether values that cannot be converted are left as-is."""
+    data = {
+        "TABLE_nbr": {
+            "ROW_nbr": [{"priority": "1"}, {"priority": "n/a"}, {"priority": 5}]
+        }
+    }
+    output = normalize_output_iterative(
+        data,
+        coerce={"ROW_nbr": {"priority": "int", "missing": lambda value: value.upper()}},
+    )
+    assert output == {
+        "TABLE_nbr": {
+            "ROW_nbr": [{"priority": 1}, {"priority": "n/a"}, {"priority": 5}]
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "value, output",
+    [
+        pytest.param("PT0S", timedelta(0), id="Test zero duration"),
+        pytest.param("P1W2D", timedelta(days=9), id="Test weeks and days"),
+        pytest.param(
+            "PT1H30M0.5S", timedelta(hours=1, minutes=30, seconds=0.5), id="Test time"
+        ),
+        pytest.param("P1Y1M", timedelta(days=395), id="Test years and months"),
+    ],
+)
+def test_parse_duration(value, output):
+    """Tests whether `parse_duration` parses ISO 8601 durations."""
+    assert parse_duration(value) == output
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pytest.param("P", id="Test empty duration"),
+        pytest.param("P1DT", id="Test empty time"),
+        pytest.param("P1H", id="Test hours without time designator"),
+        pytest.param("14:02:11", id="Test clock time"),
+    ],
+)
+def test_parse_duration_invalid(value):
+    """Tests whether `parse_duration` rejects strings that are not ISO 8601 durations."""
+    with pytest.raises(ValueError):
+        parse_duration(value)
+
+
+@pytest.mark.parametrize(
+    "kwargs, deserialize",
+    [
+        pytest.param({}, False, id="Test JSON text in a thread pool"),
+        pytest.param(
+            {"process_threshold": 0}, False, id="Test JSON text in a process pool"
+        ),
+        pytest.param({}, True, id="Test data structure in a thread pool"),
+        pytest.param({"yield_every": 2}, True, id="Test data structure cooperatively"),
+    ],
+)
+def test_normalize_async(kwargs, deserialize):
+    """Tests whether `normalize_async` normalizes output while other tasks keep running."""
+    document = json.dumps(EIGRP_STREAM_INPUT)
+
+    async def normalize_with_heartbeat():
+        ticks = []
+
+        async def heartbeat():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(heartbeat())
+        await asyncio.sleep(0)
+        data = json.loads(document) if deserialize else document
+        output = await normalize_async(data, **kwargs)
+        ticker.cancel()
+        return output, len(ticks)
+
+    output, ticks = asyncio.run(normalize_with_heartbeat())
+    assert output == normalize_output(json.loads(document))
+    assert ticks > 1
+
+
+DIFF_OLD = {
+    "TABLE_vrf": {
+        "ROW_vrf": [
+            {
+                "vrf": "default",
+                "TABLE_peer": {
+                    "ROW_peer": [
+                        {
+                            "peer_ipaddr": "10.1.0.1",
+                            "peer_state": "FULL",
+                            "peer_uptime": "PT1S",
+                        },
+                        {
+                            "peer_ipaddr": "10.1.0.2",
+                            "peer_state": "FULL",
+                            "peer_uptime": "PT1S",
+                        },
+                    ]
+                },
+            },
+            {
+                "vrf": "blue",
+                "TABLE_peer": {
+                    "ROW_peer": {"peer_ipaddr": "10.1.0.1", "peer_state": "FULL"}
+                },
+            },
+        ]
+    }
+}
+DIFF_NEW = {
+    "TABLE_vrf": {
+        "ROW_vrf": {
+            "vrf": "default",
+            "TABLE_peer": {
+                "ROW_peer": [
+                    {
+                        "peer_ipaddr": "10.1.0.1",
+                        "peer_state": "FULL",
+                        "peer_uptime": "PT9S",
+                    },
+                    {
+                        "peer_ipaddr": "10.1.0.2",
+                        "peer_state": "INIT",
+                        "peer_uptime": "PT9S",
+                    },
+                    {
+                        "peer_ipaddr": "10.1.0.3",
+                        "peer_state": "INIT",
+                        "peer_uptime": "PT9S",
+                    },
+                ]
+            },
+        }
+    }
+}
+DIFF_PATH = "TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+
+
+def test_diff_rows():
+    """Tests whether `diff_rows` matches rows by identity key, including ancestor fields."""
+    diff = diff_rows(
+        DIFF_OLD, DIFF_NEW, DIFF_PATH, ["vrf", "peer_ipaddr"], ignore=["peer_uptime"]
+    )
+    assert diff.added == {
+        ("default", "10.1.0.3"): {
+            "peer_ipaddr": "10.1.0.3",
+            "peer_state": "INIT",
+            "peer_uptime": "PT9S",
+        }
+    }
+    assert diff.removed == {
+        ("blue", "10.1.0.1"): {"peer_ipaddr": "10.1.0.1", "peer_state": "FULL"}
+    }
+    assert list(diff.changed) == [("default", "10.1.0.2")]
+    old_row, new_row = diff.changed[("default", "10.1.0.2")]
+    assert (old_row["peer_state"], new_row["peer_state"]) == ("FULL", "INIT")
+
+
+def test_diff_rows_duplicate_identity():
+    """Tests whether `diff_rows` rejects identity keys that are not unique."""
+    with pytest.raises(ValueError):
+        diff_rows(DIFF_OLD, DIFF_NEW, DIFF_PATH, "peer_ipaddr")
+
+
+def test_row_differ():
+    """Tests whether `RowDiffer` compares each snapshot with the previous one."""
+    differ = RowDiffer(DIFF_PATH, ("vrf", "peer_ipaddr"))
+    assert len(differ.update(DIFF_OLD).added) == 3
+    diff = differ.update(DIFF_NEW)
+    assert (len(diff.added), len(diff.removed), len(diff.changed)) == (1, 1, 2)
+    assert differ.update(DIFF_NEW) == ({}, {}, {})
+
+
+INDEX_INPUT = {
+    "TABLE_asn": {
+        "ROW_asn": {
+            "asn": "1",
+            "TABLE_vrf": {
+                "ROW_vrf": [
+                    {
+                        "vrf": "default",
+                        "TABLE_peer": {
+                            "ROW_peer": [
+                                {"peer_ipaddr": "10.1.0.1", "peer_ifname": "Eth1/1"},
+                                {"peer_ipaddr": "10.1.0.2", "peer_ifname": "Eth1/2"},
+                            ]
+                        },
+                    },
+                    {
+                        "vrf": "blue",
+                        "TABLE_peer": {
+                            "ROW_peer": {
+                                "peer_ipaddr": "10.1.0.1",
+                                "peer_ifname": "Eth1/1",
+                            }
+                        },
+                    },
+                ]
+            },
+        }
+    }
+}
+INDEX_PATH = "TABLE_asn.ROW_asn.TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+
+
+def build_index_while_normalizing(data, path, key, ancestors=True):
+    """Build an index with `normalize_output_iterative`, checking the output is normalized."""
+    index = TableIndex(path, key, ancestors)
+    assert normalize_output_iterative(data, indexes=[index]) == normalize_output(
+        json.loads(json.dumps(INDEX_INPUT))
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        pytest.param(build_index, id="Test build_index"),
+        pytest.param(
+            build_index_while_normalizing, id="Test normalize_output_iterative"
+        ),
+    ],
+)
+def test_table_index(build):
+    """Tests whether `TableIndex` maps keys to rows and the fields of the rows enclosing them."""
+    data = json.loads(json.dumps(INDEX_INPUT))
+    by_interface = build(data, INDEX_PATH, "peer_ifname")
+    assert sorted(by_interface) == ["Eth1/1", "Eth1/2"]
+    assert sorted(
+        (entry.context["vrf"], entry.context["asn"], entry.row["peer_ipaddr"])
+        for entry in by_interface["Eth1/1"]
+    ) == [("blue", "1", "10.1.0.1"), ("default", "1", "10.1.0.1")]
+
+    by_peer = build(data, INDEX_PATH, ["vrf", "peer_ipaddr"], ancestors=["asn"])
+    assert [entry.context for entry in by_peer[("blue", "10.1.0.1")]] == [{"asn": "1"}]
+    assert [key for key, _ in by_peer.range(("blue",), ("default", "10.1.0.2"))] == [
+        ("blue", "10.1.0.1"),
+        ("default", "10.1.0.1"),
+    ]
+    assert [key for key, _ in by_peer.prefix("def")] == [
+        ("default", "10.1.0.1"),
+        ("default", "10.1.0.2"),
+    ]
+    assert list(by_interface.prefix("Eth1/2")) == [("Eth1/2", by_interface["Eth1/2"])]
+
+
+def test_table_index_document_order():
+    """Tests whether indexes list rows in document order, whichever way they are built."""
+    data = json.loads(json.dumps(INDEX_INPUT))
+    expected = [("default", "10.1.0.1"), ("blue", "10.1.0.1")]
+    for index in (
+        build_index(data, INDEX_PATH, "peer_ifname"),
+        build_index_while_normalizing(data, INDEX_PATH, "peer_ifname"),
+    ):
+        assert [
+            (entry.context["vrf"], entry.row["peer_ipaddr"])
+            for entry in index["Eth1/1"]
+        ] == expected
+        assert list(index) == ["Eth1/1", "Eth1/2"]
+
+
+@pytest.mark.parametrize(
+    "coerce",
+    [
+        pytest.param(True, id="Test indexing rows with inferred field types"),
+        pytest.param(
+            {"ROW_asn": {"asn": "int"}}, id="Test indexing rows with field types"
+        ),
+    ],
+)
+def test_table_index_coerce(coerce):
+    """Tests whether indexes built while normalizing are keyed by converted field values."""
+    index = TableIndex(INDEX_PATH, ("asn", "peer_ifname"))
+    data = normalize_output_iterative(
+        json.loads(json.dumps(INDEX_INPUT)), coerce=coerce, indexes=[index]
+    )
+    assert data["TABLE_asn"]["ROW_asn"][0]["asn"] == 1
+    assert list(index) == [(1, "Eth1/1"), (1, "Eth1/2")]
+    assert [entry.context["asn"] for entry in index[1, "Eth1/1"]] == [1, 1]
+    assert dict(index) == dict(build_index(data, INDEX_PATH, ("asn", "peer_ifname")))
+
+
+def test_table_index_records():
+    """Tests whether indexes built while normalizing point at rows converted into records."""
+    index = TableIndex(INDEX_PATH, "peer_ifname")
+    data = normalize_output_iterative(
+        json.loads(json.dumps(INDEX_INPUT)), records=True, indexes=[index]
+    )
+    rows = data["TABLE_asn"]["ROW_asn"][0]["TABLE_vrf"]["ROW_vrf"][0]["TABLE_peer"][
+        "ROW_peer"
+    ]
+    assert isinstance(rows[0], Record)
+    assert any(entry.row is rows[0] for entry in index["Eth1/1"])
+
+
+AGGREGATE_OUTPUTS = [
+    {
+        "TABLE_vrf": {
+            "ROW_vrf": [
+                {
+                    "vrf": "default",
+                    "TABLE_peer": {
+                        "ROW_peer": [
+                            {
+                                "peer_ipaddr": "10.1.0.1",
+                                "peer_state": "UP",
+                                "peer_q_cnt": "2",
+                            },
+                            {
+                                "peer_ipaddr": "10.1.0.2",
+                                "peer_state": "INIT",
+                                "peer_q_cnt": "5",
+                            },
+                        ]
+                    },
+                },
+                {
+                    "vrf": "blue",
+                    "TABLE_peer": {
+                        "ROW_peer": {
+                            "peer_ipaddr": "10.2.0.1",
+                            "peer_state": "UP",
+                            "peer_q_cnt": "1",
+                        }
+                    },
+                },
+            ]
+        }
+    },
+    {
+        "TABLE_vrf": {
+            "ROW_vrf": [
+                {
+                    "vrf": "default",
+                    "TABLE_peer": {
+                        "ROW_peer": [
+                            {
+                                "peer_ipaddr": "10.1.0.3",
+                                "peer_state": "UP",
+                                "peer_q_cnt": 4,
+                            },
+                            {"peer_ipaddr": "10.1.0.4", "peer_state": "UP"},
+                        ]
+                    },
+                }
+            ]
+        }
+    },
+]
+AGGREGATE_PATH = "TABLE_vrf.ROW_vrf.TABLE_peer.ROW_peer"
+
+
+@pytest.mark.parametrize(
+    "by, counts, sums",
+    [
+        pytest.param(None, 5, 12, id="Test without grouping"),
+        pytest.param(
+            "vrf",
+            {"default": 4, "blue": 1},
+            {"default": 11, "blue": 1},
+            id="Test ancestor field",
+        ),
+        pytest.param(
+            ["vrf", "peer_state"],
+            {("default", "UP"): 3, ("default", "INIT"): 1, ("blue", "UP"): 1},
+            {("default", "UP"): 6, ("default", "INIT"): 5, ("blue", "UP"): 1},
+            id="Test ancestor and row fields",
+        ),
+        pytest.param(
+            ["peer_state"],
+            {("UP",): 4, ("INIT",): 1},
+            {("UP",): 7, ("INIT",): 5},
+            id="Test single field sequence",
+        ),
+    ],
+)
+def test_aggregate(by, counts, sums):
+    """Tests whether `count_rows` and `sum_field` aggregate rows across several outputs."""
+    assert count_rows(AGGREGATE_OUTPUTS, AGGREGATE_PATH, by=by) == counts
+    assert sum_field(AGGREGATE_OUTPUTS, AGGREGATE_PATH, "peer_q_cnt", by=by) == sums
+    normalized = [
+        normalize_output_iterative(json.loads(json.dumps(output)))
+        for output in AGGREGATE_OUTPUTS
+    ]
+    assert count_rows(normalized, AGGREGATE_PATH, by=by) == counts
+
+
+def test_group_rows():
+    """Tests whether `group_rows` groups rows of a single output by the fields of a row."""
+    groups = group_rows(AGGREGATE_OUTPUTS[0], AGGREGATE_PATH, "peer_state")
+    assert {
+        state: [row["peer_ipaddr"] for row in rows] for state, rows in groups.items()
+    } == {
+        "UP": ["10.1.0.1", "10.2.0.1"],
+        "INIT": ["10.1.0.2"],
+    }
+
+
+@pytest.mark.parametrize(
+    "workers",
+    [
+        pytest.param(1, id="Test normalizing in the calling process"),
+        pytest.param(2, id="Test normalizing in a process pool"),
+    ],
+)
+def test_normalize_files(tmp_path, workers):
+    """Tests whether `normalize_files` normalizes files found in directories and glob patterns."""
+    captures = tmp_path / "captures"
+    (captures / "leaf1").mkdir(parents=True)
+    (captures / "leaf1" / "eigrp.json").write_text(json.dumps(EIGRP_STREAM_INPUT))
+    (captures / "spine1.json").write_text(json.dumps(INDEX_INPUT))
+    (captures / "notes.txt").write_text("not JSON")
+    (tmp_path / "extra.json").write_text("{invalid")
+
+    files = find_input_files([str(captures), str(tmp_path / "*.json")])
+    assert [relative for _, relative in files] == [
+        "spine1.json",
+        f"leaf1{os.sep}eigrp.json",
+        "extra.json",
+    ]
+    output = tmp_path / "output"
+    report = normalize_files(
+        [(path, str(output / relative)) for path, relative in files], workers=workers
+    )
+    assert report.files == 2
+    assert report.bytes == len(json.dumps(EIGRP_STREAM_INPUT)) + len(
+        json.dumps(INDEX_INPUT)
+    )
+    assert [path for path, _ in report.failures] == [str(tmp_path / "extra.json")]
+    assert json.loads(
+        (output / "leaf1" / "eigrp.json").read_text()
+    ) == normalize_output(json.loads(json.dumps(EIGRP_STREAM_INPUT)))
+    assert "files/s" in str(report)
+
+
+def test_main_in_place(tmp_path, capsys):
+    """Tests whether the command line interface normalizes files in place."""
+    capture = tmp_path / "spine1.json"
+    capture.write_text(json.dumps(INDEX_INPUT))
+    assert main([str(tmp_path), "--workers", "1"]) == 0
+    assert json.loads(capture.read_text()) == normalize_output(
+        json.loads(json.dumps(INDEX_INPUT))
+    )
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["spine1.json"]
+    assert "Normalized 1 files" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows has no POSIX permissions")
+def test_main_file_permissions(tmp_path):
+    """Tests whether normalized files keep the permissions of the files they replace."""
+    capture = tmp_path / "spine1.json"
+    capture.write_text(json.dumps(INDEX_INPUT))
+    capture.chmod(0o644)
+    assert main([str(capture), "--workers", "1"]) == 0
+    assert stat.S_IMODE(capture.stat().st_mode) == 0o644
+
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert main([str(capture), "-o", str(tmp_path / "output"), "-w", "1"]) == 0
+    output = tmp_path / "output" / "spine1.json"
+    assert stat.S_IMODE(output.stat().st_mode) == 0o666 & ~umask
+
+
+def test_main_same_file_names(tmp_path, capsys):
+    """Tests whether captures sharing a file name are never written to the same output file."""
+    for switch in ("leaf1", "leaf2"):
+        (tmp_path / "captures" / switch).mkdir(parents=True)
+        (tmp_path / "captures" / switch / "eigrp.json").write_text(
+            json.dumps({"switch": switch, **INDEX_INPUT})
+        )
+    output = tmp_path / "output"
+    assert (
+        main([str(tmp_path / "captures" / "*" / "eigrp.json"), "-o", str(output)]) == 0
+    )
+    for switch in ("leaf1", "leaf2"):
+        assert (
+            json.loads((output / switch / "eigrp.json").read_text())["switch"] == switch
+        )
+
+    explicit = [
+        str(tmp_path / "captures" / switch / "eigrp.json")
+        for switch in ("leaf1", "leaf2")
+    ]
+    with pytest.raises(SystemExit):
+        main(explicit + ["-o", str(tmp_path / "explicit"), "--workers", "1"])
+    assert "would both be written to" in capsys.readouterr().err
+    assert not (tmp_path / "explicit").exists()
+
+
+class TrickleReader(io.BytesIO):
+    """Stands in for a pipe, returning at most a few bytes per read."""
+
+    def read1(self, size: int = -1) -> bytes:
+        """Return up to 7 bytes, like a pipe that data trickles into."""
+        return super().read1(7)
+
+
+@pytest.mark.parametrize(
+    "reader",
+    [
+        pytest.param(io.BytesIO, id="Test whole input available"),
+        pytest.param(TrickleReader, id="Test input trickling in"),
+    ],
+)
+def test_normalize_ndjson(reader):
+    """Tests whether `normalize_ndjson` normalizes every line and reports invalid lines."""
+    lines = [
+        json.dumps(INDEX_INPUT),
+        "",
+        "{invalid",
+        json.dumps(AGGREGATE_OUTPUTS[0]),
+    ]
+    destination = io.BytesIO()
+    records, failures = normalize_ndjson(reader("\n".join(lines).encode()), destination)
+    assert records == 2
+    assert [line_number for line_number, _ in failures] == [3]
+    assert [json.loads(line) for line in destination.getvalue().splitlines()] == [
+        normalize_output(json.loads(json.dumps(INDEX_INPUT))),
+        normalize_output(json.loads(json.dumps(AGGREGATE_OUTPUTS[0]))),
+    ]
+
+
+def test_normalize_ndjson_envelope():
+    """Tests whether `normalize_ndjson` normalizes output wrapped with metadata."""
+    records = [
+        {"host": "leaf1", "command": "show ip eigrp neighbors", "output": INDEX_INPUT},
+        {
+            "host": "leaf2",
+            "command": "show ip eigrp neighbors",
+            "output": json.dumps(INDEX_INPUT),
+        },
+    ]
+    source = io.BytesIO(
+        "".join(json.dumps(record) + "\n" for record in records).encode()
+    )
+    destination = io.BytesIO()
+    assert normalize_ndjson(source, destination, envelope="output") == (2, [])
+    expected = normalize_output(json.loads(json.dumps(INDEX_INPUT)))
+    assert [json.loads(line) for line in destination.getvalue().splitlines()] == [
+        {"host": "leaf1", "command": "show ip eigrp neighbors", "output": expected},
+        {"host": "leaf2", "command": "show ip eigrp neighbors", "output": expected},
+    ]
+
+
+@pytest.fixture(params=available_json_backends())
+def json_backend(request):
+    """Select each installed JSON backend in turn, restoring the backend in use afterwards."""
+    previous = get_json_backend().name
+    yield set_json_backend(request.param)
+    set_json_backend(previous)
+
+
+def test_json_backend_loads_normalized(json_backend):
+    """Tests whether every JSON backend deserializes and normalizes documents the same way."""
+    document = json.dumps(INDEX_INPUT)
+    expected = normalize_output(json.loads(document))
+    assert loads(document) == json.loads(document)
+    assert loads_normalized(document) == expected
+    assert loads_normalized(document.encode()) == expected
+    assert loads_normalized(document, intern=InternPool()) == expected
+    with pytest.raises(ValueError):
+        loads_normalized("{invalid")
+
+
+def test_json_backend_normalize_async(json_backend, monkeypatch):
+    """Tests whether `normalize_async` deserializes in threads with the standard library."""
+    document = json.dumps(INDEX_INPUT)
+    expected = normalize_output(json.loads(document))
+
+    def loads(data):
+        raise AssertionError("JSON backend used in a thread")
+
+    assert asyncio.run(normalize_async(document, process_threshold=0)) == expected
+    monkeypatch.setattr(
+        "normalize_nxos_json._JSON_BACKEND", json_backend._replace(loads=loads)
+    )
+    assert asyncio.run(normalize_async(document)) == expected
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        pytest.param("5", id="Test number"),
+        pytest.param("null", id="Test null"),
+        pytest.param('"text"', id="Test string"),
+        pytest.param('[{"ROW_a": {"b": "c"}}, 1]', id="Test list"),
+    ],
+)
+def test_json_backend_scalar_documents(json_backend, tmp_path, document):
+    """Tests whether every JSON backend handles documents that are not JSON objects the same way."""
+    expected = json.loads(document)
+    if isinstance(expected, list):
+        expected[0] = normalize_output(expected[0])
+    assert loads_normalized(document) == expected
+
+    destination = io.BytesIO()
+    assert normalize_ndjson(io.BytesIO(f"{document}\n".encode()), destination) == (
+        1,
+        [],
+    )
+    assert json.loads(destination.getvalue()) == expected
+
+    capture = tmp_path / "capture.json"
+    capture.write_text(document)
+    report = normalize_files([(str(capture), str(capture))], workers=1)
+    assert (report.files, report.failures) == (1, [])
+    assert json.loads(capture.read_text()) == expected
+
+
+def test_json_backend_normalize_files(json_backend, tmp_path):
+    """Tests whether every JSON backend normalizes files, memory-mapping them when possible."""
+    capture = tmp_path / "capture.json"
+    capture.write_text(json.dumps(INDEX_INPUT))
+    report = normalize_files([(str(capture), str(capture))], workers=1)
+    assert (report.files, report.failures) == (1, [])
+    assert json.loads(capture.read_text()) == normalize_output(
+        json.loads(json.dumps(INDEX_INPUT))
+    )
+
+
+def test_json_backend_dumps(json_backend):
+    """Tests whether every JSON backend serializes compact UTF-8 documents."""
+    data = {"intf": "Eth1/1", "description": "Liaison vers Genève", "uptime": ["P1D"]}
+    assert dumps(data) == (
+        '{"intf":"Eth1/1","description":"Liaison vers Genève","uptime":["P1D"]}'.encode()
+    )
+    assert json.loads(dumps(data, indent=2)) == data
+    assert dumps(data, indent=2).startswith(b'{\n  "intf"')
+
+
+def test_json_backend_normalize_ndjson(json_backend):
+    """Tests whether `normalize_ndjson` works with every JSON backend."""
+    source = io.BytesIO(f"{json.dumps(INDEX_INPUT)}\n{{invalid\n".encode())
+    destination = io.BytesIO()
+    records, failures = normalize_ndjson(source, destination)
+    assert (records, [line_number for line_number, _ in failures]) == (1, [2])
+    assert json.loads(destination.getvalue()) == normalize_output(
+        json.loads(json.dumps(INDEX_INPUT))
+    )
+
+
+def test_set_json_backend_unknown():
+    """Tests whether `set_json_backend` rejects unknown backends."""
+    assert available_json_backends()[-1] == "json"
+    with pytest.raises(ValueError):
+        set_json_backend("yaml")
+
+
+INDEX_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<nf:rpc-reply xmlns:nf="urn:ietf:params:xml:ns:netconf:base:1.0"
+  xmlns="http://www.cisco.com/nxos:1.0:eigrp">
+ <nf:data>
+  <show>
+   <ip>
+    <eigrp>
+     <neighbors>
+      <__XML__OPT_Cmd_show_ip_eigrp_neighbors_cmd_ip>
+       <__readonly__>
+        <TABLE_asn>
+         <ROW_asn>
+          <asn>1</asn>
+          <TABLE_vrf>
+           <ROW_vrf>
+            <vrf>default</vrf>
+            <TABLE_peer>
+             <ROW_peer>
+              <peer_ipaddr>10.1.0.1</peer_ipaddr>
+              <peer_ifname>Eth1/1</peer_ifname>
+             </ROW_peer>
+             <ROW_peer>
+              <peer_ipaddr>10.1.0.2</peer_ipaddr>
+              <peer_ifname>Eth1/2</peer_ifname>
+             </ROW_peer>
+            </TABLE_peer>
+           </ROW_vrf>
+           <ROW_vrf>
+            <vrf>blue</vrf>
+            <TABLE_peer>
+             <ROW_peer>
+              <peer_ipaddr>10.1.0.1</peer_ipaddr>
+              <peer_ifname>Eth1/1</peer_ifname>
+             </ROW_peer>
+            </TABLE_peer>
+           </ROW_vrf>
+          </TABLE_vrf>
+         </ROW_asn>
+        </TABLE_asn>
+       </__readonly__>
+      </__XML__OPT_Cmd_show_ip_eigrp_neighbors_cmd_ip>
+     </neighbors>
+    </eigrp>
+   </ip>
+  </show>
+ </nf:data>
+</nf:rpc-reply>
+]]>]]>
+"""
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param(INDEX_XML, id="Test string"),
+        pytest.param(INDEX_XML.encode(), id="Test bytes"),
+        pytest.param(TrickleReader(INDEX_XML.encode()), id="Test file-like object"),
+    ],
+)
+def test_normalize_xml(source):
+    """Tests whether `normalize_xml` builds normalized output from NX-OS XML output."""
+    expected = normalize_output(json.loads(json.dumps(INDEX_INPUT)))
+    assert normalize_xml(source) == expected
+
+
+def test_normalize_xml_intern():
+    """Tests whether `normalize_xml` deduplicates strings with an `InternPool`."""
+    pool = InternPool()
+    first = normalize_xml(INDEX_XML, intern=pool)
+    second = normalize_xml(INDEX_XML, intern=pool)
+    assert first == normalize_output(json.loads(json.dumps(INDEX_INPUT)))
+    first_peer = first["TABLE_asn"]["ROW_asn"][0]["TABLE_vrf"]["ROW_vrf"][1]
+    second_peer = second["TABLE_asn"]["ROW_asn"][0]["TABLE_vrf"]["ROW_vrf"][1]
+    assert first_peer["vrf"] is second_peer["vrf"]
+
+
+@pytest.mark.parametrize(
+    "source, output",
+    [
+        pytest.param(
+            "<rpc-reply><data><name>a</name><name>b</name></data></rpc-reply>",
+            {"data": {"name": ["a", "b"]}},
+            id="Test repeated elements without __readonly__ become a list",
+        ),
+        pytest.param(
+            "<rpc-reply><__readonly__><empty/><text>a &amp; b</text></__readonly__></rpc-reply>",
+            {"empty": "", "text": "a & b"},
+            id="Test empty elements and escaped text",
+        ),
+    ],
+)
+def test_normalize_xml_elements(source, output):
+    """Tests whether `normalize_xml` converts elements like the NX-OS JSON conversion."""
+    assert normalize_xml(source) == output
+
+
+@pytest.mark.parametrize(
+    "source, error",
+    [
+        pytest.param("<rpc-reply><data>", ParseError, id="Test truncated document"),
+        pytest.param("<rpc-reply>ok</rpc-reply>", ValueError, id="Test no data"),
+    ],
+)
+def test_normalize_xml_invalid(source, error):
+    """Tests whether `normalize_xml` rejects documents it cannot convert."""
+    with pytest.raises(error):
+        normalize_xml(source)